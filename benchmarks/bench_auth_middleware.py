@@ -0,0 +1,100 @@
+"""Benchmark the per-request overhead of the authorization middleware.
+
+Compares the pure ASGI AuthorizationMiddleware with the previous
+BaseHTTPMiddleware implementation, kept here as the baseline, on a streaming
+response shaped like the MCP transports. Token verification is stubbed out
+so only the middleware cost is measured.
+
+Usage:
+    python -m benchmarks.bench_auth_middleware [--iterations N]
+"""
+
+import argparse
+import asyncio
+from typing import Callable, Dict
+from unittest.mock import patch
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from benchmarks.common import http_scope, print_table, summarize, time_requests
+from template_mcp_server.src import api
+from template_mcp_server.src.api import AuthorizationMiddleware
+
+
+class BaseHTTPAuthorizationMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation replaced by the ASGI middleware."""
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        """Apply the same checks as the previous implementation."""
+        if request.url.path in api.PUBLIC_PATHS:
+            return await call_next(request)
+
+        auth_header = request.headers.get("authorization")
+        if not auth_header:
+            return Response("Unauthorized", status_code=401)
+
+        token_info = await api.OAuth2Handler.verify_authorization_header(auth_header)
+        if not token_info:
+            return Response("Unauthorized", status_code=401)
+
+        return await call_next(request)
+
+
+async def streaming_app(scope: Scope, receive: Receive, send: Send) -> None:
+    """Respond like an MCP transport: event stream sent in several chunks."""
+    await receive()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream")],
+        }
+    )
+    for _ in range(3):
+        await send(
+            {"type": "http.response.body", "body": b"data: {}\n\n", "more_body": True}
+        )
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def verify_stub(auth_header: str):
+    return {"active": True}
+
+
+async def run(iterations: int) -> None:
+    protected = http_scope(
+        "/mcp", method="POST", headers=[(b"authorization", b"Bearer token")]
+    )
+    public = http_scope("/health")
+    body = b'{"jsonrpc": "2.0", "method": "tools/call", "id": 1}'
+
+    variants: Dict[str, ASGIApp] = {
+        "no middleware": streaming_app,
+        "BaseHTTPMiddleware (before)": BaseHTTPAuthorizationMiddleware(streaming_app),
+        "pure ASGI middleware (after)": AuthorizationMiddleware(streaming_app),
+    }
+
+    with (
+        patch.object(api.settings, "ENABLE_AUTH", True),
+        patch.object(api.OAuth2Handler, "verify_authorization_header", verify_stub),
+    ):
+        for label, scope in (("protected /mcp", protected), ("public /health", public)):
+            rows = {}
+            for name, app in variants.items():
+                timings = await time_requests(app, scope, iterations, body)
+                rows[name] = summarize(timings)
+            print_table(f"Authorization middleware overhead, {label}", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
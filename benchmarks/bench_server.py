@@ -0,0 +1,210 @@
+"""Measure server throughput for each event loop and HTTP implementation.
+
+Starts the server once per MCP_EVENT_LOOP / MCP_HTTP_IMPLEMENTATION
+combination and drives it with concurrent clients, reporting requests per
+second for GET /health and for an MCP tools/call of multiply_numbers.
+Combinations whose packages are not installed are skipped; install the
+``performance`` extra to include uvloop and httptools.
+
+The load generator runs on the same machine as the server, so absolute
+numbers understate capacity; compare combinations within one run.
+
+Usage:
+    python -m benchmarks.bench_server [--duration S] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+MCP_HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+TOOLS_CALL_PARAMS = {"name": "multiply_numbers", "arguments": {"a": 6, "b": 7}}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def combinations() -> List[Tuple[str, str]]:
+    """Return the loop/http combinations that can run here."""
+    loops = ["asyncio"]
+    if importlib.util.find_spec("uvloop"):
+        loops.append("uvloop")
+    https = ["h11"]
+    if importlib.util.find_spec("httptools"):
+        https.append("httptools")
+    return [(loop, http) for loop in loops for http in https]
+
+
+def start_server(loop: str, http: str, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(port),
+        "MCP_EVENT_LOOP": loop,
+        "MCP_HTTP_IMPLEMENTATION": http,
+        "MCP_TRANSPORT_PROTOCOL": "streamable-http",
+        "MCP_WORKERS": "1",
+        "ENABLE_AUTH": "false",
+        "PYTHON_LOG_LEVEL": "WARNING",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "template_mcp_server.src.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+async def open_mcp_session(client: httpx.AsyncClient, base_url: str) -> Dict[str, str]:
+    """Run the MCP initialize handshake and return the session headers."""
+    response = await client.post(
+        f"{base_url}/mcp/",
+        headers=MCP_HEADERS,
+        json={
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-03-26",
+                "capabilities": {},
+                "clientInfo": {"name": "bench", "version": "0.1.0"},
+            },
+        },
+    )
+    response.raise_for_status()
+    headers = dict(MCP_HEADERS)
+    session_id = response.headers.get("mcp-session-id")
+    if session_id:
+        headers["mcp-session-id"] = session_id
+    await client.post(
+        f"{base_url}/mcp/",
+        headers=headers,
+        json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+    )
+    return headers
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    make_request: Callable[[], httpx.Request],
+    duration: float,
+    concurrency: int,
+) -> Tuple[float, int]:
+    """Send requests from concurrent workers; return req/s and errors."""
+    completed = 0
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal completed, errors
+        while time.perf_counter() < deadline:
+            response = await client.send(make_request())
+            await response.aread()
+            if response.status_code == 200:
+                completed += 1
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return completed / (time.perf_counter() - start), errors
+
+
+async def bench_combination(
+    loop: str, http: str, duration: float, concurrency: int
+) -> Dict[str, Tuple[float, int]]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_server(loop, http, port)
+    try:
+        await wait_until_up(base_url)
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            headers = await open_mcp_session(client, base_url)
+            # Requests in flight on one MCP session need distinct JSON-RPC ids
+            ids = itertools.count(1)
+
+            def health() -> httpx.Request:
+                return client.build_request("GET", f"{base_url}/health")
+
+            def tools_call() -> httpx.Request:
+                return client.build_request(
+                    "POST",
+                    f"{base_url}/mcp/",
+                    headers=headers,
+                    json={
+                        "jsonrpc": "2.0",
+                        "id": next(ids),
+                        "method": "tools/call",
+                        "params": TOOLS_CALL_PARAMS,
+                    },
+                )
+
+            return {
+                "GET /health": await drive(client, health, duration, concurrency),
+                "tools/call multiply_numbers": await drive(
+                    client, tools_call, duration, concurrency
+                ),
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def run(duration: float, concurrency: int, only: Optional[str]) -> None:
+    results = {}
+    for loop, http in combinations():
+        name = f"{loop} + {http}"
+        if only and only != name:
+            continue
+        results[name] = await bench_combination(loop, http, duration, concurrency)
+
+    print(f"\nServer throughput, {concurrency} concurrent clients, {duration}s each")
+    print(f"{'loop + http':<22} {'endpoint':<30} {'req/s':>10} {'errors':>8}")
+    for name, endpoints in results.items():
+        for endpoint, (rps, errors) in endpoints.items():
+            print(f"{name:<22} {endpoint:<30} {rps:>10.0f} {errors:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--only", help='Run a single combination, e.g. "uvloop + httptools"'
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.duration, args.concurrency, args.only))
+
+
+if __name__ == "__main__":
+    main()
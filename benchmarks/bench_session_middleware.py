@@ -0,0 +1,93 @@
+"""Benchmark the per-request session cost on MCP tools/call requests.
+
+Compares installing SessionMiddleware globally, as before, with the
+path-scoped session middleware that only handles ``/auth`` routes. Requests
+carry a valid signed session cookie, as a browser that completed the OAuth
+flow would send.
+
+Usage:
+    python -m benchmarks.bench_session_middleware [--iterations N]
+"""
+
+import argparse
+import asyncio
+import json
+from base64 import b64encode
+from typing import Dict, Literal, Optional, TypedDict
+
+from itsdangerous import TimestampSigner
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp
+
+from benchmarks.bench_auth_middleware import streaming_app
+from benchmarks.common import http_scope, print_table, summarize, time_requests
+from template_mcp_server.src.api import (
+    SESSION_PATH_PREFIXES,
+    PathScopedSessionMiddleware,
+)
+
+SECRET = "benchmark-secret"
+
+
+class SessionOptions(TypedDict):
+    """Keyword arguments shared by both session middlewares."""
+
+    secret_key: str
+    session_cookie: str
+    max_age: Optional[int]
+    same_site: Literal["lax", "strict", "none"]
+    https_only: bool
+
+
+SESSION_OPTIONS: SessionOptions = {
+    "secret_key": SECRET,
+    "session_cookie": "mcp_session",
+    "max_age": 60 * 60 * 24,
+    "same_site": "lax",
+    "https_only": False,
+}
+
+
+def session_cookie() -> bytes:
+    """Sign a session cookie the same way SessionMiddleware does."""
+    data = b64encode(json.dumps({"user_details": {"state": "abc"}}).encode())
+    return b"mcp_session=" + TimestampSigner(SECRET).sign(data)
+
+
+async def run(iterations: int) -> None:
+    tools_call = http_scope(
+        "/mcp",
+        method="POST",
+        headers=[
+            (b"content-type", b"application/json"),
+            (b"cookie", session_cookie()),
+        ],
+    )
+    body = b'{"jsonrpc": "2.0", "method": "tools/call", "id": 1}'
+
+    variants: Dict[str, ASGIApp] = {
+        "no session middleware": streaming_app,
+        "global SessionMiddleware (before)": SessionMiddleware(
+            streaming_app, **SESSION_OPTIONS
+        ),
+        "path-scoped session (after)": PathScopedSessionMiddleware(
+            streaming_app, path_prefixes=SESSION_PATH_PREFIXES, **SESSION_OPTIONS
+        ),
+    }
+
+    rows = {}
+    for name, app in variants.items():
+        timings = await time_requests(app, tools_call, iterations, body)
+        rows[name] = summarize(timings)
+    print_table("Session middleware overhead, POST /mcp tools/call", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
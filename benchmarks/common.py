@@ -0,0 +1,90 @@
+"""Shared helpers for the in-process ASGI benchmarks."""
+
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message
+
+
+def http_scope(
+    path: str,
+    method: str = "GET",
+    headers: Optional[List[tuple]] = None,
+) -> Dict[str, Any]:
+    """Build a minimal HTTP scope for calling an ASGI app directly."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers or [],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8080),
+    }
+
+
+async def call_app(app: ASGIApp, scope: Dict[str, Any], body: bytes = b"") -> int:
+    """Call an ASGI app once and return the response status."""
+    status = 0
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(dict(scope), receive, send)
+    return status
+
+
+async def time_requests(
+    app: ASGIApp,
+    scope: Dict[str, Any],
+    iterations: int,
+    body: bytes = b"",
+    warmup: int = 200,
+) -> List[float]:
+    """Return per-request latencies in microseconds."""
+    for _ in range(warmup):
+        await call_app(app, scope, body)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call_app(app, scope, body)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Summarize latencies as mean, median and p99 in microseconds."""
+    ordered = sorted(timings)
+    return {
+        "mean_us": statistics.fmean(ordered),
+        "p50_us": ordered[len(ordered) // 2],
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1],
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """Print benchmark results as an aligned table."""
+    print(f"\n{title}")
+    print(f"{'variant':<40} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10}")
+    for name, result in rows.items():
+        print(
+            f"{name:<40} {result['mean_us']:>10.1f} "
+            f"{result['p50_us']:>10.1f} {result['p99_us']:>10.1f}"
+        )
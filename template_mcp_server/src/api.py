@@ -4,22 +4,48 @@ It initializes the FastAPI app, configures CORS middleware, and sets up
 the MCP server with appropriate transport protocols.
 """
 
+import hashlib
+import json
 import webbrowser
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Callable, Optional
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Literal, Optional, Tuple
 from urllib.parse import urlparse
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from template_mcp_server.src.mcp import TemplateMCPServer
-from template_mcp_server.src.oauth.handler import OAuth2Handler
+from template_mcp_server.src.oauth.handler import (
+    OAuth2Handler,
+    check_sso_reachable,
+    cleanup_http_client,
+    cleanup_jwks_verifier,
+    get_token_cache_stats,
+    initialize_http_client,
+    initialize_jwks_verifier,
+)
 from template_mcp_server.src.oauth.routes import register_oauth_routes
 from template_mcp_server.src.oauth.service import OAuthService
+from template_mcp_server.src.readiness import (
+    ReadinessCheck,
+    cleanup_readiness_monitor,
+    get_readiness_monitor,
+    initialize_readiness_monitor,
+)
 from template_mcp_server.src.settings import settings
+from template_mcp_server.src.storage.reaper import (
+    cleanup_expired_row_reaper,
+    get_expired_row_reaper,
+    initialize_expired_row_reaper,
+)
+from template_mcp_server.src.storage.storage_service import StorageService
+from template_mcp_server.src.warmup import warm_up
 from template_mcp_server.utils.pylogger import get_python_logger
 
 logger = get_python_logger(settings.PYTHON_LOG_LEVEL)
@@ -36,7 +62,11 @@ if settings.MCP_TRANSPORT_PROTOCOL == "sse":
 
     mcp_app = create_sse_app(server.mcp, message_path="/sse/message", sse_path="/sse")
 else:  # Default to standard HTTP (works for both "http" and "streamable-http")
-    mcp_app = server.mcp.http_app(path="/mcp")
+    # With several workers a session's requests may land on any process, so
+    # MCP sessions must not be held in memory
+    mcp_app = server.mcp.http_app(
+        path="/mcp", stateless_http=True if settings.MCP_WORKERS > 1 else None
+    )
 
 
 @asynccontextmanager
@@ -44,6 +74,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Combined lifespan handler for MCP and storage initialization."""
     global oauth_service_instance
 
+    build_prebuilt_responses()
+    readiness_checks: Dict[str, ReadinessCheck] = {}
+
     # Initialize storage service before starting
     logger.info("Initializing storage service...")
     try:
@@ -52,21 +85,42 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
             storage_service = await initialize_storage()
             logger.info("Storage service initialized successfully")
+            readiness_checks["storage"] = storage_service.is_healthy
+            if settings.READINESS_CHECK_SSO:
+                readiness_checks["sso"] = check_sso_reachable
 
             oauth_service_instance = OAuthService(storage_service)
             logger.info("OAuth service initialized with dependency injection")
+
+            # The in-memory backend purges expired entries itself
+            if settings.EXPIRED_ROW_REAPER_ENABLED and isinstance(
+                storage_service, StorageService
+            ):
+                await initialize_expired_row_reaper(storage_service)
+
+            await initialize_http_client()
+            if settings.TOKEN_VERIFICATION_MODE == "jwks":
+                await initialize_jwks_verifier()
+
+            # Before the server listens, so no request meets a cold pool
+            if settings.WARM_UP_ENABLED:
+                await warm_up(storage_service)
     except Exception as e:
         logger.critical(f"Failed to initialize storage service: {e}")
         raise
 
     # Run MCP lifespan
     async with mcp_app.lifespan(app):
+        await initialize_readiness_monitor(readiness_checks)
         logger.info("Server is ready to accept connections")
         yield
+        # Fail readiness first so traffic drains before dependencies close
+        await cleanup_readiness_monitor()
 
     # Cleanup storage service
     logger.info("Shutting down storage service...")
     try:
+        await cleanup_expired_row_reaper()
         from template_mcp_server.src.oauth.service import cleanup_storage
 
         await cleanup_storage()
@@ -75,119 +129,155 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.error(f"Error during storage cleanup: {e}")
 
+    try:
+        await cleanup_jwks_verifier()
+        await cleanup_http_client()
+    except Exception as e:
+        logger.error(f"Error during SSO HTTP client cleanup: {e}")
+
 
 app = FastAPI(lifespan=lifespan)
 
 
-class AuthorizationMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle OAuth authorization for protected endpoints."""
+# Paths served without a bearer token, built once at import
+PUBLIC_PATHS = frozenset(
+    {
+        "/.well-known/oauth-protected-resource",
+        "/.well-known/oauth-authorization-server",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/auth/authorize",
+        "/auth/token",
+        "/auth/revoke",
+        "/auth/introspect",
+        "/auth/register",
+        "/auth/callback",
+        "/auth/callback/snowflake",
+        "/auth/callback/oidc",
+        "/health",
+        "/ready",
+    }
+)
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        """Process incoming requests and apply OAuth authorization checks."""
-        if not settings.ENABLE_AUTH:
-            return await call_next(request)
-
-        public_paths = {
-            "/.well-known/oauth-protected-resource",
-            "/.well-known/oauth-authorization-server",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/auth/authorize",
-            "/auth/token",
-            "/auth/revoke",
-            "/auth/introspect",
-            "/auth/register",
-            "/auth/callback",
-            "/auth/callback/snowflake",
-            "/auth/callback/oidc",
-            "/health",
-        }
+MCP_PATHS = frozenset({"/mcp", "/mcp/"})
 
-        if request.url.path in public_paths:
-            return await call_next(request)
 
-        auth_header = request.headers.get("authorization")
+def _unauthorized_response() -> Response:
+    return Response(
+        content="Unauthorized",
+        status_code=401,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class AuthorizationMiddleware:
+    """Middleware to handle OAuth authorization for protected endpoints.
+
+    Implemented as plain ASGI so request and response bodies, including the
+    streaming responses of the MCP transports, pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Wrap the downstream ASGI application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process incoming requests and apply OAuth authorization checks."""
+        if (
+            scope["type"] != "http"
+            or not settings.ENABLE_AUTH
+            or scope["path"] in PUBLIC_PATHS
+            or (scope["path"] == "/metrics" and settings.METRICS_PUBLIC)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = Headers(scope=scope).get("authorization")
         if not auth_header:
             logger.warning(
-                "Missing Authorization header for protected route: %s", request.url.path
-            )
-            return Response(
-                content="Unauthorized",
-                status_code=401,
-                headers={"WWW-Authenticate": "Bearer"},
+                "Missing Authorization header for protected route: %s", scope["path"]
             )
+            await _unauthorized_response()(scope, receive, send)
+            return
 
-        token_info = OAuth2Handler.verify_authorization_header(auth_header)
+        token_info = await OAuth2Handler.verify_authorization_header(auth_header)
         if not token_info:
-            logger.warning("Invalid token for protected route: %s", request.url.path)
-            return Response(
-                content="Unauthorized",
-                status_code=401,
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            logger.warning("Invalid token for protected route: %s", scope["path"])
+            await _unauthorized_response()(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
 
-        response = await call_next(request)
-        return response
 
+async def _read_body(receive: Receive) -> bytes:
+    """Read the complete request body from an ASGI receive channel."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
 
-class LocalDevelopmentAuthorizationMiddleware(BaseHTTPMiddleware):
+
+def _replay_receive(body: bytes, receive: Receive) -> Receive:
+    """Return a receive channel that yields an already read body first."""
+    body_sent = False
+
+    async def replay() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+class LocalDevelopmentAuthorizationMiddleware:
     """Local development authorization middleware that auto-opens browser for OAuth."""
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    def __init__(self, app: ASGIApp):
+        """Wrap the downstream ASGI application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process requests and handle local development OAuth flow."""
-        if not settings.USE_EXTERNAL_BROWSER_AUTH:
-            return await call_next(request)
-
-        public_paths = {
-            "/.well-known/oauth-protected-resource",
-            "/.well-known/oauth-authorization-server",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/auth/authorize",
-            "/auth/token",
-            "/auth/revoke",
-            "/auth/introspect",
-            "/auth/register",
-            "/auth/callback",
-            "/auth/callback/snowflake",
-            "/auth/callback/oidc",
-            "/health",
-        }
+        if (
+            scope["type"] != "http"
+            or not settings.USE_EXTERNAL_BROWSER_AUTH
+            or scope["path"] in PUBLIC_PATHS
+            or scope["method"] != "POST"
+            or scope["path"] not in MCP_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        if request.url.path in public_paths:
-            return await call_next(request)
-        if request.method == "POST" and request.url.path in {"/mcp", "/mcp/"}:
-            try:
-                body_bytes = await request.body()
-                import json
-
-                body = json.loads(body_bytes)
-                #! I think this is needed only for tool calls so goose or other agents can list tools with requiring auth.
-                if body.get("method") == "tools/call":
-
-                    async def receive():
-                        return {"type": "http.request", "body": body_bytes}
-
-                    request = Request(request.scope, receive)
-                else:
-                    return await call_next(request)
-            except Exception:
-                return await call_next(request)
-        else:
-            return await call_next(request)
-        global _local_development_token
+        body_bytes = await _read_body(receive)
+        receive = _replay_receive(body_bytes, receive)
+        try:
+            body = json.loads(body_bytes)
+            #! I think this is needed only for tool calls so goose or other agents can list tools with requiring auth.
+            is_tool_call = body.get("method") == "tools/call"
+        except Exception:
+            is_tool_call = False
+        if not is_tool_call:
+            await self.app(scope, receive, send)
+            return
 
         if _local_development_token:
-            request.headers.__dict__["_list"].append(
-                (b"authorization", f"Bearer {_local_development_token}".encode())
-            )
-            return await call_next(request)
+            scope = dict(scope)
+            scope["headers"] = [
+                *scope["headers"],
+                (b"authorization", f"Bearer {_local_development_token}".encode()),
+            ]
+            await self.app(scope, receive, send)
+            return
 
         try:
-            from template_mcp_server.src.oauth.handler import OAuth2Handler
-
             authorization_url, state = OAuth2Handler.get_authorization_url()
 
             logger.info(
@@ -196,7 +286,7 @@ class LocalDevelopmentAuthorizationMiddleware(BaseHTTPMiddleware):
 
             webbrowser.open(authorization_url)
 
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={
                     "message": "Authorization required for local development",
@@ -208,7 +298,7 @@ class LocalDevelopmentAuthorizationMiddleware(BaseHTTPMiddleware):
 
         except Exception as e:
             logger.error(f"Failed to initiate local OAuth flow: {e}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "error": "Failed to initiate local authorization",
@@ -216,6 +306,8 @@ class LocalDevelopmentAuthorizationMiddleware(BaseHTTPMiddleware):
                 },
             )
 
+        await response(scope, receive, send)
+
 
 if settings.USE_EXTERNAL_BROWSER_AUTH and settings.ENABLE_AUTH:
     app.add_middleware(LocalDevelopmentAuthorizationMiddleware)
@@ -244,8 +336,67 @@ def _get_session_secret() -> str:
     return ephemeral_key
 
 
+# Only the OAuth browser flow under /auth reads request.session
+SESSION_PATH_PREFIXES = ("/auth",)
+
+
+class PathScopedSessionMiddleware:
+    """Apply SessionMiddleware only to requests under the given path prefixes.
+
+    Requests outside the prefixes, such as the MCP transports, skip session
+    cookie parsing, signature verification and Set-Cookie serialization.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: Tuple[str, ...],
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: Optional[int] = 14 * 24 * 60 * 60,
+        same_site: Literal["lax", "strict", "none"] = "lax",
+        https_only: bool = False,
+    ):
+        """Wrap the downstream ASGI application.
+
+        Args:
+            app: Downstream ASGI application
+            path_prefixes: Path prefixes that need session support
+            secret_key: Key used to sign the session cookie
+            session_cookie: Name of the session cookie
+            max_age: Session lifetime in seconds
+            same_site: SameSite attribute of the session cookie
+            https_only: Whether the session cookie is Secure
+        """
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.session_app = SessionMiddleware(
+            app,
+            secret_key=secret_key,
+            session_cookie=session_cookie,
+            max_age=max_age,
+            same_site=same_site,
+            https_only=https_only,
+        )
+
+    def uses_session(self, path: str) -> bool:
+        """Return True if the path is under one of the session prefixes."""
+        return any(
+            path == prefix or path.startswith(prefix + "/")
+            for prefix in self.path_prefixes
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Route the request through SessionMiddleware when it needs a session."""
+        if scope["type"] in ("http", "websocket") and self.uses_session(scope["path"]):
+            await self.session_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
 app.add_middleware(
-    SessionMiddleware,
+    PathScopedSessionMiddleware,
+    path_prefixes=SESSION_PATH_PREFIXES,
     secret_key=_get_session_secret(),
     session_cookie="mcp_session",
     max_age=60 * 60 * 24,  # 1 day
@@ -254,24 +405,9 @@ app.add_middleware(
 )
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for the MCP server."""
-    return JSONResponse(
-        status_code=200,
-        content={
-            "status": "healthy",
-            "service": "template-mcp-server",
-            "transport_protocol": settings.MCP_TRANSPORT_PROTOCOL,
-            "version": "0.1.0",
-        },
-    )
-
-
-def get_host() -> str:
-    """Determine the HOST for OAuth discovery endpoints."""
+@lru_cache(maxsize=8)
+def _parse_host(endpoint: str) -> str:
     safe_default = "http://localhost:8080"
-    endpoint = getattr(settings, "MCP_HOST_ENDPOINT", None) or safe_default
     try:
         callback_uri = urlparse(endpoint)
         # Validate that scheme and netloc are present and scheme is http or https
@@ -295,13 +431,59 @@ def get_host() -> str:
         return safe_default
 
 
-@app.get("/.well-known/oauth-protected-resource", tags=["OAuth2"])
-async def well_known_oauth_protected_resource():
-    """Return protected resource metadata endpoint.
+def get_host() -> str:
+    """Determine the HOST for OAuth discovery endpoints.
 
-    Returns metadata about this resource server as per RFC 8414.
+    The parsed value is cached per MCP_HOST_ENDPOINT value.
     """
-    host = get_host()
+    endpoint = getattr(settings, "MCP_HOST_ENDPOINT", None) or "http://localhost:8080"
+    return _parse_host(endpoint)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class PrebuiltJSONResponse:
+    """JSON document serialized once and served with a strong ETag."""
+
+    def __init__(self, content: Dict[str, Any], cache_control: str):
+        """Serialize the document and compute its ETag.
+
+        Args:
+            content: JSON-serializable document
+            cache_control: Value of the Cache-Control response header
+        """
+        self.body = json.dumps(
+            content, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+
+    def respond(self, request: Request) -> Response:
+        """Return the document, or 304 if the client already has this version."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(
+            content=self.body, media_type="application/json", headers=self.headers
+        )
+
+
+def _health_document() -> Dict[str, Any]:
+    return {
+        "status": "healthy",
+        "service": "template-mcp-server",
+        "transport_protocol": settings.MCP_TRANSPORT_PROTOCOL,
+        "version": "0.1.0",
+    }
+
+
+def _protected_resource_metadata(host: str) -> Dict[str, Any]:
     return {
         "resource": host,
         "authorization_servers": [host],
@@ -318,13 +500,7 @@ async def well_known_oauth_protected_resource():
     }
 
 
-@app.get("/.well-known/oauth-authorization-server", tags=["OAuth2"])
-async def well_known_oauth_authorization_server():
-    """Return authorization server metadata endpoint.
-
-    Returns metadata about the authorization server as per RFC 8414.
-    """
-    host = get_host()
+def _authorization_server_metadata(host: str) -> Dict[str, Any]:
     return {
         "issuer": host,
         "authorization_endpoint": f"{host}/auth/authorize",
@@ -359,6 +535,98 @@ async def well_known_oauth_authorization_server():
     }
 
 
+_prebuilt_responses: Dict[str, PrebuiltJSONResponse] = {}
+
+
+def build_prebuilt_responses() -> None:
+    """Serialize the health and discovery documents from the current settings.
+
+    Called at import and again at startup; call it after changing the
+    settings these documents depend on.
+    """
+    host = get_host()
+    discovery_cache_control = (
+        f"public, max-age={settings.DISCOVERY_CACHE_MAX_AGE_SECONDS}"
+    )
+    _prebuilt_responses.update(
+        {
+            # Probes must always revalidate, but may do so with If-None-Match
+            "health": PrebuiltJSONResponse(_health_document(), "no-cache"),
+            "oauth_protected_resource": PrebuiltJSONResponse(
+                _protected_resource_metadata(host), discovery_cache_control
+            ),
+            "oauth_authorization_server": PrebuiltJSONResponse(
+                _authorization_server_metadata(host), discovery_cache_control
+            ),
+        }
+    )
+
+
+build_prebuilt_responses()
+
+
+@app.get("/health")
+async def health_check(request: Request):
+    """Health check endpoint for the MCP server."""
+    return _prebuilt_responses["health"].respond(request)
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint reporting the cached result of the dependency checks.
+
+    Returns 503 until the first round of checks has passed, whenever a
+    dependency check is failing, and once shutdown has begun.
+    """
+    monitor = get_readiness_monitor()
+    if monitor is None:
+        content: Dict[str, Any] = {"status": "not_ready", "checks": {}}
+        ready = False
+    else:
+        content = monitor.status()
+        ready = monitor.is_ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=content,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """Expose in-process runtime metrics such as cache hit rates and pool waits."""
+    reaper = get_expired_row_reaper()
+    storage = oauth_service_instance.storage if oauth_service_instance else None
+    return {
+        "token_cache": get_token_cache_stats(),
+        "client_cache": storage.client_cache.stats()
+        if isinstance(storage, StorageService)
+        else None,
+        "storage_pools": storage.pool_metrics()
+        if isinstance(storage, StorageService)
+        else None,
+        "expired_row_reaper": reaper.metrics() if reaper else None,
+    }
+
+
+@app.get("/.well-known/oauth-protected-resource", tags=["OAuth2"])
+async def well_known_oauth_protected_resource(request: Request):
+    """Return protected resource metadata endpoint.
+
+    Returns metadata about this resource server as per RFC 8414.
+    """
+    return _prebuilt_responses["oauth_protected_resource"].respond(request)
+
+
+@app.get("/.well-known/oauth-authorization-server", tags=["OAuth2"])
+async def well_known_oauth_authorization_server(request: Request):
+    """Return authorization server metadata endpoint.
+
+    Returns metadata about the authorization server as per RFC 8414.
+    """
+    return _prebuilt_responses["oauth_authorization_server"].respond(request)
+
+
 # Register OAuth routes with dependency injection
 def get_oauth_service_provider() -> OAuthService:
     """Get the OAuth service instance."""
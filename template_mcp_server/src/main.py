@@ -1,7 +1,8 @@
 """Main entry point for the Template MCP Server."""
 
+import importlib.util
 import sys
-from typing import NoReturn
+from typing import Any, Dict, Literal, NoReturn, Union
 
 import uvicorn
 
@@ -13,6 +14,9 @@ from template_mcp_server.utils.pylogger import get_python_logger, get_uvicorn_lo
 # Initialize logger
 logger = get_python_logger()
 
+# Worker processes import the app themselves from this path
+APP_IMPORT_STRING = "template_mcp_server.src.api:app"
+
 
 def validate_config() -> None:
     """Validate configuration settings.
@@ -45,6 +49,52 @@ def validate_config() -> None:
         raise ValueError(f"Configuration validation failed: {e}") from e
 
 
+def resolve_event_loop(requested: str) -> Literal["uvloop", "asyncio"]:
+    """Resolve the MCP_EVENT_LOOP setting to the loop uvicorn should use.
+
+    Args:
+        requested: "auto", "uvloop" or "asyncio"
+
+    Returns:
+        The event loop implementation to run
+
+    Raises:
+        ValueError: If uvloop is requested but not installed
+    """
+    uvloop_installed = importlib.util.find_spec("uvloop") is not None
+    if requested == "uvloop" and not uvloop_installed:
+        raise ValueError(
+            "MCP_EVENT_LOOP is 'uvloop' but uvloop is not installed; "
+            "install the 'performance' extra"
+        )
+    if requested == "asyncio" or not uvloop_installed:
+        return "asyncio"
+    return "uvloop"
+
+
+def resolve_http_implementation(requested: str) -> Literal["httptools", "h11"]:
+    """Resolve the MCP_HTTP_IMPLEMENTATION setting to the parser uvicorn should use.
+
+    Args:
+        requested: "auto", "httptools" or "h11"
+
+    Returns:
+        The HTTP/1.1 implementation to run
+
+    Raises:
+        ValueError: If httptools is requested but not installed
+    """
+    httptools_installed = importlib.util.find_spec("httptools") is not None
+    if requested == "httptools" and not httptools_installed:
+        raise ValueError(
+            "MCP_HTTP_IMPLEMENTATION is 'httptools' but httptools is not "
+            "installed; install the 'performance' extra"
+        )
+    if requested == "h11" or not httptools_installed:
+        return "h11"
+    return "httptools"
+
+
 def handle_startup_error(error: Exception, context: str = "server startup") -> NoReturn:
     """Handle startup errors with proper logging and exit codes.
 
@@ -93,7 +143,7 @@ def main() -> None:
             f"Server configured to use {settings.MCP_TRANSPORT_PROTOCOL} protocol"
         )
 
-        uvicorn_config = {}
+        uvicorn_config: Dict[str, Any] = {}
         if settings.MCP_SSL_KEYFILE and settings.MCP_SSL_CERTFILE:
             uvicorn_config["ssl_keyfile"] = settings.MCP_SSL_KEYFILE
             uvicorn_config["ssl_certfile"] = settings.MCP_SSL_CERTFILE
@@ -103,11 +153,33 @@ def main() -> None:
                 ssl_certfile=settings.MCP_SSL_CERTFILE,
             )
 
+        loop = resolve_event_loop(settings.MCP_EVENT_LOOP)
+        http = resolve_http_implementation(settings.MCP_HTTP_IMPLEMENTATION)
+        logger.info(
+            "Server runtime selected",
+            loop=loop,
+            http=http,
+            requested_loop=settings.MCP_EVENT_LOOP,
+            requested_http=settings.MCP_HTTP_IMPLEMENTATION,
+        )
+
+        # Each worker process builds its own app, storage pool and caches
+        app_target: Union[str, Any] = app
+        if settings.MCP_WORKERS > 1:
+            app_target = APP_IMPORT_STRING
+            uvicorn_config["workers"] = settings.MCP_WORKERS
+            logger.info(f"Starting {settings.MCP_WORKERS} worker processes")
+
+        # On SIGTERM uvicorn stops accepting connections, lets in-flight
+        # requests finish for up to the timeout, then runs lifespan shutdown
         uvicorn.run(
-            app,
+            app_target,
             host=settings.MCP_HOST,
             port=settings.MCP_PORT,
             log_config=get_uvicorn_log_config(settings.PYTHON_LOG_LEVEL),
+            loop=loop,
+            http=http,
+            timeout_graceful_shutdown=settings.MCP_GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS,
             **uvicorn_config,
         )
 
@@ -37,10 +37,9 @@ if settings.USE_EXTERNAL_BROWSER_AUTH:
 async def handle_callback(request: Request, oauth_service: OAuthService) -> Response:
     """Handle OAuth callback endpoint."""
     code = request.query_params.get("code")
-    state = request.query_params.get("state")
 
-    token_set_from_code = OAuth2Handler.get_access_token_from_authorization_code_flow(
-        code, state
+    token_set_from_code = (
+        await OAuth2Handler.get_access_token_from_authorization_code_flow(code)
     )
 
     logger.info(f"\n\n\nAccess token: {token_set_from_code.get('access_token')}\n\n\n")
@@ -176,7 +175,10 @@ async def parse_token_request(request: Request) -> Dict[str, Any]:
 
     try:
         if content_type and content_type.startswith("application/json"):
-            return await request.json()
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise ValueError("JSON body is not an object")
+            return body
         else:
             # Handle form data
             form_data = await request.form()
@@ -279,8 +281,9 @@ async def handle_authorization_code_grant(
     token_request: AuthorizationCodeTokenRequest, oauth_service: OAuthService
 ) -> Dict[str, Any]:
     """Handle authorization code grant with Pydantic validation."""
-    # Validate the authorization code
-    code_data = await oauth_service.validate_authorization_code(token_request.code)
+    # Redeem the authorization code; it is deleted whether or not the rest of
+    # the request checks out, so each code gets exactly one attempt
+    code_data = await oauth_service.consume_authorization_code(token_request.code)
 
     if not code_data:
         raise HTTPException(
@@ -336,9 +339,6 @@ async def handle_authorization_code_grant(
                 },
             )
 
-    # Mark the code as used
-    await oauth_service.mark_code_as_used(token_request.code)
-
     # Return OAuth response with Snowflake tokens if available
     oauth_response = {
         "access_token": "oauth_access_token_placeholder",
@@ -403,7 +403,7 @@ async def handle_refresh_token_grant_pydantic(
     if snowflake_refresh_token:
         try:
             snowflake_token_response = (
-                OAuth2Handler.get_access_token_from_refresh_token(
+                await OAuth2Handler.get_access_token_from_refresh_token(
                     snowflake_refresh_token
                 )
             )
@@ -564,7 +564,7 @@ async def handle_introspect(
                 },
             )
 
-        introspection_result = OAuth2Handler.introspect_token(token)
+        introspection_result = await OAuth2Handler.introspect_token(token)
         return introspection_result
 
     except HTTPException:
@@ -5,21 +5,165 @@ This module provides OAuth 2.0 authentication functionality including:
 - Authorization URL generation
 - Token exchange and refresh
 - Token introspection and validation
+- Local JWT verification against the issuer's JWKS
+- Caching and coalescing of token verifications
 """
 
+import hashlib
 import time
 from typing import Any, Dict, Optional
 
 import httpx
 from requests_oauthlib import OAuth2Session
 
+from template_mcp_server.src.oauth.jwks import (
+    JWKSVerifier,
+    LocalVerificationUnavailable,
+)
 from template_mcp_server.src.settings import settings
+from template_mcp_server.utils.cache import SingleFlight, TTLCache
 from template_mcp_server.utils.pylogger import get_python_logger
 
 logger = get_python_logger()
 
 SCOPE = ["email", "openid", "profile", "session:role-any"]
 
+# Verified introspection results keyed by the SHA-256 digest of the token
+_token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    max_ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+# Digests of tokens recently found inactive or expired
+_negative_token_cache: TTLCache[bool] = TTLCache(
+    max_entries=settings.NEGATIVE_TOKEN_CACHE_MAX_ENTRIES,
+    max_ttl=settings.NEGATIVE_TOKEN_CACHE_TTL_SECONDS,
+)
+
+# Concurrent verifications of the same token share one introspection call
+_token_verifications = SingleFlight()
+
+# Shared connection pool for calls to the SSO server, managed by the app lifespan
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Local JWT verifier, used when TOKEN_VERIFICATION_MODE is "jwks"
+_jwks_verifier: Optional[JWKSVerifier] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create an HTTP client with keep-alive pooling for the SSO server."""
+    return httpx.AsyncClient(
+        http2=settings.SSO_HTTP2_ENABLED,
+        timeout=settings.SSO_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.SSO_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SSO_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SSO_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared SSO HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def initialize_http_client() -> httpx.AsyncClient:
+    """Initialize the shared SSO HTTP client. Call this during application startup."""
+    client = get_http_client()
+    logger.info(
+        "SSO HTTP client initialized",
+        http2=settings.SSO_HTTP2_ENABLED,
+        max_connections=settings.SSO_HTTP_MAX_CONNECTIONS,
+    )
+    return client
+
+
+def get_jwks_verifier() -> JWKSVerifier:
+    """Get the local JWT verifier, creating it on first use."""
+    global _jwks_verifier
+    if _jwks_verifier is None:
+        _jwks_verifier = JWKSVerifier(
+            jwks_url=settings.SSO_JWKS_URL,
+            http_client_factory=get_http_client,
+            algorithms=settings.SSO_JWT_ALGORITHMS,
+            issuer=settings.SSO_ISSUER,
+            audience=settings.SSO_AUDIENCE,
+            refresh_interval=settings.JWKS_REFRESH_INTERVAL_SECONDS,
+            min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+            leeway=settings.SSO_JWT_LEEWAY_SECONDS,
+        )
+    return _jwks_verifier
+
+
+async def initialize_jwks_verifier() -> JWKSVerifier:
+    """Load the JWKS and start its background refresh. Call during startup."""
+    verifier = get_jwks_verifier()
+    await verifier.start()
+    logger.info("JWKS verifier initialized", key_ids=verifier.key_ids)
+    return verifier
+
+
+async def cleanup_jwks_verifier() -> None:
+    """Stop the JWKS background refresh. Call during application shutdown."""
+    global _jwks_verifier
+    if _jwks_verifier is not None:
+        await _jwks_verifier.stop()
+        _jwks_verifier = None
+        logger.info("JWKS verifier stopped")
+
+
+def hash_token(token: str) -> bytes:
+    """Return the SHA-256 digest used to key cached token results."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Get counters of the token verification caches."""
+    return {
+        "enabled": settings.TOKEN_CACHE_ENABLED,
+        **_token_cache.stats(),
+        "negative": _negative_token_cache.stats(),
+        "verifications": _token_verifications.stats(),
+    }
+
+
+async def check_sso_reachable() -> bool:
+    """Check that the SSO server answers on the endpoint used to verify tokens.
+
+    Any response below 500 counts as reachable; the endpoint may reject the
+    unauthenticated GET.
+    """
+    url = (
+        settings.SSO_JWKS_URL
+        if settings.TOKEN_VERIFICATION_MODE == "jwks"
+        else settings.SSO_INTROSPECTION_URL
+    )
+    try:
+        response = await get_http_client().get(
+            url, timeout=settings.READINESS_CHECK_TIMEOUT_SECONDS
+        )
+        return response.status_code < 500
+    except httpx.HTTPError as e:
+        logger.warning(f"SSO reachability check failed: {e}")
+        return False
+
+
+async def cleanup_http_client() -> None:
+    """Close the shared SSO HTTP client. Call this during application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("SSO HTTP client closed")
+
+
+class TokenExchangeError(Exception):
+    """Raised when the SSO token endpoint does not issue a token."""
+
 
 class OAuth2Handler:
     """OAuth2 handler class for managing OAuth authentication flows."""
@@ -44,36 +188,85 @@ class OAuth2Handler:
         return authorization_url, state
 
     @staticmethod
-    def get_access_token_from_authorization_code_flow(code: str, state: str):
+    async def request_token(data: Dict[str, str]) -> Dict[str, Any]:
+        """Send a grant to the SSO token endpoint over the shared HTTP client.
+
+        Args:
+            data: Grant-specific form fields; client credentials are added
+
+        Returns:
+            Dict[str, Any]: The token response, with ``expires_at`` added
+            when the SSO reports ``expires_in``
+
+        Raises:
+            TokenExchangeError: If the request fails or the SSO rejects it
+        """
+        try:
+            response = await get_http_client().post(
+                settings.SSO_TOKEN_URL,
+                data={
+                    **data,
+                    "client_id": settings.SSO_CLIENT_ID,
+                    "client_secret": settings.SSO_CLIENT_SECRET,
+                },
+                headers={"Accept": "application/json"},
+                timeout=settings.SSO_TOKEN_TIMEOUT_SECONDS,
+            )
+        except httpx.HTTPError as e:
+            raise TokenExchangeError(f"Token request failed: {e}") from e
+
+        try:
+            token = response.json()
+        except ValueError:
+            token = {}
+        if not isinstance(token, dict):
+            token = {}
+
+        if response.is_error or "access_token" not in token:
+            error = token.get("error", f"HTTP {response.status_code}")
+            description = token.get("error_description", "")
+            raise TokenExchangeError(
+                f"Token endpoint rejected {data.get('grant_type')} grant: "
+                f"{error} {description}".rstrip()
+            )
+
+        if "expires_in" in token:
+            token["expires_at"] = time.time() + float(token["expires_in"])
+        return token
+
+    @staticmethod
+    async def get_access_token_from_authorization_code_flow(
+        code: str,
+    ) -> Dict[str, Any]:
         """Get access token from authorization code flow."""
-        oauth = OAuth2Handler.create_oauth_session(state=state)
-        token = oauth.fetch_token(
-            settings.SSO_TOKEN_URL,
-            code=code,
-            client_secret=settings.SSO_CLIENT_SECRET,
-            include_client_id=True,
+        return await OAuth2Handler.request_token(
+            {
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": settings.SSO_CALLBACK_URL,
+            }
         )
-        return token
 
     @staticmethod
-    def get_access_token_from_refresh_token(refresh_token: str):
+    async def get_access_token_from_refresh_token(
+        refresh_token: str,
+    ) -> Dict[str, Any]:
         """Get access token using refresh token."""
-        oauth = OAuth2Handler.create_oauth_session()
-        token = oauth.refresh_token(
-            settings.SSO_TOKEN_URL,
-            refresh_token=refresh_token,
-            client_id=settings.SSO_CLIENT_ID,
-            client_secret=settings.SSO_CLIENT_SECRET,
+        return await OAuth2Handler.request_token(
+            {
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "scope": " ".join(SCOPE),
+            }
         )
-        return token
 
     @staticmethod
-    def introspect_token(token: str) -> Dict[str, Any]:
+    async def introspect_token(token: str) -> Dict[str, Any]:
         """Introspect a token using the configured SSO introspection endpoint."""
         introspection_url = settings.SSO_INTROSPECTION_URL
 
         try:
-            response = httpx.post(
+            response = await get_http_client().post(
                 introspection_url,
                 data={
                     "token": token,
@@ -81,7 +274,6 @@ class OAuth2Handler:
                     "client_secret": settings.SSO_CLIENT_SECRET,
                 },
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=10.0,
             )
             response.raise_for_status()
 
@@ -98,34 +290,86 @@ class OAuth2Handler:
             return {"active": False, "error": f"Unexpected error: {e}"}
 
     @staticmethod
-    def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
-        """Verify an access token using RedHat's introspection endpoint."""
-        introspection_result = OAuth2Handler.introspect_token(token)
+    async def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
+        """Verify an access token using RedHat's introspection endpoint.
+
+        Successful results are cached until the earlier of the token expiry
+        and TOKEN_CACHE_TTL_SECONDS, and inactive or expired tokens are
+        rejected from a short-lived negative cache. Concurrent verifications
+        of the same token share a single introspection call.
+
+        When TOKEN_VERIFICATION_MODE is "jwks", signed JWTs are verified
+        locally and only tokens that cannot be judged locally are introspected.
+        """
+        cache_key = hash_token(token)
+
+        if settings.TOKEN_CACHE_ENABLED:
+            cached_result = _token_cache.get(cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        if _negative_token_cache.get(cache_key):
+            logger.debug("Token rejected from negative cache")
+            return None
+
+        if settings.TOKEN_VERIFICATION_MODE == "jwks":
+            try:
+                claims = await get_jwks_verifier().verify(token)
+            except LocalVerificationUnavailable as e:
+                logger.debug(f"Falling back to token introspection: {e}")
+            else:
+                if claims is None:
+                    _negative_token_cache.set(cache_key, True)
+                elif settings.TOKEN_CACHE_ENABLED:
+                    _token_cache.set(cache_key, claims, expires_at=claims["exp"])
+                return claims
+
+        return await _token_verifications.do(
+            cache_key,
+            lambda: OAuth2Handler._introspect_and_validate(token, cache_key),
+        )
+
+    @staticmethod
+    async def _introspect_and_validate(
+        token: str, cache_key: bytes
+    ) -> Optional[Dict[str, Any]]:
+        """Introspect a token, validate the result and update the caches."""
+        introspection_result = await OAuth2Handler.introspect_token(token)
 
         if not introspection_result.get("active", False):
             logger.warning("Token is not active")
+            # Introspection errors are transient and must not lock the token out
+            if "error" not in introspection_result:
+                _negative_token_cache.set(cache_key, True)
             return None
 
         # Check if token is expired
         exp = introspection_result.get("exp")
         if exp and exp < time.time():
             logger.warning("Token has expired")
+            _negative_token_cache.set(cache_key, True)
             return None
 
         # Verify it's an access token (not refresh token)
         token_type = introspection_result.get("token_type", "").lower()
         if token_type and token_type != "bearer" and token_type != "access_token":
             logger.warning(f"Invalid token type: {token_type}")
+            _negative_token_cache.set(cache_key, True)
             return None
 
+        if settings.TOKEN_CACHE_ENABLED:
+            _token_cache.set(cache_key, introspection_result, expires_at=exp or None)
+
         return introspection_result
 
     @staticmethod
-    def verify_authorization_header(auth_header: str) -> Optional[Dict[str, Any]]:
+    async def verify_authorization_header(
+        auth_header: str,
+    ) -> Optional[Dict[str, Any]]:
         """Verify Authorization header with Bearer token using RedHat's introspection."""
         if not auth_header or not auth_header.startswith("Bearer "):
             logger.warning("Invalid authorization header format")
             return None
 
         token = auth_header[7:]  # Remove "Bearer " prefix
-        return OAuth2Handler.verify_access_token(token)
+        return await OAuth2Handler.verify_access_token(token)
@@ -0,0 +1,198 @@
+"""Local JWT access token verification against the issuer's JWKS.
+
+This module verifies signed access tokens in-process instead of calling the
+SSO introspection endpoint. It provides:
+- A JWKS key set cache with background refresh
+- Key rotation by ``kid`` with rate-limited refetches for unknown keys
+- Validation of signature, ``exp``, ``nbf``, ``aud`` and ``iss``
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+
+from template_mcp_server.utils.cache import SingleFlight
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+ACCESS_TOKEN_TYPES = {"bearer", "access_token", "at+jwt"}
+
+
+class LocalVerificationUnavailable(Exception):
+    """Raised when a token cannot be judged locally and needs introspection."""
+
+
+class JWKSVerifier:
+    """Verify JWT access tokens with keys fetched from a JWKS endpoint."""
+
+    def __init__(
+        self,
+        jwks_url: str,
+        http_client_factory: Callable[[], httpx.AsyncClient],
+        algorithms: List[str],
+        issuer: Optional[str] = None,
+        audience: Optional[str] = None,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        leeway: float = 0.0,
+    ):
+        """Initialize the verifier.
+
+        Args:
+            jwks_url: URL of the issuer's JWKS document
+            http_client_factory: Callable returning the HTTP client to fetch with
+            algorithms: Accepted signing algorithms
+            issuer: Expected ``iss`` claim, not checked when empty
+            audience: Expected ``aud`` claim, not checked when empty
+            refresh_interval: Seconds between background JWKS refreshes
+            min_refresh_interval: Minimum seconds between refetches triggered
+                by an unknown ``kid``
+            leeway: Clock skew tolerance in seconds for ``exp`` and ``nbf``
+        """
+        self.jwks_url = jwks_url
+        self.http_client_factory = http_client_factory
+        self.algorithms = algorithms
+        self.issuer = issuer
+        self.audience = audience
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._last_refresh = 0.0
+        self._refreshes = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def key_ids(self) -> List[str]:
+        """Return the key IDs currently loaded."""
+        return list(self._keys)
+
+    def load_jwks(self, jwks: Dict[str, Any]) -> None:
+        """Replace the cached signing keys with those in a JWKS document."""
+        keys: Dict[str, jwt.PyJWK] = {}
+        for jwk in jwks.get("keys", []):
+            kid = jwk.get("kid")
+            if not kid or jwk.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwt.PyJWK.from_dict(jwk)
+            except jwt.PyJWKError as e:
+                logger.warning(f"Skipping unusable JWKS key {kid}: {e}")
+
+        if not keys:
+            raise ValueError("JWKS document contains no usable signing keys")
+
+        self._keys = keys
+        self._last_refresh = time.monotonic()
+
+    async def refresh(self) -> bool:
+        """Fetch the JWKS document and replace the cached keys.
+
+        Returns:
+            bool: True if the keys were refreshed, False otherwise
+        """
+        return await self._refreshes.do("jwks", self._fetch_and_load)
+
+    async def _fetch_and_load(self) -> bool:
+        try:
+            response = await self.http_client_factory().get(self.jwks_url)
+            response.raise_for_status()
+            self.load_jwks(response.json())
+            logger.debug(f"JWKS refreshed with keys: {self.key_ids}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to refresh JWKS from {self.jwks_url}: {e}")
+            return False
+
+    async def _get_signing_key(self, kid: str) -> jwt.PyJWK:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid usually means the issuer rotated keys; refetch, but not
+        # more often than min_refresh_interval so junk tokens cannot hammer it
+        if time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+            await self.refresh()
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+
+        raise LocalVerificationUnavailable(f"No JWKS key for kid {kid}")
+
+    async def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify a JWT access token locally.
+
+        Returns:
+            Optional[Dict[str, Any]]: Introspection-style claims with
+            ``active`` set when the token is valid, None when it is invalid
+
+        Raises:
+            LocalVerificationUnavailable: If the token is not a JWT or no
+                matching signing key is available
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.DecodeError as e:
+            raise LocalVerificationUnavailable(f"Token is not a JWT: {e}") from e
+
+        kid = header.get("kid")
+        if not kid:
+            raise LocalVerificationUnavailable("JWT header has no kid")
+
+        signing_key = await self._get_signing_key(kid)
+        # The header names the algorithm, so only accept the one the key is
+        # for; another family fails in PyJWT's key handling, not as invalid
+        if signing_key.algorithm_name not in self.algorithms:
+            logger.warning(
+                f"JWKS key {kid} algorithm {signing_key.algorithm_name} is not allowed"
+            )
+            return None
+
+        try:
+            claims = jwt.decode(
+                token,
+                key=signing_key.key,
+                algorithms=[signing_key.algorithm_name],
+                audience=self.audience or None,
+                issuer=self.issuer or None,
+                leeway=self.leeway,
+                options={
+                    "require": ["exp"],
+                    "verify_aud": bool(self.audience),
+                },
+            )
+        except (jwt.PyJWTError, TypeError, ValueError) as e:
+            logger.warning(f"Local JWT verification failed: {e}")
+            return None
+
+        token_type = str(claims.get("typ", "")).lower()
+        if token_type and token_type not in ACCESS_TOKEN_TYPES:
+            logger.warning(f"Invalid token type: {token_type}")
+            return None
+
+        return {"active": True, "token_type": "Bearer", **claims}
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Load the keys and start refreshing them in the background."""
+        await self.refresh()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
@@ -13,16 +13,20 @@ import base64
 import hashlib
 import secrets
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from template_mcp_server.src.settings import settings
+from template_mcp_server.src.storage.memory_storage import InMemoryStorageService
 from template_mcp_server.src.storage.storage_service import StorageService
 from template_mcp_server.utils.pylogger import get_python_logger
 
 logger = get_python_logger(settings.PYTHON_LOG_LEVEL)
 
+# Storage backends share one interface; STORAGE_BACKEND selects which is used
+StorageBackend = Union[StorageService, InMemoryStorageService]
+
 # Global storage service for backward compatibility during transition
-_storage_service: Optional[StorageService] = None
+_storage_service: Optional[StorageBackend] = None
 
 
 def generate_random_string(length: int = 32) -> str:
@@ -66,7 +70,7 @@ def verify_code_challenge(code_verifier: str, code_challenge: str) -> bool:
 class OAuthService:
     """OAuth service that manages OAuth 2.0 operations with dependency injection."""
 
-    def __init__(self, storage_service: StorageService):
+    def __init__(self, storage_service: StorageBackend):
         """Initialize OAuth service with storage dependency.
 
         Args:
@@ -122,6 +126,13 @@ class OAuthService:
             return None
         return code_data
 
+    async def consume_authorization_code(self, code: str) -> Optional[Dict[str, Any]]:
+        """Redeem an authorization code, deleting it so it cannot be replayed."""
+        code_data = await self.storage.consume_authorization_code(code)
+        if code_data:
+            logger.info(f"Authorization code consumed: {code[:8]}...")
+        return code_data
+
     async def mark_code_as_used(self, code: str) -> None:
         """Mark authorization code as used by deleting it from storage."""
         success = await self.storage.delete_authorization_code(code)
@@ -156,57 +167,41 @@ class OAuthService:
 
         If a client with the same name and redirect URIs already exists,
         returns the existing client credentials instead of creating a new one.
+        Lookup and insert are a single upsert, so concurrent registrations
+        of the same client all receive the same credentials.
         """
-        existing_client = await self.storage.get_client_by_name_and_redirect_uris(
-            client_name, redirect_uris
-        )
-
-        if existing_client:
-            logger.info(
-                f"Returning existing client for name '{client_name}': {existing_client['id']}"
-            )
-            return {
-                "client_id": existing_client["id"],
-                "client_secret": existing_client["secret"],
-                "client_name": existing_client["name"],
-                "redirect_uris": existing_client["redirect_uris"],
-                "grant_types": existing_client["grant_types"],
-                "response_types": existing_client["response_types"],
-                "scope": existing_client["scope"],
-                "client_id_issued_at": int(existing_client["created_at"]),
-            }
-
-        client_id = generate_random_string(16)
-        client_secret = generate_random_string(32)
-
         client_data = {
-            "id": client_id,
-            "secret": client_secret,
+            "id": generate_random_string(16),
+            "secret": generate_random_string(32),
             "name": client_name,
             "redirect_uris": redirect_uris,
             "grant_types": grant_types or ["authorization_code", "refresh_token"],
             "response_types": response_types or ["code"],
             "scope": scope or "read write",
-            "created_at": time.time(),
         }
 
-        success = await self.storage.store_client(client_data)
+        client = await self.storage.upsert_client(client_data)
 
-        if not success:
-            logger.error(f"Failed to store client {client_id} in storage")
+        if not client:
+            logger.error(f"Failed to store client {client_data['id']} in storage")
             raise RuntimeError("Failed to persist client registration")
 
-        logger.info(f"New client registered: {client_id} for '{client_name}'")
+        if client["inserted"]:
+            logger.info(f"New client registered: {client['id']} for '{client_name}'")
+        else:
+            logger.info(
+                f"Returning existing client for name '{client_name}': {client['id']}"
+            )
 
         return {
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "client_name": client_name,
-            "redirect_uris": redirect_uris,
-            "grant_types": client_data["grant_types"],
-            "response_types": client_data["response_types"],
-            "scope": client_data["scope"],
-            "client_id_issued_at": int(time.time()),
+            "client_id": client["id"],
+            "client_secret": client["secret"],
+            "client_name": client["name"],
+            "redirect_uris": client["redirect_uris"],
+            "grant_types": client["grant_types"],
+            "response_types": client["response_types"],
+            "scope": client["scope"],
+            "client_id_issued_at": int(client["created_at"]),
         }
 
     async def store_access_token(self, token: str, token_data: Dict[str, Any]) -> bool:
@@ -221,6 +216,18 @@ class OAuthService:
         """Store a refresh token."""
         return await self.storage.store_refresh_token(token, token_data)
 
+    async def store_token_pair(
+        self,
+        access_token: str,
+        access_data: Dict[str, Any],
+        refresh_token: str,
+        refresh_data: Dict[str, Any],
+    ) -> bool:
+        """Store an access token together with its refresh token."""
+        return await self.storage.store_token_pair(
+            access_token, access_data, refresh_token, refresh_data
+        )
+
     async def retrieve_refresh_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Retrieve a refresh token."""
         return await self.storage.get_refresh_token(token)
@@ -239,13 +246,13 @@ class OAuthService:
 
 
 # Backward compatibility functions - will be deprecated in future versions
-async def get_storage_service() -> StorageService:
+async def get_storage_service() -> StorageBackend:
     """Get the initialized storage service.
 
     Note: Storage service must be initialized via initialize_storage() during startup.
 
     Returns:
-        StorageService: The initialized storage service
+        StorageBackend: The initialized storage service
 
     Raises:
         RuntimeError: If storage service hasn't been initialized
@@ -302,6 +309,13 @@ async def validate_authorization_code(code: str) -> Optional[Dict[str, Any]]:
     return await service.validate_authorization_code(code)
 
 
+async def consume_authorization_code(code: str) -> Optional[Dict[str, Any]]:
+    """Redeem an authorization code, deleting it so it cannot be replayed."""
+    storage = await get_storage_service()
+    service = OAuthService(storage)
+    return await service.consume_authorization_code(code)
+
+
 async def mark_code_as_used(code: str) -> None:
     """Mark authorization code as used by deleting it from storage."""
     storage = await get_storage_service()
@@ -352,6 +366,20 @@ async def store_refresh_token(token: str, token_data: Dict[str, Any]) -> bool:
     return await service.store_refresh_token(token, token_data)
 
 
+async def store_token_pair(
+    access_token: str,
+    access_data: Dict[str, Any],
+    refresh_token: str,
+    refresh_data: Dict[str, Any],
+) -> bool:
+    """Store an access token together with its refresh token."""
+    storage = await get_storage_service()
+    service = OAuthService(storage)
+    return await service.store_token_pair(
+        access_token, access_data, refresh_token, refresh_data
+    )
+
+
 async def retrieve_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     """Retrieve a refresh token."""
     storage = await get_storage_service()
@@ -380,11 +408,26 @@ async def get_storage_status() -> Dict[str, Any]:
     return await service.get_storage_status()
 
 
-async def initialize_storage() -> StorageService:
+def get_worker_pool_limits() -> Tuple[int, int]:
+    """Get this worker's share of the PostgreSQL connection budget.
+
+    POSTGRES_POOL_SIZE and POSTGRES_MAX_CONNECTIONS are totals for the whole
+    server; with MCP_WORKERS processes each pool gets an equal fraction.
+
+    Returns:
+        Tuple[int, int]: Minimum and maximum pool size for this worker
+    """
+    workers = max(1, settings.MCP_WORKERS)
+    max_connections = max(1, settings.POSTGRES_MAX_CONNECTIONS // workers)
+    pool_size = min(max(1, settings.POSTGRES_POOL_SIZE // workers), max_connections)
+    return pool_size, max_connections
+
+
+async def initialize_storage() -> StorageBackend:
     """Initialize the storage service. Call this during application startup.
 
     Returns:
-        StorageService: The initialized storage service
+        StorageBackend: The initialized storage service
 
     Raises:
         ValueError: If PostgreSQL configuration is missing
@@ -396,6 +439,16 @@ async def initialize_storage() -> StorageService:
         logger.warning("Storage service already initialized")
         return _storage_service
 
+    if settings.STORAGE_BACKEND == "memory":
+        logger.info("Initializing in-memory storage service")
+        _storage_service = InMemoryStorageService(
+            snapshot_path=settings.MEMORY_STORAGE_SNAPSHOT_PATH,
+            snapshot_interval=settings.MEMORY_STORAGE_SNAPSHOT_INTERVAL_SECONDS,
+            token_storage_mode=settings.TOKEN_STORAGE_MODE,
+        )
+        await _storage_service.connect()
+        return _storage_service
+
     logger.info("Initializing PostgreSQL storage service")
 
     # Validate required configuration
@@ -421,6 +474,8 @@ async def initialize_storage() -> StorageService:
             f"Missing required PostgreSQL configuration: {', '.join(missing)}"
         )
 
+    pool_size, max_connections = get_worker_pool_limits()
+
     # Create and connect storage service
     # Type assertions are safe here because we validated required fields above
     _storage_service = StorageService(
@@ -431,8 +486,20 @@ async def initialize_storage() -> StorageService:
         database=str(settings.POSTGRES_DB),
         username=str(settings.POSTGRES_USER),
         password=settings.POSTGRES_PASSWORD or "",
-        pool_size=settings.POSTGRES_POOL_SIZE,
-        max_connections=settings.POSTGRES_MAX_CONNECTIONS,
+        pool_size=pool_size,
+        max_connections=max_connections,
+        client_cache_ttl=settings.CLIENT_CACHE_TTL_SECONDS,
+        client_cache_max_entries=settings.CLIENT_CACHE_MAX_ENTRIES,
+        token_storage_mode=settings.TOKEN_STORAGE_MODE,
+        read_replica_dsns=settings.POSTGRES_READ_REPLICA_DSNS,
+        replica_max_lag=settings.POSTGRES_REPLICA_MAX_LAG_SECONDS,
+        replica_lag_check_interval=settings.POSTGRES_REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+        auto_migrate=settings.POSTGRES_AUTO_MIGRATE,
+        adaptive_pool=settings.POSTGRES_POOL_ADAPTIVE,
+        adaptive_pool_wait_threshold=settings.POSTGRES_POOL_ADAPTIVE_WAIT_THRESHOLD_MS
+        / 1000,
+        adaptive_pool_interval=settings.POSTGRES_POOL_ADAPTIVE_INTERVAL_SECONDS,
+        pool_acquire_timeout=settings.POSTGRES_POOL_ACQUIRE_TIMEOUT_SECONDS,
     )
     await _storage_service.connect()
     logger.info("PostgreSQL storage service initialized successfully")
@@ -444,7 +511,7 @@ async def cleanup_storage() -> None:
     """Cleanup storage service. Call this during application shutdown."""
     global _storage_service
     if _storage_service is not None:
-        logger.info("Disconnecting from PostgreSQL...")
+        logger.info("Disconnecting storage service...")
         await _storage_service.disconnect()
         _storage_service = None
         logger.info("Storage service cleanup complete")
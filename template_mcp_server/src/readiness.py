@@ -0,0 +1,156 @@
+"""Readiness monitoring for the Template MCP server.
+
+This module checks the server's dependencies, such as the storage pool and
+the SSO server, from a background task and caches the outcome so the
+``/ready`` endpoint can answer probes without touching them.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from template_mcp_server.src.settings import settings
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+ReadinessCheck = Callable[[], Awaitable[bool]]
+
+# Background readiness monitor, managed by the app lifespan
+_readiness_monitor: Optional["ReadinessMonitor"] = None
+
+
+class ReadinessMonitor:
+    """Run dependency checks on an interval and cache their results."""
+
+    def __init__(
+        self,
+        checks: Dict[str, ReadinessCheck],
+        interval: float = 10.0,
+        timeout: float = 3.0,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            checks: Named async callables returning True when healthy
+            interval: Seconds between check rounds
+            timeout: Seconds before a single check counts as failed
+        """
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Return True once a check round has passed for every dependency."""
+        return self.checked_at is not None and all(
+            result["healthy"] for result in self.results.values()
+        )
+
+    async def _run_check(self, name: str, check: ReadinessCheck) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            healthy = bool(await asyncio.wait_for(check(), self.timeout))
+            error = None
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timed out after {self.timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+
+        result: Dict[str, Any] = {
+            "healthy": healthy,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    async def check(self) -> bool:
+        """Run all checks concurrently and store their results.
+
+        Returns:
+            bool: True if every dependency is healthy
+        """
+        was_ready = self.is_ready
+        names = list(self.checks)
+        results = await asyncio.gather(
+            *(self._run_check(name, self.checks[name]) for name in names)
+        )
+        self.results = dict(zip(names, results))
+        self.checked_at = time.time()
+
+        if self.is_ready != was_ready:
+            failing = [name for name, r in self.results.items() if not r["healthy"]]
+            if self.is_ready:
+                logger.info("Readiness checks passing")
+            else:
+                logger.warning(f"Readiness checks failing: {failing}")
+        return self.is_ready
+
+    def status(self) -> Dict[str, Any]:
+        """Return the cached readiness status for the /ready endpoint."""
+        return {
+            "status": "ready" if self.is_ready else "not_ready",
+            "checked_at": self.checked_at,
+            "checks": self.results,
+        }
+
+    async def _check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def start(self) -> None:
+        """Run a first round of checks and keep checking in the background."""
+        await self.check()
+        if self._task is None:
+            self._task = asyncio.create_task(self._check_loop())
+
+    async def stop(self) -> None:
+        """Stop the background checks."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def get_readiness_monitor() -> Optional[ReadinessMonitor]:
+    """Get the readiness monitor, or None before startup."""
+    return _readiness_monitor
+
+
+async def initialize_readiness_monitor(
+    checks: Dict[str, ReadinessCheck],
+) -> ReadinessMonitor:
+    """Start monitoring the given checks. Call this during application startup."""
+    global _readiness_monitor
+    if _readiness_monitor is not None:
+        await _readiness_monitor.stop()
+
+    _readiness_monitor = ReadinessMonitor(
+        checks,
+        interval=settings.READINESS_CHECK_INTERVAL_SECONDS,
+        timeout=settings.READINESS_CHECK_TIMEOUT_SECONDS,
+    )
+    await _readiness_monitor.start()
+    logger.info(
+        "Readiness monitor started",
+        checks=list(checks),
+        ready=_readiness_monitor.is_ready,
+    )
+    return _readiness_monitor
+
+
+async def cleanup_readiness_monitor() -> None:
+    """Stop the readiness monitor. Call this during application shutdown."""
+    global _readiness_monitor
+    if _readiness_monitor is not None:
+        await _readiness_monitor.stop()
+        _readiness_monitor = None
+        logger.info("Readiness monitor stopped")
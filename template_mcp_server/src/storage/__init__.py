@@ -1 +1 @@
-"""PostgreSQL storage service for the Template MCP Server."""
+"""PostgreSQL storage service and in-memory backend for the Template MCP Server."""
@@ -0,0 +1,53 @@
+"""JSONB type codecs for the PostgreSQL storage service.
+
+JSONB columns are exchanged with PostgreSQL in its binary format and
+decoded straight into Python objects, so callers pass and receive lists and
+dicts instead of JSON strings. orjson is used when installed (the
+``performance`` extra), falling back to the standard library.
+"""
+
+import json
+from typing import Any, Callable
+
+import asyncpg
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+# Binary JSONB values are the JSON text prefixed with a format version byte
+JSONB_FORMAT_VERSION = b"\x01"
+
+json_loads: Callable[[bytes], Any]
+json_dumps: Callable[[Any], bytes]
+
+if orjson is not None:
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+else:
+    json_loads = json.loads
+
+    def json_dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a Python value as a binary JSONB parameter."""
+    return JSONB_FORMAT_VERSION + json_dumps(value)
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode a binary JSONB column into a Python value."""
+    return json_loads(data[1:])
+
+
+async def register_json_codecs(conn: asyncpg.Connection) -> None:
+    """Register the JSONB codec on a connection."""
+    await conn.set_type_codec(
+        "jsonb",
+        schema="pg_catalog",
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        format="binary",
+    )
@@ -0,0 +1,569 @@
+"""In-process storage backend for single-node and test deployments.
+
+``InMemoryStorageService`` has the same interface as ``StorageService`` but
+keeps clients, authorization codes and tokens in dicts owned by the
+process, so no request waits on a database round trip. Codes and tokens are
+also pushed onto per-table expiry heaps; expired entries are purged in
+expiry order on every write instead of by the expired-row reaper.
+
+State is lost when the process exits unless a snapshot path is set. The
+snapshot is loaded on connect and written on disconnect and, optionally, on
+an interval. Every process has its own state, so the backend is only
+suitable for a single worker.
+"""
+
+import asyncio
+import copy
+import heapq
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from template_mcp_server.src.storage.codecs import json_dumps, json_loads
+from template_mcp_server.src.storage.storage_service import TokenPair, token_digest
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+# Tables whose rows carry an expires_at and are purged once it passes
+EXPIRING_TABLES = ("authorization_codes", "access_tokens", "refresh_tokens")
+
+# Bumped whenever the snapshot layout changes incompatibly
+SNAPSHOT_VERSION = 1
+
+
+def client_fingerprint(
+    client_name: str, redirect_uris: List[str]
+) -> Tuple[str, Tuple[str, ...]]:
+    """Key clients like ``oauth_client_fingerprint()`` in PostgreSQL.
+
+    The name and the distinct redirect URIs in code point order, which is
+    the byte order of their UTF-8 encoding.
+    """
+    return client_name, tuple(sorted(set(redirect_uris)))
+
+
+def copy_client(client: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a client so callers cannot modify the stored one."""
+    return {
+        **client,
+        "redirect_uris": list(client["redirect_uris"]),
+        "grant_types": list(client["grant_types"]),
+        "response_types": list(client["response_types"]),
+    }
+
+
+class InMemoryStorageService:
+    """Storage service keeping OAuth state in process memory."""
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval: float = 0.0,
+        token_storage_mode: str = "plain",
+    ):
+        """Initialize the storage service.
+
+        Args:
+            snapshot_path: File the state is loaded from and saved to, or
+                None to keep it in memory only
+            snapshot_interval: Seconds between periodic snapshots (0 saves
+                only on disconnect)
+            token_storage_mode: "plain" keys codes and tokens by their raw
+                value, "sha256" by a hex digest of it
+        """
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.token_storage_mode = token_storage_mode
+        self.connected = False
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        """Drop every client, code and token."""
+        self.clients: Dict[str, Dict[str, Any]] = {}
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {
+            table: {} for table in EXPIRING_TABLES
+        }
+        # Earliest client per fingerprint, and the exact name and URI list
+        # pairs the PostgreSQL unique constraint rejects duplicates of
+        self._clients_by_fingerprint: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._client_names: Set[Tuple[str, Tuple[str, ...]]] = set()
+        # (expires_at, key) per table; stale entries are skipped when popped
+        self._expiry: Dict[str, List[Tuple[float, str]]] = {
+            table: [] for table in EXPIRING_TABLES
+        }
+        # Refresh tokens referencing each access token, for ON DELETE SET NULL
+        self._refresh_tokens_by_access_token: Dict[str, Set[str]] = {}
+
+    async def connect(self) -> None:
+        """Load the snapshot, if any, and start periodic snapshots."""
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            data = await asyncio.to_thread(self._read_snapshot)
+            self._restore(data)
+            logger.info(f"Loaded storage snapshot from {self.snapshot_path}")
+
+        self.connected = True
+        if self.snapshot_path and self.snapshot_interval > 0:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+        logger.info("Using in-memory storage")
+
+    async def disconnect(self) -> None:
+        """Stop periodic snapshots and save a final one."""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+
+        if self.connected and self.snapshot_path:
+            await self.save_snapshot()
+        self.connected = False
+
+    async def is_healthy(self) -> bool:
+        """Check whether the storage service is connected."""
+        return self.connected
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get storage service status."""
+        status: Dict[str, Any] = {
+            "type": "memory",
+            "healthy": self.connected,
+            "snapshot_path": self.snapshot_path,
+            "clients": len(self.clients),
+        }
+        for table, rows in self.tables.items():
+            status[table] = len(rows)
+        return status
+
+    def _key(self, value: str) -> str:
+        """Return the stored key for a code or token in the current mode."""
+        if self.token_storage_mode != "sha256":
+            return value
+        return token_digest(value).hex()
+
+    # Snapshots
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        assert self.snapshot_path is not None
+        with open(self.snapshot_path, "rb") as f:
+            return json_loads(f.read())
+
+    def _write_snapshot(self, data: bytes) -> None:
+        assert self.snapshot_path is not None
+        # Write beside the target and rename, so a crash never leaves a
+        # truncated snapshot behind
+        tmp_path = f"{self.snapshot_path}.tmp"
+        # Owner-only: the snapshot holds client secrets and, keyed plainly,
+        # raw tokens. fchmod also covers a temp file left by a crash.
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def save_snapshot(self) -> None:
+        """Write the current state to the snapshot file."""
+        self._purge_expired()
+        # Serialized on the event loop so the snapshot is consistent
+        data = json_dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "token_storage_mode": self.token_storage_mode,
+                "clients": list(self.clients.values()),
+                "tables": self.tables,
+            }
+        )
+        await asyncio.to_thread(self._write_snapshot, data)
+        logger.debug(f"Saved storage snapshot to {self.snapshot_path}")
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await self.save_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to save storage snapshot: {e}")
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        """Replace the current state with a loaded snapshot."""
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise RuntimeError(
+                f"Unsupported storage snapshot version: {data.get('version')}"
+            )
+
+        tables = data["tables"]
+        snapshot_mode = data.get("token_storage_mode", "plain")
+        if snapshot_mode != self.token_storage_mode:
+            if self.token_storage_mode != "sha256":
+                raise RuntimeError(
+                    "Storage snapshot keys codes and tokens by SHA-256 digest; "
+                    "set TOKEN_STORAGE_MODE=sha256"
+                )
+            # Same one-way conversion as the PostgreSQL migration
+            tables = {
+                table: {self._key(key): row for key, row in rows.items()}
+                for table, rows in tables.items()
+            }
+            for row in tables["refresh_tokens"].values():
+                if row["access_token"] is not None:
+                    row["access_token"] = self._key(row["access_token"])
+            logger.info("Converted storage snapshot to SHA-256 keys")
+
+        self._clear()
+        for client in data["clients"]:
+            self._add_client(client)
+        for table in EXPIRING_TABLES:
+            rows = tables.get(table, {})
+            self.tables[table] = rows
+            self._expiry[table] = [
+                (row["expires_at"], key) for key, row in rows.items()
+            ]
+            heapq.heapify(self._expiry[table])
+        for key, row in self.tables["refresh_tokens"].items():
+            if row["access_token"] is not None:
+                self._refresh_tokens_by_access_token.setdefault(
+                    row["access_token"], set()
+                ).add(key)
+        self._purge_expired()
+
+    # Expiry
+
+    def _add_expiring(self, table: str, key: str, row: Dict[str, Any]) -> bool:
+        rows = self.tables[table]
+        if key in rows:
+            logger.error(f"Duplicate key in {table}")
+            return False
+        rows[key] = row
+        heapq.heappush(self._expiry[table], (row["expires_at"], key))
+        return True
+
+    def _remove(self, table: str, key: str) -> Optional[Dict[str, Any]]:
+        row = self.tables[table].pop(key, None)
+        if row is None:
+            return None
+
+        if table == "access_tokens":
+            for refresh_key in self._refresh_tokens_by_access_token.pop(key, ()):
+                self.tables["refresh_tokens"][refresh_key]["access_token"] = None
+        elif table == "refresh_tokens" and row["access_token"] is not None:
+            referencing = self._refresh_tokens_by_access_token.get(row["access_token"])
+            if referencing is not None:
+                referencing.discard(key)
+                if not referencing:
+                    del self._refresh_tokens_by_access_token[row["access_token"]]
+        return row
+
+    def _purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete every code and token that has expired.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        now = time.time() if now is None else now
+        purged = 0
+        for table in EXPIRING_TABLES:
+            heap = self._expiry[table]
+            rows = self.tables[table]
+            while heap and heap[0][0] < now:
+                expires_at, key = heapq.heappop(heap)
+                row = rows.get(key)
+                # Skip entries whose row was deleted or replaced since
+                if row is not None and row["expires_at"] == expires_at:
+                    self._remove(table, key)
+                    purged += 1
+        return purged
+
+    # Clients
+
+    def _add_client(self, client: Dict[str, Any]) -> bool:
+        name_key = (client["name"], tuple(client["redirect_uris"]))
+        if client["id"] in self.clients or name_key in self._client_names:
+            logger.error(f"Duplicate client: {client['id']}")
+            return False
+
+        self.clients[client["id"]] = client
+        self._client_names.add(name_key)
+        self._clients_by_fingerprint.setdefault(
+            client_fingerprint(client["name"], client["redirect_uris"]), client["id"]
+        )
+        return True
+
+    def _new_client(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": client_data["id"],
+            "secret": client_data["secret"],
+            "name": client_data["name"],
+            "redirect_uris": list(client_data["redirect_uris"]),
+            "grant_types": list(client_data["grant_types"]),
+            "response_types": list(client_data["response_types"]),
+            "scope": client_data["scope"],
+            "created_at": time.time(),
+        }
+
+    async def get_client_by_name_and_redirect_uris(
+        self, client_name: str, redirect_uris: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Find an existing client by name and redirect URIs."""
+        if not self.connected:
+            return None
+
+        client_id = self._clients_by_fingerprint.get(
+            client_fingerprint(client_name, redirect_uris)
+        )
+        return copy_client(self.clients[client_id]) if client_id else None
+
+    async def store_client(self, client_data: Dict[str, Any]) -> bool:
+        """Store a new OAuth client."""
+        if not self.connected:
+            return False
+
+        if not self._add_client(self._new_client(client_data)):
+            return False
+        logger.info(f"Storing client: {client_data['id']}")
+        return True
+
+    async def upsert_client(
+        self, client_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Store a client unless one with the same name and redirect URIs exists.
+
+        Returns:
+            Optional[Dict[str, Any]]: The new or existing client, with
+            ``inserted`` telling which, or None on failure
+        """
+        existing = await self.get_client_by_name_and_redirect_uris(
+            client_data["name"], client_data["redirect_uris"]
+        )
+        if existing is not None:
+            return {**existing, "inserted": False}
+
+        client = self._new_client(client_data)
+        if not self.connected or not self._add_client(client):
+            return None
+        return {**copy_client(client), "inserted": True}
+
+    async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Get a client by ID."""
+        if not self.connected:
+            return None
+
+        client = self.clients.get(client_id)
+        return copy_client(client) if client else None
+
+    # Authorization codes
+
+    async def store_authorization_code(
+        self, code: str, code_data: Dict[str, Any]
+    ) -> bool:
+        """Store an authorization code."""
+        if not self.connected:
+            return False
+        if code_data["client_id"] not in self.clients:
+            logger.error(
+                f"Unknown client for authorization code: {code_data['client_id']}"
+            )
+            return False
+
+        self._purge_expired()
+        return self._add_expiring(
+            "authorization_codes",
+            self._key(code),
+            {
+                "client_id": code_data["client_id"],
+                "redirect_uri": code_data["redirect_uri"],
+                "scope": code_data.get("scope"),
+                "code_challenge": code_data["code_challenge"],
+                "code_challenge_method": code_data["code_challenge_method"],
+                "snowflake_token": None,
+                "expires_at": float(code_data["expires_at"]),
+                "state": code_data["state"],
+            },
+        )
+
+    async def get_authorization_code(self, code: str) -> Optional[Dict[str, Any]]:
+        """Get authorization code data."""
+        if not self.connected:
+            return None
+
+        row = self.tables["authorization_codes"].get(self._key(code))
+        return copy.deepcopy(row) if row else None
+
+    async def update_authorization_code_token(
+        self, code: str, snowflake_token: Dict[str, Any]
+    ) -> bool:
+        """Update authorization code with Snowflake token."""
+        if not self.connected:
+            return False
+
+        row = self.tables["authorization_codes"].get(self._key(code))
+        if row is not None:
+            row["snowflake_token"] = copy.deepcopy(snowflake_token)
+        return True
+
+    async def consume_authorization_code(self, code: str) -> Optional[Dict[str, Any]]:
+        """Delete an unexpired authorization code and return its data."""
+        if not self.connected:
+            return None
+
+        key = self._key(code)
+        row = self.tables["authorization_codes"].get(key)
+        if row is None or row["expires_at"] <= time.time():
+            return None
+        return self._remove("authorization_codes", key)
+
+    async def delete_authorization_code(self, code: str) -> bool:
+        """Delete an authorization code."""
+        if not self.connected:
+            return False
+
+        return self._remove("authorization_codes", self._key(code)) is not None
+
+    # Access tokens
+
+    async def store_access_token(self, token: str, token_data: Dict[str, Any]) -> bool:
+        """Store an access token."""
+        if not self.connected:
+            return False
+        if token_data["client_id"] not in self.clients:
+            logger.error(f"Unknown client for access token: {token_data['client_id']}")
+            return False
+
+        self._purge_expired()
+        return self._add_expiring(
+            "access_tokens",
+            self._key(token),
+            {
+                "client_id": token_data["client_id"],
+                "scope": token_data.get("scope"),
+                "token_type": "Bearer",
+                "expires_at": float(token_data["expires_at"]),
+            },
+        )
+
+    async def get_access_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get access token data."""
+        if not self.connected:
+            return None
+
+        row = self.tables["access_tokens"].get(self._key(token))
+        return dict(row) if row else None
+
+    async def delete_access_token(self, token: str) -> bool:
+        """Delete an access token."""
+        if not self.connected:
+            return False
+
+        return self._remove("access_tokens", self._key(token)) is not None
+
+    # Refresh tokens
+
+    async def store_refresh_token(self, token: str, token_data: Dict[str, Any]) -> bool:
+        """Store a refresh token."""
+        if not self.connected:
+            return False
+        if token_data["client_id"] not in self.clients:
+            logger.error(f"Unknown client for refresh token: {token_data['client_id']}")
+            return False
+
+        # Purged first, so the reference is never to an access token about
+        # to be purged
+        self._purge_expired()
+        access_token = token_data.get("access_token")
+        if access_token is not None:
+            access_token = self._key(access_token)
+        if (
+            access_token is not None
+            and access_token not in self.tables["access_tokens"]
+        ):
+            logger.error("Unknown access token for refresh token")
+            return False
+
+        key = self._key(token)
+        stored = self._add_expiring(
+            "refresh_tokens",
+            key,
+            {
+                "client_id": token_data["client_id"],
+                "access_token": access_token,
+                "scope": token_data.get("scope"),
+                "expires_at": float(token_data["expires_at"]),
+            },
+        )
+        if stored and access_token is not None:
+            self._refresh_tokens_by_access_token.setdefault(access_token, set()).add(
+                key
+            )
+        return stored
+
+    async def get_refresh_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get refresh token data."""
+        if not self.connected:
+            return None
+
+        row = self.tables["refresh_tokens"].get(self._key(token))
+        return dict(row) if row else None
+
+    async def delete_refresh_token(self, token: str) -> bool:
+        """Delete a refresh token."""
+        if not self.connected:
+            return False
+
+        return self._remove("refresh_tokens", self._key(token)) is not None
+
+    # Token pairs
+
+    async def store_token_pair(
+        self,
+        access_token: str,
+        access_data: Dict[str, Any],
+        refresh_token: str,
+        refresh_data: Dict[str, Any],
+    ) -> bool:
+        """Store an access token and the refresh token issued with it.
+
+        Neither token is stored unless both can be.
+        """
+        if not self.connected:
+            return False
+        if (
+            refresh_data["client_id"] not in self.clients
+            or self._key(refresh_token) in self.tables["refresh_tokens"]
+        ):
+            logger.error("Cannot store refresh token of token pair")
+            return False
+
+        if not await self.store_access_token(access_token, access_data):
+            return False
+        if not await self.store_refresh_token(
+            refresh_token, {**refresh_data, "access_token": access_token}
+        ):
+            self._remove("access_tokens", self._key(access_token))
+            return False
+        return True
+
+    async def bulk_store_token_pairs(self, pairs: Sequence[TokenPair]) -> int:
+        """Store many token pairs, for seeding load tests.
+
+        Like the PostgreSQL COPY, either every pair is stored or none is.
+
+        Returns:
+            int: Number of pairs stored
+        """
+        stored: List[Tuple[str, str]] = []
+        for access_token, access_data, refresh_token, refresh_data in pairs:
+            if not await self.store_token_pair(
+                access_token, access_data, refresh_token, refresh_data
+            ):
+                # Nothing above awaits I/O, so no other task saw these pairs
+                for access_key, refresh_key in stored:
+                    self._remove("refresh_tokens", refresh_key)
+                    self._remove("access_tokens", access_key)
+                logger.error("Failed to bulk store token pairs")
+                return 0
+            stored.append((self._key(access_token), self._key(refresh_token)))
+        return len(stored)
@@ -0,0 +1,370 @@
+"""Versioned schema migrations for the PostgreSQL storage service.
+
+The schema is built by numbered migrations, each applied once and recorded
+in the ``schema_migrations`` table. They run in one transaction under an
+advisory lock, from the ``template-mcp-server-migrate`` command or, with
+POSTGRES_AUTO_MIGRATE, from the first server started against an outdated
+database. A server whose database is current checks the recorded version
+with a single query and runs no DDL.
+
+Released migrations are never edited; schema changes go in a new one. The
+first three use ``IF NOT EXISTS`` and ``OR REPLACE`` so databases created
+before versioning adopt them unchanged.
+
+Usage:
+    template-mcp-server-migrate [--check]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+
+import asyncpg
+
+from template_mcp_server.src.settings import settings
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+# Channel notified by the oauth_clients trigger with the changed client_id
+CLIENT_CHANGES_CHANNEL = "oauth_clients_changed"
+
+# Serializes migrations across servers and the CLI: "mcp_migr" as 64 bits
+MIGRATION_LOCK_KEY = 0x6D63705F6D696772
+
+
+class Migration(NamedTuple):
+    """A numbered schema change."""
+
+    version: int
+    description: str
+    statements: Tuple[str, ...]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "OAuth tables and expiry indexes",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS oauth_clients (
+                client_id VARCHAR(255) PRIMARY KEY,
+                client_secret VARCHAR(255) NOT NULL,
+                client_name VARCHAR(255) NOT NULL,
+                redirect_uris JSONB NOT NULL,
+                grant_types JSONB NOT NULL,
+                response_types JSONB NOT NULL,
+                scope VARCHAR(255) NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+                -- Unique constraint for client name + redirect URIs combination
+                CONSTRAINT unique_client_name_redirect UNIQUE (client_name, redirect_uris)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS oauth_authorization_codes (
+                code VARCHAR(255) PRIMARY KEY,
+                client_id VARCHAR(255) NOT NULL,
+                redirect_uri VARCHAR(500) NOT NULL,
+                scope VARCHAR(255),
+                code_challenge VARCHAR(255) NOT NULL,
+                code_challenge_method VARCHAR(10) NOT NULL,
+                snowflake_token JSONB,
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                state VARCHAR(255),
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+                FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS oauth_access_tokens (
+                token VARCHAR(255) PRIMARY KEY,
+                client_id VARCHAR(255) NOT NULL,
+                scope VARCHAR(255),
+                token_type VARCHAR(50) DEFAULT 'Bearer',
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+                FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS oauth_refresh_tokens (
+                token VARCHAR(255) PRIMARY KEY,
+                client_id VARCHAR(255) NOT NULL,
+                access_token VARCHAR(255),
+                scope VARCHAR(255),
+                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+                FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE,
+                FOREIGN KEY (access_token) REFERENCES oauth_access_tokens(token) ON DELETE SET NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_auth_codes_expires ON oauth_authorization_codes (expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_access_tokens_expires ON oauth_access_tokens (expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires ON oauth_refresh_tokens (expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_client_name ON oauth_clients (client_name)",
+        ),
+    ),
+    Migration(
+        2,
+        "Indexed client name and redirect URI fingerprint",
+        (
+            # SHA-256 over the name and the distinct URIs in byte order, so
+            # the order and duplicates in the registration request do not
+            # matter
+            """
+            CREATE OR REPLACE FUNCTION oauth_client_fingerprint(name TEXT, uris JSONB)
+            RETURNS BYTEA
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE
+            AS $$
+                SELECT sha256(convert_to(
+                    name || E'\\n' || COALESCE((
+                        SELECT string_agg(DISTINCT uri COLLATE "C", E'\\n'
+                                          ORDER BY uri COLLATE "C")
+                        FROM jsonb_array_elements_text(uris) AS uri
+                    ), ''),
+                    'UTF8'
+                ))
+            $$
+            """,
+            """
+            ALTER TABLE oauth_clients
+            ADD COLUMN IF NOT EXISTS client_fingerprint BYTEA
+            GENERATED ALWAYS AS (oauth_client_fingerprint(client_name, redirect_uris)) STORED
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_client_fingerprint ON oauth_clients (client_fingerprint)",
+        ),
+    ),
+    Migration(
+        3,
+        "Notify client caches when a client changes",
+        (
+            f"""
+            CREATE OR REPLACE FUNCTION notify_oauth_client_change()
+            RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{CLIENT_CHANGES_CHANNEL}', OLD.client_id);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS oauth_clients_notify ON oauth_clients",
+            "DROP TRIGGER IF EXISTS oauth_clients_notify_update ON oauth_clients",
+            "DROP TRIGGER IF EXISTS oauth_clients_notify_delete ON oauth_clients",
+            # Updates that leave the row unchanged, such as re-registration
+            # upserts, do not notify
+            """
+            CREATE TRIGGER oauth_clients_notify_update
+            AFTER UPDATE ON oauth_clients
+            FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+            EXECUTE FUNCTION notify_oauth_client_change()
+            """,
+            """
+            CREATE TRIGGER oauth_clients_notify_delete
+            AFTER DELETE ON oauth_clients
+            FOR EACH ROW EXECUTE FUNCTION notify_oauth_client_change()
+            """,
+        ),
+    ),
+]
+
+# Version of the schema this code expects
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+SCHEMA_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+"""
+
+# Type of the token key columns: "character varying" (plain) or "bytea" (sha256)
+TOKEN_KEY_TYPE_QUERY = """
+    SELECT data_type FROM information_schema.columns
+    WHERE table_schema = current_schema()
+      AND table_name = 'oauth_access_tokens' AND column_name = 'token'
+"""
+
+# Everything a starting server checks, in one round trip
+SCHEMA_STATE_QUERY = f"""
+    SELECT (SELECT MAX(version) FROM schema_migrations) AS version,
+           ({TOKEN_KEY_TYPE_QUERY}) = 'bytea' AS hashed
+"""
+
+# Replaces raw codes and tokens with their SHA-256 digests, in place. The
+# refresh-token reference to access tokens is rebuilt around the type change.
+# Not a numbered migration: it follows TOKEN_STORAGE_MODE.
+TOKEN_KEY_MIGRATION = """
+    ALTER TABLE oauth_refresh_tokens
+        DROP CONSTRAINT IF EXISTS oauth_refresh_tokens_access_token_fkey;
+    ALTER TABLE oauth_authorization_codes
+        ALTER COLUMN code TYPE BYTEA USING sha256(convert_to(code, 'UTF8'));
+    ALTER TABLE oauth_access_tokens
+        ALTER COLUMN token TYPE BYTEA USING sha256(convert_to(token, 'UTF8'));
+    ALTER TABLE oauth_refresh_tokens
+        ALTER COLUMN token TYPE BYTEA USING sha256(convert_to(token, 'UTF8')),
+        ALTER COLUMN access_token TYPE BYTEA
+            USING sha256(convert_to(access_token, 'UTF8'));
+    ALTER TABLE oauth_refresh_tokens
+        ADD CONSTRAINT oauth_refresh_tokens_access_token_fkey
+        FOREIGN KEY (access_token) REFERENCES oauth_access_tokens(token)
+        ON DELETE SET NULL;
+"""
+
+
+async def get_schema_state(conn: asyncpg.Connection) -> Tuple[Optional[int], bool]:
+    """Return the recorded schema version and whether token keys are hashed.
+
+    Returns:
+        Tuple[Optional[int], bool]: The latest applied migration, None for a
+        database never migrated, and True when keys are SHA-256 digests
+    """
+    try:
+        row = await conn.fetchrow(SCHEMA_STATE_QUERY)
+    except asyncpg.UndefinedTableError:
+        return None, False
+    return row["version"], bool(row["hashed"])
+
+
+def schema_is_current(
+    version: Optional[int], hashed: bool, token_storage_mode: str
+) -> bool:
+    """Check a schema state needs no migration for this code and mode.
+
+    A newer version counts as current: it was applied by a newer release
+    during a rolling upgrade, and migrations only add to the schema.
+    """
+    return (
+        version is not None
+        and version >= SCHEMA_VERSION
+        and hashed == (token_storage_mode == "sha256")
+    )
+
+
+async def apply_token_storage_mode(
+    conn: asyncpg.Connection, token_storage_mode: str
+) -> None:
+    """Match the token key columns to the token storage mode.
+
+    Switching to sha256 converts existing rows in place. The conversion
+    cannot be reversed, so plain mode refuses to run against hashed keys.
+    Must run inside the migration transaction.
+    """
+    hashed = await conn.fetchval(TOKEN_KEY_TYPE_QUERY) == "bytea"
+    if token_storage_mode != "sha256":
+        if hashed:
+            raise RuntimeError(
+                "Codes and tokens are stored as SHA-256 digests; "
+                "set TOKEN_STORAGE_MODE=sha256"
+            )
+        return
+    if not hashed:
+        await conn.execute(TOKEN_KEY_MIGRATION)
+        logger.info("Migrated codes and tokens to SHA-256 keys")
+
+
+async def migrate(
+    conn: asyncpg.Connection, token_storage_mode: str = "plain"
+) -> List[int]:
+    """Apply pending migrations and the token storage mode.
+
+    Everything runs in one transaction holding the migration lock, so
+    servers and the CLI starting together apply each migration once, and a
+    failed migration leaves the schema as it was.
+
+    Returns:
+        List[int]: Versions applied, in order
+    """
+    applied = []
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_KEY)
+        await conn.execute(SCHEMA_MIGRATIONS_TABLE)
+        current = await conn.fetchval(
+            "SELECT COALESCE(MAX(version), 0) FROM schema_migrations"
+        )
+
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            for statement in migration.statements:
+                await conn.execute(statement)
+            await conn.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES ($1, $2)",
+                migration.version,
+                migration.description,
+            )
+            logger.info(
+                f"Applied schema migration {migration.version}: {migration.description}"
+            )
+            applied.append(migration.version)
+
+        await apply_token_storage_mode(conn, token_storage_mode)
+    return applied
+
+
+async def run(check: bool = False) -> int:
+    """Migrate the database configured in the settings.
+
+    Args:
+        check: Only report whether migrations are pending
+
+    Returns:
+        int: Exit status, 1 when checking finds the schema out of date
+    """
+    conn = await asyncpg.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        version, hashed = await get_schema_state(conn)
+        if check:
+            if schema_is_current(version, hashed, settings.TOKEN_STORAGE_MODE):
+                logger.info(f"Schema is current at version {version}")
+                return 0
+            logger.warning(
+                f"Schema is at version {version or 0}, expected {SCHEMA_VERSION} "
+                f"with {settings.TOKEN_STORAGE_MODE} token keys"
+            )
+            return 1
+
+        applied = await migrate(conn, settings.TOKEN_STORAGE_MODE)
+        if applied:
+            logger.info(f"Schema migrated to version {applied[-1]}")
+        else:
+            logger.info("Schema already current")
+        return 0
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    """Entry point of the template-mcp-server-migrate command."""
+    parser = argparse.ArgumentParser(
+        prog="template-mcp-server-migrate",
+        description="Apply pending database schema migrations.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report whether migrations are pending; exit 1 if they are",
+    )
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(run(args.check)))
+    except Exception as e:
+        logger.critical(f"Schema migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
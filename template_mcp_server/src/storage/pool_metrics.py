@@ -0,0 +1,255 @@
+"""Connection pool instrumentation and adaptive sizing.
+
+Every connection the storage service takes from a pool goes through a
+``PoolMonitor``, which records how long the acquire waited, how long each
+named query ran, and how many of either timed out. Together with the
+pool's own in-use and idle counts, that tells pool exhaustion apart from
+slow queries when requests slow down.
+
+With adaptive sizing, an ``AdaptiveLimiter`` caps how many connections can
+be in use at once. The cap starts at the pool's maximum size, so a burst
+right after startup is served as without the limiter, shrinks toward the
+minimum while most of it sits unused, and grows back while acquires keep
+waiting. Connections above the cap go idle and are closed by asyncpg's
+inactivity timeout.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import asyncpg
+
+from template_mcp_server.utils.metrics import LatencyHistogram
+
+
+class AdaptiveLimiter:
+    """Semaphore whose limit can change while tasks hold or await it.
+
+    Waiters are served in arrival order. Lowering the limit does not affect
+    holders; new acquires wait until the count drops below the new limit.
+    """
+
+    def __init__(self, limit: int, min_limit: int, max_limit: int):
+        """Initialize the limiter.
+
+        Args:
+            limit: Initial number of concurrent holders
+            min_limit: Lowest limit resizing may set
+            max_limit: Highest limit resizing may set
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(limit, max_limit))
+        self.in_use = 0
+        # Highest in_use since the last resize decision
+        self.peak_in_use = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of tasks waiting to acquire."""
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """Wait for a free slot and take it.
+
+        Raises:
+            asyncio.TimeoutError: If no slot was free within ``timeout``
+                seconds
+        """
+        if self.in_use < self.limit and not self._waiters:
+            self._take()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        # Only cancelled waiters may be ahead of this one
+        self._wake()
+        try:
+            if timeout is None:
+                await waiter
+            else:
+                await asyncio.wait_for(waiter, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait was cancelled or timed out
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next waiter if any."""
+        self.in_use -= 1
+        self._wake()
+
+    def resize(self, limit: int) -> None:
+        """Change the limit within its bounds, waking waiters it admits."""
+        self.limit = max(self.min_limit, min(limit, self.max_limit))
+        self._wake()
+
+    def _take(self) -> None:
+        self.in_use += 1
+        if self.in_use > self.peak_in_use:
+            self.peak_in_use = self.in_use
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+
+class PoolMonitor:
+    """Acquire and query metrics of one connection pool."""
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        """Initialize with empty metrics.
+
+        Args:
+            limiter: Cap on connections in use, for adaptive sizing
+            acquire_timeout: Seconds an acquire may wait, for the limiter and
+                the pool together; None waits indefinitely
+        """
+        self.limiter = limiter
+        self.acquire_timeout = acquire_timeout
+        self.acquire_wait = LatencyHistogram()
+        self.acquire_timeouts = 0
+        self.queries: Dict[str, LatencyHistogram] = {}
+        self.query_timeouts = 0
+        # Acquire wait totals at the last resize decision
+        self._adapted_count = 0
+        self._adapted_seconds = 0.0
+
+    def acquire(self, pool: asyncpg.Pool) -> "_MonitoredAcquire":
+        """Take a connection from the pool, timing the wait.
+
+        Used as ``async with monitor.acquire(pool) as conn``. Raises
+        ``asyncio.TimeoutError`` when no connection was free within the
+        acquire timeout.
+        """
+        return _MonitoredAcquire(self, pool)
+
+    def query(self, name: str) -> "_TimedQuery":
+        """Time a named query, counting it if it times out.
+
+        Used as ``with monitor.query(name)`` around the awaited call.
+        """
+        return _TimedQuery(self, name)
+
+    def adapt(self, wait_threshold: float) -> None:
+        """Resize the limiter from the acquires since the last call.
+
+        The limit grows, by one plus the number of waiting tasks, when the
+        mean acquire wait reached ``wait_threshold`` seconds. It shrinks by
+        one when no more than half of it was in use at once.
+        """
+        limiter = self.limiter
+        if limiter is None:
+            return
+
+        count = self.acquire_wait.count - self._adapted_count
+        seconds = self.acquire_wait.sum_seconds - self._adapted_seconds
+        self._adapted_count = self.acquire_wait.count
+        self._adapted_seconds = self.acquire_wait.sum_seconds
+
+        if count and seconds / count >= wait_threshold:
+            limiter.resize(limiter.limit + 1 + limiter.waiting)
+        elif limiter.peak_in_use <= limiter.limit // 2:
+            limiter.resize(limiter.limit - 1)
+        limiter.peak_in_use = limiter.in_use
+
+    def metrics(self, pool: Optional[asyncpg.Pool]) -> Dict[str, Any]:
+        """Return pool counts and timings for the /metrics endpoint."""
+        size = pool.get_size() if pool is not None else 0
+        idle = pool.get_idle_size() if pool is not None else 0
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": pool.get_min_size() if pool is not None else None,
+            "max_size": pool.get_max_size() if pool is not None else None,
+            "limit": self.limiter.limit if self.limiter is not None else None,
+            "waiting": self.limiter.waiting if self.limiter is not None else None,
+            "acquire_wait": self.acquire_wait.stats(),
+            "acquire_timeouts": self.acquire_timeouts,
+            "query_timeouts": self.query_timeouts,
+            "queries": {
+                name: histogram.stats()
+                for name, histogram in sorted(self.queries.items())
+            },
+        }
+
+
+class _MonitoredAcquire:
+    """Async context manager behind ``PoolMonitor.acquire``."""
+
+    __slots__ = ("monitor", "pool", "start", "_acquire")
+
+    def __init__(self, monitor: PoolMonitor, pool: asyncpg.Pool):
+        self.monitor = monitor
+        self.pool = pool
+        self.start = 0.0
+        self._acquire: Any = None
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        monitor = self.monitor
+        self.start = time.perf_counter()
+        timeout = monitor.acquire_timeout
+        if monitor.limiter is not None:
+            try:
+                await monitor.limiter.acquire(timeout)
+            except asyncio.TimeoutError:
+                monitor.acquire_timeouts += 1
+                raise
+            if timeout is not None:
+                # The pool gets what the limiter wait left of the timeout
+                timeout = max(timeout - (time.perf_counter() - self.start), 0.0)
+        try:
+            self._acquire = self.pool.acquire(timeout=timeout)
+            conn = await self._acquire.__aenter__()
+        except BaseException as e:
+            if isinstance(e, asyncio.TimeoutError):
+                monitor.acquire_timeouts += 1
+            if monitor.limiter is not None:
+                monitor.limiter.release()
+            raise
+        monitor.acquire_wait.observe(time.perf_counter() - self.start)
+        return conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> Optional[bool]:
+        try:
+            return await self._acquire.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self.monitor.limiter is not None:
+                self.monitor.limiter.release()
+
+
+class _TimedQuery:
+    """Context manager behind ``PoolMonitor.query``."""
+
+    __slots__ = ("monitor", "name", "start")
+
+    def __init__(self, monitor: PoolMonitor, name: str):
+        self.monitor = monitor
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        monitor = self.monitor
+        if exc_type is not None and issubclass(
+            exc_type, (asyncio.TimeoutError, asyncpg.QueryCanceledError)
+        ):
+            monitor.query_timeouts += 1
+        histogram = monitor.queries.get(self.name)
+        if histogram is None:
+            histogram = monitor.queries[self.name] = LatencyHistogram()
+        histogram.observe(time.perf_counter() - self.start)
@@ -0,0 +1,208 @@
+"""Named SQL statements for the PostgreSQL storage service.
+
+Every query the storage service runs on a request path is registered here
+by name. Lookups alias their columns to the keys the service returns and
+report timestamps as epoch seconds, so a record maps directly to a dict.
+Connections created by the pool prepare them once, when the connection is
+opened, and keep them for the connection's lifetime.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+QUERIES: Dict[str, str] = {
+    # Clients
+    "get_client": """
+        SELECT client_id AS id, client_secret AS secret, client_name AS name,
+               redirect_uris, grant_types, response_types, scope,
+               EXTRACT(EPOCH FROM created_at)::float8 AS created_at
+        FROM oauth_clients
+        WHERE client_id = $1
+    """,
+    "get_client_by_name_and_redirect_uris": """
+        SELECT client_id AS id, client_secret AS secret, client_name AS name,
+               redirect_uris, grant_types, response_types, scope,
+               EXTRACT(EPOCH FROM created_at)::float8 AS created_at
+        FROM oauth_clients
+        WHERE client_fingerprint = oauth_client_fingerprint($1, $2)
+        ORDER BY created_at
+        LIMIT 1
+    """,
+    "store_client": """
+        INSERT INTO oauth_clients
+        (client_id, client_secret, client_name, redirect_uris, grant_types, response_types, scope)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    """,
+    # Returns the client registered earlier under the same name and redirect
+    # URI set, in any order, or inserts a new one. Exact duplicates racing
+    # each other meet in ON CONFLICT; its no-op update leaves the row
+    # unchanged, so the change trigger does not fire.
+    "upsert_client": """
+        WITH existing AS (
+            SELECT client_id AS id, client_secret AS secret, client_name AS name,
+                   redirect_uris, grant_types, response_types, scope,
+                   EXTRACT(EPOCH FROM created_at)::float8 AS created_at,
+                   false AS inserted
+            FROM oauth_clients
+            WHERE client_fingerprint = oauth_client_fingerprint($3::varchar, $4::jsonb)
+            ORDER BY created_at
+            LIMIT 1
+        ), upserted AS (
+            INSERT INTO oauth_clients
+            (client_id, client_secret, client_name, redirect_uris, grant_types, response_types, scope)
+            SELECT $1::varchar, $2::varchar, $3::varchar, $4::jsonb, $5::jsonb,
+                   $6::jsonb, $7::varchar
+            WHERE NOT EXISTS (SELECT 1 FROM existing)
+            ON CONFLICT (client_name, redirect_uris)
+            DO UPDATE SET client_name = EXCLUDED.client_name
+            RETURNING client_id AS id, client_secret AS secret, client_name AS name,
+                      redirect_uris, grant_types, response_types, scope,
+                      EXTRACT(EPOCH FROM created_at)::float8 AS created_at,
+                      (xmax = 0) AS inserted
+        )
+        SELECT * FROM existing
+        UNION ALL
+        SELECT * FROM upserted
+    """,
+    # Authorization codes
+    "store_authorization_code": """
+        INSERT INTO oauth_authorization_codes
+        (code, client_id, redirect_uri, scope, code_challenge, code_challenge_method, expires_at, state)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+    """,
+    "get_authorization_code": """
+        SELECT client_id, redirect_uri, scope, code_challenge,
+               code_challenge_method, snowflake_token,
+               EXTRACT(EPOCH FROM expires_at)::float8 AS expires_at, state
+        FROM oauth_authorization_codes
+        WHERE code = $1
+    """,
+    "update_authorization_code_token": """
+        UPDATE oauth_authorization_codes
+        SET snowflake_token = $2
+        WHERE code = $1
+    """,
+    "consume_authorization_code": """
+        DELETE FROM oauth_authorization_codes
+        WHERE code = $1 AND expires_at > NOW()
+        RETURNING client_id, redirect_uri, scope, code_challenge,
+                  code_challenge_method, snowflake_token,
+                  EXTRACT(EPOCH FROM expires_at)::float8 AS expires_at, state
+    """,
+    "delete_authorization_code": """
+        DELETE FROM oauth_authorization_codes WHERE code = $1
+    """,
+    # Access tokens
+    "store_access_token": """
+        INSERT INTO oauth_access_tokens
+        (token, client_id, scope, expires_at)
+        VALUES ($1, $2, $3, $4)
+    """,
+    "get_access_token": """
+        SELECT client_id, scope, token_type,
+               EXTRACT(EPOCH FROM expires_at)::float8 AS expires_at
+        FROM oauth_access_tokens
+        WHERE token = $1
+    """,
+    "delete_access_token": """
+        DELETE FROM oauth_access_tokens WHERE token = $1
+    """,
+    # Refresh tokens
+    "store_refresh_token": """
+        INSERT INTO oauth_refresh_tokens
+        (token, client_id, access_token, scope, expires_at)
+        VALUES ($1, $2, $3, $4, $5)
+    """,
+    "get_refresh_token": """
+        SELECT client_id, access_token, scope,
+               EXTRACT(EPOCH FROM expires_at)::float8 AS expires_at
+        FROM oauth_refresh_tokens
+        WHERE token = $1
+    """,
+    "delete_refresh_token": """
+        DELETE FROM oauth_refresh_tokens WHERE token = $1
+    """,
+    # Token pairs: both rows in one statement, and so one transaction. The
+    # refresh row takes its access_token from the access row's RETURNING,
+    # and the foreign key is checked once the whole statement has run.
+    "store_token_pair": """
+        WITH access AS (
+            INSERT INTO oauth_access_tokens
+            (token, client_id, scope, expires_at)
+            VALUES ($1, $2, $3, $4)
+            RETURNING token
+        )
+        INSERT INTO oauth_refresh_tokens
+        (token, client_id, access_token, scope, expires_at)
+        SELECT $5, $6, access.token, $7, $8 FROM access
+    """,
+}
+
+
+# Lookups that may be served by a read replica
+READ_QUERIES = (
+    "get_client",
+    "get_client_by_name_and_redirect_uris",
+    "get_authorization_code",
+    "get_access_token",
+    "get_refresh_token",
+)
+
+
+class PreparedConnection(asyncpg.Connection):
+    """asyncpg connection that keeps the registered statements prepared."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the connection with no statements prepared yet."""
+        super().__init__(*args, **kwargs)
+        self.prepared: Dict[str, PreparedStatement] = {}
+
+
+async def prepare_statement(
+    conn: asyncpg.Connection, name: str
+) -> Optional[PreparedStatement]:
+    """Get the prepared statement for a registered query on a connection.
+
+    Statements missing from the connection, for example because the tables
+    did not exist yet when it was opened, are prepared on first use.
+
+    Returns:
+        Optional[PreparedStatement]: The statement, or None for connections
+        that are not PreparedConnection instances
+    """
+    # Pool connections are proxies, and asyncpg's isinstance() treats every
+    # connection as any Connection subclass, so look for the cache instead
+    prepared = getattr(conn, "prepared", None)
+    if not isinstance(prepared, dict):
+        return None
+
+    statement = prepared.get(name)
+    if statement is None:
+        statement = await conn.prepare(QUERIES[name], name=f"mcp_{name}")
+        prepared[name] = statement
+    return statement
+
+
+async def prepare_statements(
+    conn: asyncpg.Connection, names: Iterable[str] = QUERIES
+) -> None:
+    """Prepare registered queries, all of them by default.
+
+    Used by the pools' ``init`` hooks.
+    """
+    for name in names:
+        try:
+            await prepare_statement(conn, name)
+        except (
+            asyncpg.UndefinedTableError,
+            asyncpg.UndefinedColumnError,
+            asyncpg.UndefinedFunctionError,
+        ):
+            # Schema not created or upgraded yet; that happens after the pool opens
+            logger.debug(f"Deferring preparation of {name} until first use")
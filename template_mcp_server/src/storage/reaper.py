@@ -0,0 +1,218 @@
+"""Background deletion of expired OAuth rows.
+
+Authorization codes, access tokens and refresh tokens carry an
+``expires_at`` column, but nothing else removes rows once they expire. The
+reaper deletes them in bounded batches on an interval. A PostgreSQL
+advisory lock lets only one replica or worker reap at a time; the others
+skip the run.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+from template_mcp_server.src.settings import settings
+from template_mcp_server.src.storage.storage_service import StorageService
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+# Tables reaped, in order, with their primary keys. Refresh tokens go before
+# access tokens so deleting an access token rarely has references to clear.
+REAPED_TABLES: Dict[str, str] = {
+    "oauth_authorization_codes": "code",
+    "oauth_refresh_tokens": "token",
+    "oauth_access_tokens": "token",
+}
+
+# Advisory lock key shared by every replica: "mcp_reap" as a 64-bit integer
+REAPER_LOCK_KEY = 0x6D63705F72656170
+
+# Background reaper, managed by the app lifespan
+_expired_row_reaper: Optional["ExpiredRowReaper"] = None
+
+
+def reap_query(table: str, key: str) -> str:
+    """Build the statement deleting one batch of expired rows from a table.
+
+    Rows locked by in-flight requests are skipped rather than waited for.
+    """
+    return f"""
+        DELETE FROM {table}
+        WHERE {key} IN (
+            SELECT {key} FROM {table}
+            WHERE expires_at < NOW()
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+    """
+
+
+class ExpiredRowReaper:
+    """Delete expired OAuth rows in batches on an interval."""
+
+    def __init__(
+        self,
+        storage: StorageService,
+        interval: float = 300.0,
+        batch_size: int = 500,
+        max_batches: int = 20,
+    ):
+        """Initialize the reaper.
+
+        Args:
+            storage: Storage service whose pool the reaper uses
+            interval: Seconds between runs
+            batch_size: Maximum rows deleted by one statement
+            max_batches: Maximum batches per table in one run
+        """
+        self.storage = storage
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.rows_reaped: Dict[str, int] = {table: 0 for table in REAPED_TABLES}
+        self.runs = 0
+        self.skipped_runs = 0
+        self.failed_runs = 0
+        self.batches = 0
+        self.batch_seconds_total = 0.0
+        self.batch_seconds_max = 0.0
+        self.last_batch_seconds: Optional[float] = None
+        self.last_run_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _record_batch(self, seconds: float) -> None:
+        self.batches += 1
+        self.batch_seconds_total += seconds
+        self.batch_seconds_max = max(self.batch_seconds_max, seconds)
+        self.last_batch_seconds = seconds
+
+    async def _reap_table(self, conn: asyncpg.Connection, table: str, key: str) -> int:
+        query = reap_query(table, key)
+        reaped = 0
+        for _ in range(self.max_batches):
+            start = time.perf_counter()
+            status = await conn.execute(query, self.batch_size)
+            self._record_batch(time.perf_counter() - start)
+
+            deleted = int(status.split()[-1])
+            reaped += deleted
+            if deleted < self.batch_size:
+                break
+        return reaped
+
+    async def run_once(self) -> Optional[Dict[str, int]]:
+        """Reap every table once.
+
+        Returns:
+            Optional[Dict[str, int]]: Rows deleted per table, or None when
+            the run was skipped because another process holds the lock
+        """
+        pool = self.storage.pool
+        if pool is None:
+            return None
+
+        reaped: Dict[str, int] = {}
+        async with pool.acquire() as conn:
+            locked = await conn.fetchval(
+                "SELECT pg_try_advisory_lock($1)", REAPER_LOCK_KEY
+            )
+            if not locked:
+                self.skipped_runs += 1
+                logger.debug("Expired-row reaper lock held elsewhere, skipping run")
+                return None
+
+            try:
+                for table, key in REAPED_TABLES.items():
+                    reaped[table] = await self._reap_table(conn, table, key)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", REAPER_LOCK_KEY)
+
+        self.runs += 1
+        self.last_run_at = time.time()
+        for table, count in reaped.items():
+            self.rows_reaped[table] += count
+        if any(reaped.values()):
+            logger.info(f"Reaped expired rows: {reaped}")
+        return reaped
+
+    async def _reap_loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failed_runs += 1
+                logger.error(f"Expired-row reaper run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start reaping in the background, beginning with an immediate run."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return reaper counters for the /metrics endpoint."""
+        return {
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "failed_runs": self.failed_runs,
+            "rows_reaped": dict(self.rows_reaped),
+            "batches": self.batches,
+            "batch_latency_ms": {
+                "last": round(self.last_batch_seconds * 1000, 2)
+                if self.last_batch_seconds is not None
+                else None,
+                "mean": round(self.batch_seconds_total / self.batches * 1000, 2)
+                if self.batches
+                else None,
+                "max": round(self.batch_seconds_max * 1000, 2),
+            },
+            "last_run_at": self.last_run_at,
+        }
+
+
+def get_expired_row_reaper() -> Optional[ExpiredRowReaper]:
+    """Get the expired-row reaper, or None when it is not running."""
+    return _expired_row_reaper
+
+
+async def initialize_expired_row_reaper(storage: StorageService) -> ExpiredRowReaper:
+    """Start reaping expired rows. Call this during application startup."""
+    global _expired_row_reaper
+    if _expired_row_reaper is not None:
+        await _expired_row_reaper.stop()
+
+    _expired_row_reaper = ExpiredRowReaper(
+        storage,
+        interval=settings.EXPIRED_ROW_REAPER_INTERVAL_SECONDS,
+        batch_size=settings.EXPIRED_ROW_REAPER_BATCH_SIZE,
+        max_batches=settings.EXPIRED_ROW_REAPER_MAX_BATCHES,
+    )
+    _expired_row_reaper.start()
+    logger.info(
+        "Expired-row reaper started",
+        interval=_expired_row_reaper.interval,
+        batch_size=_expired_row_reaper.batch_size,
+    )
+    return _expired_row_reaper
+
+
+async def cleanup_expired_row_reaper() -> None:
+    """Stop the expired-row reaper. Call this during application shutdown."""
+    global _expired_row_reaper
+    if _expired_row_reaper is not None:
+        await _expired_row_reaper.stop()
+        _expired_row_reaper = None
+        logger.info("Expired-row reaper stopped")
@@ -1,15 +1,130 @@
 """PostgreSQL storage service for the Template MCP Server."""
 
-import json
+import asyncio
+import hashlib
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import urlparse
 
 import asyncpg
 
+from template_mcp_server.src.storage.codecs import register_json_codecs
+from template_mcp_server.src.storage.migrations import (
+    CLIENT_CHANGES_CHANNEL,
+    SCHEMA_VERSION,
+    get_schema_state,
+    migrate,
+    schema_is_current,
+)
+from template_mcp_server.src.storage.pool_metrics import AdaptiveLimiter, PoolMonitor
+from template_mcp_server.src.storage.queries import (
+    QUERIES,
+    READ_QUERIES,
+    PreparedConnection,
+    prepare_statement,
+    prepare_statements,
+)
+from template_mcp_server.utils.cache import TTLCache
 from template_mcp_server.utils.pylogger import get_python_logger
 
 logger = get_python_logger()
 
+# Delay before reopening a lost LISTEN connection
+CLIENT_LISTENER_RETRY_SECONDS = 5.0
+
+# Replication lag of a standby in seconds; 0 once it has replayed everything
+# it received, and on a server that is not a standby
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+          OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0
+        )
+    END::float8
+"""
+
+# Clients holding live access tokens, most recently issued first, loaded into
+# the client cache during warm-up
+ACTIVE_CLIENTS_QUERY = """
+    SELECT client_id AS id, client_secret AS secret, client_name AS name,
+           redirect_uris, grant_types, response_types, scope,
+           EXTRACT(EPOCH FROM created_at)::float8 AS created_at
+    FROM oauth_clients
+    WHERE client_id IN (
+        SELECT client_id FROM oauth_access_tokens
+        WHERE expires_at > NOW()
+        GROUP BY client_id
+        ORDER BY MAX(expires_at) DESC
+        LIMIT $1
+    )
+"""
+
+# Rows written by the current task, read from the primary afterwards so the
+# writer sees its own writes. Every ASGI request runs in its own task, so the
+# set lives as long as the request.
+_written_rows: ContextVar[Optional[Set[Tuple[str, Any]]]] = ContextVar(
+    "storage_written_rows", default=None
+)
+
+# Columns written by bulk_store_token_pairs, in record order
+ACCESS_TOKEN_COLUMNS = ("token", "client_id", "scope", "expires_at")
+REFRESH_TOKEN_COLUMNS = ("token", "client_id", "access_token", "scope", "expires_at")
+
+# (access token, access token data, refresh token, refresh token data)
+TokenPair = Tuple[str, Dict[str, Any], str, Dict[str, Any]]
+
+
+def expires_at_timestamp(token_data: Dict[str, Any]) -> datetime:
+    """Convert the epoch ``expires_at`` of code or token data for a column."""
+    return datetime.fromtimestamp(token_data["expires_at"], tz=timezone.utc)
+
+
+def token_digest(value: str) -> bytes:
+    """Return the SHA-256 digest that keys a code or token in sha256 mode."""
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+async def init_connection(conn: asyncpg.Connection) -> None:
+    """Set up a new pool connection: JSONB codec, then prepared statements."""
+    # Codecs first, so the prepared statements are bound to them
+    await register_json_codecs(conn)
+    await prepare_statements(conn)
+
+
+async def init_replica_connection(conn: asyncpg.Connection) -> None:
+    """Set up a new replica pool connection, preparing only the lookups."""
+    await register_json_codecs(conn)
+    await prepare_statements(conn, READ_QUERIES)
+
+
+def mark_written(table: str, key: Any) -> None:
+    """Record a row written by the current task so its reads use the primary."""
+    written = _written_rows.get()
+    if written is None:
+        written = set()
+        _written_rows.set(written)
+    written.add((table, key))
+
+
+class ReadReplica:
+    """A read replica's pool and its last measured replication lag."""
+
+    def __init__(self, dsn: str, monitor: Optional[PoolMonitor] = None):
+        """Initialize the replica; its pool is opened by the storage service."""
+        self.dsn = dsn
+        self.pool: Optional[asyncpg.Pool] = None
+        self.monitor = monitor or PoolMonitor()
+        # Seconds behind the primary; None until measured or while unreachable
+        self.lag: Optional[float] = None
+
+    @property
+    def host(self) -> str:
+        """Return the replica host, for status output without credentials."""
+        url = urlparse(self.dsn)
+        return f"{url.hostname}:{url.port or 5432}"
+
 
 class StorageService:
     """PostgreSQL storage service for persistent data storage.
@@ -27,6 +142,17 @@ class StorageService:
         password: str = "",
         pool_size: int = 10,
         max_connections: int = 20,
+        client_cache_ttl: float = 60.0,
+        client_cache_max_entries: int = 1000,
+        token_storage_mode: str = "plain",
+        read_replica_dsns: Optional[List[str]] = None,
+        replica_max_lag: float = 5.0,
+        replica_lag_check_interval: float = 5.0,
+        auto_migrate: bool = True,
+        adaptive_pool: bool = False,
+        adaptive_pool_wait_threshold: float = 0.01,
+        adaptive_pool_interval: float = 10.0,
+        pool_acquire_timeout: float = 10.0,
     ):
         """Initialize the PostgreSQL storage service.
 
@@ -38,6 +164,24 @@ class StorageService:
             password: Database password
             pool_size: Minimum pool size
             max_connections: Maximum pool size
+            client_cache_ttl: Maximum lifetime of a cached client in seconds
+            client_cache_max_entries: Maximum cached clients (0 disables the cache)
+            token_storage_mode: "plain" keys codes and tokens by their raw
+                value, "sha256" by a 32-byte digest of it
+            read_replica_dsns: Connection strings of read replicas serving
+                lookups; empty reads everything from the primary
+            replica_max_lag: Replication lag in seconds above which a
+                replica is skipped
+            replica_lag_check_interval: Seconds between replica lag checks
+            auto_migrate: Apply pending schema migrations on connect instead
+                of refusing to start
+            adaptive_pool: Cap connections in use between pool_size and
+                max_connections, adjusted to the acquire waits
+            adaptive_pool_wait_threshold: Mean acquire wait in seconds at
+                which the cap grows
+            adaptive_pool_interval: Seconds between cap adjustments
+            pool_acquire_timeout: Seconds a request may wait for a pool
+                connection (0 waits indefinitely)
         """
         self.host = host
         self.port = port
@@ -47,21 +191,68 @@ class StorageService:
         self.pool_size = pool_size
         self.max_connections = max_connections
         self.pool: Optional[asyncpg.Pool] = None
+        self.token_storage_mode = token_storage_mode
+        self.auto_migrate = auto_migrate
+
+        self.adaptive_pool = adaptive_pool
+        self.adaptive_pool_wait_threshold = adaptive_pool_wait_threshold
+        self.adaptive_pool_interval = adaptive_pool_interval
+        self.pool_acquire_timeout = pool_acquire_timeout
+        self.pool_monitor = self._new_pool_monitor()
+        self._adapt_pool_task: Optional[asyncio.Task] = None
+
+        # Clients by ID. Served only while the LISTEN connection is up, so
+        # every change made through any replica evicts the entry.
+        self.client_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            max_entries=client_cache_max_entries, max_ttl=client_cache_ttl
+        )
+        self._client_cache_listening = False
+        self._client_listener_ready = asyncio.Event()
+        self._client_cache_generation = 0
+        self._client_listener_task: Optional[asyncio.Task] = None
+
+        self.replicas = [
+            ReadReplica(dsn, self._new_pool_monitor())
+            for dsn in read_replica_dsns or []
+        ]
+        self.replica_max_lag = replica_max_lag
+        self.replica_lag_check_interval = replica_lag_check_interval
+        self._replica_turn = 0
+        self._replica_lag_task: Optional[asyncio.Task] = None
+
+    @property
+    def dsn(self) -> str:
+        """Return the PostgreSQL connection string."""
+        return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
 
     async def connect(self) -> None:
         """Establish connection pool to PostgreSQL."""
         try:
-            dsn = f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
-
             self.pool = await asyncpg.create_pool(
-                dsn,
+                self.dsn,
                 min_size=self.pool_size,
                 max_size=self.max_connections,
                 command_timeout=30,
+                connection_class=PreparedConnection,
+                init=init_connection,
             )
 
-            # Create the storage table if it doesn't exist
-            await self._create_table()
+            await self._ensure_schema()
+
+            if self.client_cache.max_entries > 0:
+                self._client_listener_task = asyncio.create_task(
+                    self._listen_for_client_changes()
+                )
+
+            # An unreachable replica does not fail startup; it is skipped
+            # until a later lag check reaches it
+            await self._check_replica_lags()
+            if self.replicas:
+                self._replica_lag_task = asyncio.create_task(
+                    self._monitor_replica_lag()
+                )
+            if self.adaptive_pool:
+                self._adapt_pool_task = asyncio.create_task(self._adapt_pool_limits())
             logger.info("Storage service connected to PostgreSQL")
 
         except Exception as e:
@@ -70,6 +261,36 @@ class StorageService:
 
     async def disconnect(self) -> None:
         """Close PostgreSQL connection pool."""
+        if self._client_listener_task is not None:
+            self._client_listener_task.cancel()
+            try:
+                await self._client_listener_task
+            except asyncio.CancelledError:
+                pass
+            self._client_listener_task = None
+
+        if self._replica_lag_task is not None:
+            self._replica_lag_task.cancel()
+            try:
+                await self._replica_lag_task
+            except asyncio.CancelledError:
+                pass
+            self._replica_lag_task = None
+
+        if self._adapt_pool_task is not None:
+            self._adapt_pool_task.cancel()
+            try:
+                await self._adapt_pool_task
+            except asyncio.CancelledError:
+                pass
+            self._adapt_pool_task = None
+
+        for replica in self.replicas:
+            if replica.pool is not None:
+                await replica.pool.close()
+                replica.pool = None
+            replica.lag = None
+
         if self.pool:
             await self.pool.close()
             self.pool = None
@@ -89,92 +310,312 @@ class StorageService:
             logger.warning(f"PostgreSQL health check failed: {e}")
             return False
 
-    async def _create_table(self) -> None:
-        """Create OAuth-specific tables."""
+    def _new_pool_monitor(self) -> PoolMonitor:
+        """Create a pool's monitor, with a limiter in adaptive mode."""
+        limiter = None
+        if self.adaptive_pool:
+            # Starts uncapped; adapt() shrinks it while connections sit unused
+            limiter = AdaptiveLimiter(
+                self.max_connections, self.pool_size, self.max_connections
+            )
+        return PoolMonitor(limiter, self.pool_acquire_timeout or None)
+
+    async def _adapt_pool_limits(self) -> None:
+        while True:
+            await asyncio.sleep(self.adaptive_pool_interval)
+            for monitor in [self.pool_monitor] + [r.monitor for r in self.replicas]:
+                monitor.adapt(self.adaptive_pool_wait_threshold)
+
+    def pool_metrics(self) -> Dict[str, Any]:
+        """Return per-pool metrics for the /metrics endpoint.
+
+        Replicas are keyed by their position in the configured list, so the
+        endpoint does not reveal the database topology.
+        """
+        metrics = {"primary": self.pool_monitor.metrics(self.pool)}
+        for index, replica in enumerate(self.replicas):
+            metrics[f"replica_{index}"] = replica.monitor.metrics(replica.pool)
+        return metrics
+
+    def _key(self, value: Optional[str]) -> Union[str, bytes, None]:
+        """Return the stored key for a code or token in the current mode."""
+        if value is None or self.token_storage_mode != "sha256":
+            return value
+        return token_digest(value)
+
+    def _on_client_changed(
+        self, conn: asyncpg.Connection, pid: int, channel: str, client_id: str
+    ) -> None:
+        """Evict a client changed by any replica from the cache."""
+        self._client_cache_generation += 1
+        self.client_cache.delete(client_id)
+        logger.debug(f"Client cache entry invalidated: {client_id}")
+
+    async def _listen_for_client_changes(self) -> None:
+        """Keep a LISTEN connection open for client change notifications.
+
+        The cache is bypassed and emptied whenever the connection is down,
+        because notifications sent meanwhile would be missed.
+        """
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.warning(f"Client cache listener failed to connect: {e}")
+                await asyncio.sleep(CLIENT_LISTENER_RETRY_SECONDS)
+                continue
+
+            lost = asyncio.Event()
+            try:
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(CLIENT_CHANGES_CHANNEL, self._on_client_changed)
+                self._client_cache_listening = True
+                self._client_listener_ready.set()
+                logger.info("Client cache listening for OAuth client changes")
+                await lost.wait()
+                logger.warning("Client cache listener connection lost")
+            except Exception as e:
+                logger.warning(f"Client cache listener failed: {e}")
+            finally:
+                self._client_cache_listening = False
+                self._client_listener_ready.clear()
+                self.client_cache.invalidate_all()
+                if not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(CLIENT_LISTENER_RETRY_SECONDS)
+
+    async def _check_replica_lag(self, replica: ReadReplica) -> None:
+        """Measure a replica's lag, opening its pool first if needed."""
+        try:
+            if replica.pool is None:
+                replica.pool = await asyncpg.create_pool(
+                    replica.dsn,
+                    min_size=self.pool_size,
+                    max_size=self.max_connections,
+                    command_timeout=30,
+                    connection_class=PreparedConnection,
+                    init=init_replica_connection,
+                    # Connect timeout; asyncpg's 60s default would hold up
+                    # startup on a blackholed replica
+                    timeout=self.replica_lag_check_interval,
+                )
+            async with replica.pool.acquire(
+                timeout=self.replica_lag_check_interval
+            ) as conn:
+                replica.lag = await conn.fetchval(
+                    REPLICA_LAG_QUERY, timeout=self.replica_lag_check_interval
+                )
+        except Exception as e:
+            if replica.lag is not None or replica.pool is None:
+                logger.warning(f"Read replica {replica.host} unavailable: {e}")
+            replica.lag = None
+
+    async def _check_replica_lags(self) -> None:
+        """Check every replica at once, so a slow one delays no other."""
+        await asyncio.gather(
+            *(self._check_replica_lag(replica) for replica in self.replicas)
+        )
+
+    async def _monitor_replica_lag(self) -> None:
+        while True:
+            await asyncio.sleep(self.replica_lag_check_interval)
+            await self._check_replica_lags()
+
+    def _read_replica(self, row: Tuple[str, Any]) -> Optional[ReadReplica]:
+        """Pick a replica to read a row from, or None to use the primary.
+
+        Rows written by the current request, and every read while no replica
+        is within the lag threshold, go to the primary.
+        """
+        written = _written_rows.get()
+        if written is not None and row in written:
+            return None
+
+        candidates = [
+            replica
+            for replica in self.replicas
+            if replica.pool is not None
+            and replica.lag is not None
+            and replica.lag <= self.replica_max_lag
+        ]
+        if not candidates:
+            return None
+        self._replica_turn += 1
+        return candidates[self._replica_turn % len(candidates)]
+
+    async def _read(
+        self, row: Tuple[str, Any], name: str, *args: Any
+    ) -> Tuple[Optional[asyncpg.Record], bool]:
+        """Run a lookup on a replica when allowed, otherwise on the primary.
+
+        Returns:
+            Tuple[Optional[asyncpg.Record], bool]: The row, and whether a
+            replica served it
+        """
+        replica = self._read_replica(row)
+        if replica is not None and replica.pool is not None:
+            try:
+                async with replica.monitor.acquire(replica.pool) as conn:
+                    return (
+                        await self._fetchrow(
+                            conn, name, *args, monitor=replica.monitor
+                        ),
+                        True,
+                    )
+            except Exception as e:
+                # Skipped until the next lag check reaches it again
+                logger.warning(f"Read replica {replica.host} failed: {e}")
+                replica.lag = None
+
+        assert self.pool is not None
+        async with self.pool_monitor.acquire(self.pool) as conn:
+            return await self._fetchrow(conn, name, *args), False
+
+    async def _fetchrow(
+        self,
+        conn: asyncpg.Connection,
+        name: str,
+        *args: Any,
+        monitor: Optional[PoolMonitor] = None,
+    ) -> Optional[asyncpg.Record]:
+        """Fetch one row with a registered query, prepared when possible.
+
+        The query is timed on ``monitor``, the primary pool's by default.
+        """
+        with (monitor or self.pool_monitor).query(name):
+            statement = await prepare_statement(conn, name)
+            if statement is None:
+                return await conn.fetchrow(QUERIES[name], *args)
+            return await statement.fetchrow(*args)
+
+    async def _execute(self, conn: asyncpg.Connection, name: str, *args: Any) -> str:
+        """Run a registered query and return its status, e.g. ``DELETE 1``."""
+        with self.pool_monitor.query(name):
+            statement = await prepare_statement(conn, name)
+            if statement is None:
+                return await conn.execute(QUERIES[name], *args)
+            await statement.fetch(*args)
+            return statement.get_statusmsg()
+
+    async def _ensure_schema(self) -> None:
+        """Check the database schema, migrating it first if allowed.
+
+        A current schema costs one query. An outdated one is migrated when
+        auto_migrate is set; concurrent servers wait on the migration lock
+        and the first one applies the changes.
+        """
         if not self.pool:
             raise RuntimeError("Not connected to PostgreSQL")
 
         async with self.pool.acquire() as conn:
-            # OAuth Clients table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS oauth_clients (
-                    client_id VARCHAR(255) PRIMARY KEY,
-                    client_secret VARCHAR(255) NOT NULL,
-                    client_name VARCHAR(255) NOT NULL,
-                    redirect_uris JSONB NOT NULL,
-                    grant_types JSONB NOT NULL,
-                    response_types JSONB NOT NULL,
-                    scope VARCHAR(255) NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-
-                    -- Unique constraint for client name + redirect URIs combination
-                    CONSTRAINT unique_client_name_redirect UNIQUE (client_name, redirect_uris)
-                )
-            """)
-
-            # Authorization Codes table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS oauth_authorization_codes (
-                    code VARCHAR(255) PRIMARY KEY,
-                    client_id VARCHAR(255) NOT NULL,
-                    redirect_uri VARCHAR(500) NOT NULL,
-                    scope VARCHAR(255),
-                    code_challenge VARCHAR(255) NOT NULL,
-                    code_challenge_method VARCHAR(10) NOT NULL,
-                    snowflake_token JSONB,
-                    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-                    state VARCHAR(255),
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-
-                    FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE
+            version, hashed = await get_schema_state(conn)
+            if schema_is_current(version, hashed, self.token_storage_mode):
+                if version != SCHEMA_VERSION:
+                    logger.warning(
+                        f"Database schema version {version} is newer than "
+                        f"{SCHEMA_VERSION}; continuing"
+                    )
+                return
+
+            if not self.auto_migrate:
+                raise RuntimeError(
+                    f"Database schema is at version {version or 0}, expected "
+                    f"{SCHEMA_VERSION} with {self.token_storage_mode} token keys; "
+                    "run template-mcp-server-migrate"
                 )
-            """)
-
-            # Access Tokens table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS oauth_access_tokens (
-                    token VARCHAR(255) PRIMARY KEY,
-                    client_id VARCHAR(255) NOT NULL,
-                    scope VARCHAR(255),
-                    token_type VARCHAR(50) DEFAULT 'Bearer',
-                    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-
-                    FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE
-                )
-            """)
-
-            # Refresh Tokens table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS oauth_refresh_tokens (
-                    token VARCHAR(255) PRIMARY KEY,
-                    client_id VARCHAR(255) NOT NULL,
-                    access_token VARCHAR(255),
-                    scope VARCHAR(255),
-                    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-
-                    FOREIGN KEY (client_id) REFERENCES oauth_clients(client_id) ON DELETE CASCADE,
-                    FOREIGN KEY (access_token) REFERENCES oauth_access_tokens(token) ON DELETE SET NULL
-                )
-            """)
+            await migrate(conn, self.token_storage_mode)
 
-            # Create useful indexes
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_auth_codes_expires ON oauth_authorization_codes (expires_at)"
-            )
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_access_tokens_expires ON oauth_access_tokens (expires_at)"
-            )
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires ON oauth_refresh_tokens (expires_at)"
-            )
-            await conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_client_name ON oauth_clients (client_name)"
-            )
+        # Connections opened before the migration hold statements prepared
+        # against the old schema, or none at all
+        await self.pool.expire_connections()
+
+    async def warm_up(self, listener_timeout: float = 5.0) -> Dict[str, int]:
+        """Prepare every pool connection and fill the client cache.
 
-            logger.info("OAuth database tables created successfully")
+        Takes each pool's minimum number of connections at once, opening
+        any that are missing or were expired by a migration, and runs every
+        lookup on each of them. Then loads the clients holding live access
+        tokens into the client cache, once the listener that keeps it
+        consistent is connected.
+
+        Args:
+            listener_timeout: Seconds to wait for the client cache listener
+
+        Returns:
+            Dict[str, int]: Connections warmed and clients cached
+        """
+        if not self.pool:
+            raise RuntimeError("Not connected to PostgreSQL")
+
+        connections = await self._warm_pool(self.pool)
+        for replica in self.replicas:
+            if replica.pool is None:
+                continue
+            try:
+                connections += await self._warm_pool(replica.pool)
+            except Exception as e:
+                logger.warning(f"Read replica {replica.host} warm-up failed: {e}")
+
+        clients = await self._prime_client_cache(listener_timeout)
+        return {"connections": connections, "clients_cached": clients}
+
+    def _lookup_probes(self) -> Dict[str, Tuple[Any, ...]]:
+        """Return arguments matching no row for each lookup in READ_QUERIES."""
+        key = self._key("")
+        return {
+            "get_client": ("",),
+            "get_client_by_name_and_redirect_uris": ("", []),
+            "get_authorization_code": (key,),
+            "get_access_token": (key,),
+            "get_refresh_token": (key,),
+        }
+
+    async def _warm_pool(self, pool: asyncpg.Pool) -> int:
+        """Run every lookup on each of a pool's minimum connections.
+
+        The connections are held together so each one is a different
+        connection. Lookups are not recorded in the pool metrics.
+        """
+        probes = self._lookup_probes()
+        conns = []
+        try:
+            for _ in range(pool.get_min_size()):
+                conns.append(await pool.acquire())
+
+            async def warm(conn: asyncpg.Connection) -> None:
+                for name, args in probes.items():
+                    statement = await prepare_statement(conn, name)
+                    if statement is None:
+                        await conn.fetchrow(QUERIES[name], *args)
+                    else:
+                        await statement.fetchrow(*args)
+
+            await asyncio.gather(*(warm(conn) for conn in conns))
+        finally:
+            for conn in conns:
+                await pool.release(conn)
+        return len(conns)
+
+    async def _prime_client_cache(self, listener_timeout: float) -> int:
+        """Load the clients holding live access tokens into the client cache."""
+        if self.pool is None or self._client_listener_task is None:
+            return 0
+        try:
+            await asyncio.wait_for(self._client_listener_ready.wait(), listener_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Client cache listener not connected; cache left empty")
+            return 0
+
+        generation = self._client_cache_generation
+        async with self.pool_monitor.acquire(self.pool) as conn:
+            rows = await conn.fetch(ACTIVE_CLIENTS_QUERY, self.client_cache.max_entries)
+        # Same rule as get_client: an invalidation during the read may
+        # concern any of the rows
+        if generation != self._client_cache_generation:
+            return 0
+        for row in rows:
+            self.client_cache.set(row["id"], dict(row))
+        return len(rows)
 
     async def get_status(self) -> Dict[str, Any]:
         """Get storage service status."""
@@ -191,7 +632,18 @@ class StorageService:
 
             if is_healthy and self.pool:
                 status["pool_size"] = self.pool.get_size()
+                status["pool_idle"] = self.pool.get_idle_size()
                 status["pool_max_size"] = self.max_connections
+            if self.replicas:
+                status["replicas"] = [
+                    {
+                        "host": replica.host,
+                        "lag_seconds": replica.lag,
+                        "in_use": replica.lag is not None
+                        and replica.lag <= self.replica_max_lag,
+                    }
+                    for replica in self.replicas
+                ]
 
             return status
 
@@ -207,30 +659,13 @@ class StorageService:
             if not self.pool:
                 return None
 
-            async with self.pool.acquire() as conn:
-                result = await conn.fetchrow(
-                    """
-                    SELECT client_id, client_secret, client_name, redirect_uris,
-                           grant_types, response_types, scope, created_at
-                    FROM oauth_clients
-                    WHERE client_name = $1 AND redirect_uris = $2
-                """,
-                    client_name,
-                    json.dumps(redirect_uris),
-                )
-
-                if result:
-                    return {
-                        "id": result["client_id"],
-                        "secret": result["client_secret"],
-                        "name": result["client_name"],
-                        "redirect_uris": json.loads(result["redirect_uris"]),
-                        "grant_types": json.loads(result["grant_types"]),
-                        "response_types": json.loads(result["response_types"]),
-                        "scope": result["scope"],
-                        "created_at": result["created_at"].timestamp(),
-                    }
-                return None
+            result, _ = await self._read(
+                ("client_name", client_name),
+                "get_client_by_name_and_redirect_uris",
+                client_name,
+                redirect_uris,
+            )
+            return dict(result) if result else None
 
         except Exception as e:
             logger.error(f"Failed to get client by name and redirect URIs: {e}")
@@ -242,19 +677,18 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO oauth_clients
-                    (client_id, client_secret, client_name, redirect_uris, grant_types, response_types, scope)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """,
+            mark_written("client", client_data["id"])
+            mark_written("client_name", client_data["name"])
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "store_client",
                     client_data["id"],
                     client_data["secret"],
                     client_data["name"],
-                    json.dumps(client_data["redirect_uris"]),
-                    json.dumps(client_data["grant_types"]),
-                    json.dumps(client_data["response_types"]),
+                    client_data["redirect_uris"],
+                    client_data["grant_types"],
+                    client_data["response_types"],
                     client_data["scope"],
                 )
 
@@ -265,35 +699,70 @@ class StorageService:
             logger.error(f"Failed to store client: {e}")
             return False
 
-    async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
-        """Get a client by ID."""
+    async def upsert_client(
+        self, client_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Store a client unless one with the same name and redirect URIs exists.
+
+        Returns:
+            Optional[Dict[str, Any]]: The new or existing client, with
+            ``inserted`` telling which, or None on failure
+        """
         try:
             if not self.pool:
                 return None
 
-            async with self.pool.acquire() as conn:
-                result = await conn.fetchrow(
-                    """
-                    SELECT client_id, client_secret, client_name, redirect_uris,
-                           grant_types, response_types, scope, created_at
-                    FROM oauth_clients
-                    WHERE client_id = $1
-                """,
-                    client_id,
+            mark_written("client_name", client_data["name"])
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                result = await self._fetchrow(
+                    conn,
+                    "upsert_client",
+                    client_data["id"],
+                    client_data["secret"],
+                    client_data["name"],
+                    client_data["redirect_uris"],
+                    client_data["grant_types"],
+                    client_data["response_types"],
+                    client_data["scope"],
                 )
+            if not result:
+                return None
+            mark_written("client", result["id"])
+            return dict(result)
 
-                if result:
-                    return {
-                        "id": result["client_id"],
-                        "secret": result["client_secret"],
-                        "name": result["client_name"],
-                        "redirect_uris": json.loads(result["redirect_uris"]),
-                        "grant_types": json.loads(result["grant_types"]),
-                        "response_types": json.loads(result["response_types"]),
-                        "scope": result["scope"],
-                        "created_at": result["created_at"].timestamp(),
-                    }
+        except Exception as e:
+            logger.error(f"Failed to upsert client: {e}")
+            return None
+
+    async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Get a client by ID, from the client cache when possible."""
+        try:
+            if not self.pool:
+                return None
+
+            use_cache = self._client_cache_listening
+            if use_cache:
+                cached = self.client_cache.get(client_id)
+                if cached is not None:
+                    return dict(cached)
+            generation = self._client_cache_generation
+
+            result, from_replica = await self._read(
+                ("client", client_id), "get_client", client_id
+            )
+
+            if not result:
                 return None
+            client = dict(result)
+            # Skip caching if an invalidation arrived while the row was read,
+            # or if a replica served it: it may predate an invalidation
+            if (
+                use_cache
+                and not from_replica
+                and generation == self._client_cache_generation
+            ):
+                self.client_cache.set(client_id, dict(client))
+            return client
 
         except Exception as e:
             logger.error(f"Failed to get client: {e}")
@@ -307,22 +776,18 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO oauth_authorization_codes
-                    (code, client_id, redirect_uri, scope, code_challenge, code_challenge_method, expires_at, state)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                """,
-                    code,
+            mark_written("code", self._key(code))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "store_authorization_code",
+                    self._key(code),
                     code_data["client_id"],
                     code_data["redirect_uri"],
                     code_data.get("scope"),
                     code_data["code_challenge"],
                     code_data["code_challenge_method"],
-                    datetime.fromtimestamp(code_data["expires_at"]).replace(
-                        tzinfo=timezone.utc
-                    ),
+                    expires_at_timestamp(code_data),
                     code_data["state"],
                 )
                 return True
@@ -337,31 +802,9 @@ class StorageService:
             if not self.pool:
                 return None
 
-            async with self.pool.acquire() as conn:
-                result = await conn.fetchrow(
-                    """
-                    SELECT code, client_id, redirect_uri, scope, code_challenge,
-                           code_challenge_method, snowflake_token, expires_at, state
-                    FROM oauth_authorization_codes
-                    WHERE code = $1
-                """,
-                    code,
-                )
-
-                if result:
-                    return {
-                        "client_id": result["client_id"],
-                        "redirect_uri": result["redirect_uri"],
-                        "scope": result["scope"],
-                        "code_challenge": result["code_challenge"],
-                        "code_challenge_method": result["code_challenge_method"],
-                        "snowflake_token": json.loads(result["snowflake_token"])
-                        if result["snowflake_token"]
-                        else None,
-                        "expires_at": result["expires_at"].timestamp(),
-                        "state": result["state"],
-                    }
-                return None
+            key = self._key(code)
+            result, _ = await self._read(("code", key), "get_authorization_code", key)
+            return dict(result) if result else None
 
         except Exception as e:
             logger.error(f"Failed to get authorization code: {e}")
@@ -375,15 +818,13 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    UPDATE oauth_authorization_codes
-                    SET snowflake_token = $2
-                    WHERE code = $1
-                """,
-                    code,
-                    json.dumps(snowflake_token),
+            mark_written("code", self._key(code))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "update_authorization_code_token",
+                    self._key(code),
+                    snowflake_token,
                 )
                 return True
 
@@ -391,18 +832,39 @@ class StorageService:
             logger.error(f"Failed to update authorization code: {e}")
             return False
 
+    async def consume_authorization_code(self, code: str) -> Optional[Dict[str, Any]]:
+        """Delete an unexpired authorization code and return its data.
+
+        The lookup and the delete are one statement, so a code can be
+        redeemed only once even when requests race.
+        """
+        try:
+            if not self.pool:
+                return None
+
+            mark_written("code", self._key(code))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                result = await self._fetchrow(
+                    conn, "consume_authorization_code", self._key(code)
+                )
+                return dict(result) if result else None
+
+        except Exception as e:
+            logger.error(f"Failed to consume authorization code: {e}")
+            return None
+
     async def delete_authorization_code(self, code: str) -> bool:
         """Delete an authorization code."""
         try:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                result = await conn.execute(
-                    """
-                    DELETE FROM oauth_authorization_codes WHERE code = $1
-                """,
-                    code,
+            mark_written("code", self._key(code))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                result = await self._execute(
+                    conn,
+                    "delete_authorization_code",
+                    self._key(code),
                 )
                 return result != "DELETE 0"
 
@@ -416,19 +878,15 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO oauth_access_tokens
-                    (token, client_id, scope, expires_at)
-                    VALUES ($1, $2, $3, $4)
-                """,
-                    token,
+            mark_written("access_token", self._key(token))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "store_access_token",
+                    self._key(token),
                     token_data["client_id"],
                     token_data.get("scope"),
-                    datetime.fromtimestamp(token_data["expires_at"]).replace(
-                        tzinfo=timezone.utc
-                    ),
+                    expires_at_timestamp(token_data),
                 )
                 return True
 
@@ -442,24 +900,9 @@ class StorageService:
             if not self.pool:
                 return None
 
-            async with self.pool.acquire() as conn:
-                result = await conn.fetchrow(
-                    """
-                    SELECT token, client_id, scope, token_type, expires_at
-                    FROM oauth_access_tokens
-                    WHERE token = $1
-                """,
-                    token,
-                )
-
-                if result:
-                    return {
-                        "client_id": result["client_id"],
-                        "scope": result["scope"],
-                        "token_type": result["token_type"],
-                        "expires_at": result["expires_at"].timestamp(),
-                    }
-                return None
+            key = self._key(token)
+            result, _ = await self._read(("access_token", key), "get_access_token", key)
+            return dict(result) if result else None
 
         except Exception as e:
             logger.error(f"Failed to get access token: {e}")
@@ -471,12 +914,12 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                result = await conn.execute(
-                    """
-                    DELETE FROM oauth_access_tokens WHERE token = $1
-                """,
-                    token,
+            mark_written("access_token", self._key(token))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                result = await self._execute(
+                    conn,
+                    "delete_access_token",
+                    self._key(token),
                 )
                 return result != "DELETE 0"
 
@@ -490,20 +933,16 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO oauth_refresh_tokens
-                    (token, client_id, access_token, scope, expires_at)
-                    VALUES ($1, $2, $3, $4, $5)
-                """,
-                    token,
+            mark_written("refresh_token", self._key(token))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "store_refresh_token",
+                    self._key(token),
                     token_data["client_id"],
-                    token_data.get("access_token"),
+                    self._key(token_data.get("access_token")),
                     token_data.get("scope"),
-                    datetime.fromtimestamp(token_data["expires_at"]).replace(
-                        tzinfo=timezone.utc
-                    ),
+                    expires_at_timestamp(token_data),
                 )
                 return True
 
@@ -517,24 +956,11 @@ class StorageService:
             if not self.pool:
                 return None
 
-            async with self.pool.acquire() as conn:
-                result = await conn.fetchrow(
-                    """
-                    SELECT token, client_id, access_token, scope, expires_at
-                    FROM oauth_refresh_tokens
-                    WHERE token = $1
-                """,
-                    token,
-                )
-
-                if result:
-                    return {
-                        "client_id": result["client_id"],
-                        "access_token": result["access_token"],
-                        "scope": result["scope"],
-                        "expires_at": result["expires_at"].timestamp(),
-                    }
-                return None
+            key = self._key(token)
+            result, _ = await self._read(
+                ("refresh_token", key), "get_refresh_token", key
+            )
+            return dict(result) if result else None
 
         except Exception as e:
             logger.error(f"Failed to get refresh token: {e}")
@@ -546,15 +972,108 @@ class StorageService:
             if not self.pool:
                 return False
 
-            async with self.pool.acquire() as conn:
-                result = await conn.execute(
-                    """
-                    DELETE FROM oauth_refresh_tokens WHERE token = $1
-                """,
-                    token,
+            mark_written("refresh_token", self._key(token))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                result = await self._execute(
+                    conn,
+                    "delete_refresh_token",
+                    self._key(token),
                 )
                 return result != "DELETE 0"
 
         except Exception as e:
             logger.error(f"Failed to delete refresh token: {e}")
             return False
+
+    async def store_token_pair(
+        self,
+        access_token: str,
+        access_data: Dict[str, Any],
+        refresh_token: str,
+        refresh_data: Dict[str, Any],
+    ) -> bool:
+        """Store an access token and the refresh token issued with it.
+
+        Both rows are written by one statement in one round trip; the refresh
+        token references the access token and neither is stored alone.
+        """
+        try:
+            if not self.pool:
+                return False
+
+            mark_written("access_token", self._key(access_token))
+            mark_written("refresh_token", self._key(refresh_token))
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                await self._execute(
+                    conn,
+                    "store_token_pair",
+                    self._key(access_token),
+                    access_data["client_id"],
+                    access_data.get("scope"),
+                    expires_at_timestamp(access_data),
+                    self._key(refresh_token),
+                    refresh_data["client_id"],
+                    refresh_data.get("scope"),
+                    expires_at_timestamp(refresh_data),
+                )
+                return True
+
+        except Exception as e:
+            logger.error(f"Failed to store token pair: {e}")
+            return False
+
+    async def bulk_store_token_pairs(self, pairs: Sequence[TokenPair]) -> int:
+        """Store many token pairs with COPY, for seeding load tests.
+
+        Access tokens are copied before the refresh tokens referencing them,
+        in one transaction, so either every pair is stored or none is.
+
+        Returns:
+            int: Number of pairs stored
+        """
+        if not pairs:
+            return 0
+        try:
+            if not self.pool:
+                return 0
+
+            access_records = []
+            refresh_records = []
+            for access_token, access_data, refresh_token, refresh_data in pairs:
+                access_key = self._key(access_token)
+                access_records.append(
+                    (
+                        access_key,
+                        access_data["client_id"],
+                        access_data.get("scope"),
+                        expires_at_timestamp(access_data),
+                    )
+                )
+                refresh_records.append(
+                    (
+                        self._key(refresh_token),
+                        refresh_data["client_id"],
+                        access_key,
+                        refresh_data.get("scope"),
+                        expires_at_timestamp(refresh_data),
+                    )
+                )
+
+            async with self.pool_monitor.acquire(self.pool) as conn:
+                with self.pool_monitor.query("bulk_store_token_pairs"):
+                    async with conn.transaction():
+                        await conn.copy_records_to_table(
+                            "oauth_access_tokens",
+                            records=access_records,
+                            columns=ACCESS_TOKEN_COLUMNS,
+                        )
+                        await conn.copy_records_to_table(
+                            "oauth_refresh_tokens",
+                            records=refresh_records,
+                            columns=REFRESH_TOKEN_COLUMNS,
+                        )
+            return len(pairs)
+
+        except Exception as e:
+            logger.error(f"Failed to bulk store token pairs: {e}")
+            return 0
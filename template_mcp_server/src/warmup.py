@@ -0,0 +1,64 @@
+"""Startup warm-up for the Template MCP server.
+
+Runs from the app lifespan before the server accepts connections, so the
+first requests after a rollout do not pay for what a running server
+already has: open and prepared database connections with warm plan
+caches, a filled OAuth client cache and a TLS connection to the SSO
+server. JWKS keys need nothing here; the verifier loads them on start.
+
+The token introspection caches are keyed by tokens the server has not
+seen yet and start empty. Warm-up failures are logged and never stop the
+server from starting.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from template_mcp_server.src.oauth.handler import check_sso_reachable
+from template_mcp_server.src.oauth.service import StorageBackend
+from template_mcp_server.src.settings import settings
+from template_mcp_server.src.storage.storage_service import StorageService
+from template_mcp_server.utils.pylogger import get_python_logger
+
+logger = get_python_logger()
+
+
+async def warm_up(storage: Optional[StorageBackend]) -> Dict[str, Any]:
+    """Warm storage connections, the client cache and the SSO connection.
+
+    Args:
+        storage: The storage backend; only PostgreSQL needs warming
+
+    Returns:
+        Dict[str, Any]: What each step warmed, or its error
+    """
+    steps: Dict[str, Awaitable[Any]] = {}
+    if isinstance(storage, StorageService):
+        steps["storage"] = storage.warm_up()
+    # Opens the pooled connection used by the first token introspection; in
+    # jwks mode loading the keys already did
+    if settings.TOKEN_VERIFICATION_MODE != "jwks" and settings.SSO_INTROSPECTION_URL:
+        steps["sso"] = check_sso_reachable()
+
+    start = time.perf_counter()
+    results: Dict[str, Any] = {}
+    try:
+        outcomes = await asyncio.wait_for(
+            asyncio.gather(*steps.values(), return_exceptions=True),
+            settings.WARM_UP_TIMEOUT_SECONDS,
+        )
+        for name, outcome in zip(steps, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Warm-up of {name} failed: {outcome}")
+                outcome = {"error": str(outcome)}
+            results[name] = outcome
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Warm-up did not finish within {settings.WARM_UP_TIMEOUT_SECONDS}s"
+        )
+        results["error"] = "timed out"
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Warm-up finished in {elapsed_ms:.0f} ms: {results}")
+    return results
@@ -0,0 +1,167 @@
+"""In-process caching primitives for the Template MCP server.
+
+Provides an LRU cache with per-entry expiry and a single-flight helper that
+coalesces concurrent calls for the same key.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries expire individually.
+
+    Each entry expires at the earlier of its own deadline and ``max_ttl``
+    seconds after it was stored. When the cache is full the least recently
+    used entry is evicted. The cache is meant to be used from a single event
+    loop and performs no locking.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            max_ttl: Maximum lifetime of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries currently stored."""
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, expires_at: Optional[float] = None) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            expires_at: Optional absolute expiry as a Unix timestamp
+        """
+        if self.max_entries <= 0:
+            return
+
+        deadline = time.time() + self.max_ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        if deadline <= time.time():
+            return
+
+        self._entries[key] = (deadline, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key from the cache, returning True if it was present."""
+        return self._entries.pop(key, None) is not None
+
+    def invalidate_all(self) -> None:
+        """Remove all entries, keeping the counters."""
+        self._entries.clear()
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for metrics reporting."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result instead of starting their own. A
+    cancelled caller does not cancel the shared task for the others.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        """Return the number of calls currently in flight."""
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the call already in flight for key."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+
+        def _forget(done: "asyncio.Future[Any]") -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        future.add_done_callback(_forget)
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters for metrics reporting."""
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -0,0 +1,54 @@
+"""In-process metric primitives for the Template MCP server."""
+
+import bisect
+from typing import Any, Dict, Sequence
+
+# Upper bounds of the latency buckets, in milliseconds
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Count durations into fixed buckets, with their total and maximum.
+
+    Buckets are cumulative, as in Prometheus: each counts the observations
+    at or below its bound, and ``+Inf`` counts them all. Observing is a
+    bisect and a few increments, cheap enough for every query.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets_ms: Increasing bucket upper bounds in milliseconds
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        # One slot per bound plus one for observations above the last bound
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        self._counts[bisect.bisect_left(self.buckets_ms, seconds * 1000)] += 1
+        self.count += 1
+        self.sum_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the histogram for metrics reporting."""
+        buckets: Dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets_ms, self._counts):
+            cumulative += count
+            buckets[f"{bound:g}"] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_seconds / self.count * 1000, 3)
+            if self.count
+            else None,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "buckets_ms": buckets,
+        }
@@ -1,10 +1,77 @@
 """Tests for the API module."""
 
-from unittest.mock import patch
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
-from template_mcp_server.src.api import app
+from template_mcp_server.src import api as api_module
+from template_mcp_server.src.api import (
+    AuthorizationMiddleware,
+    LocalDevelopmentAuthorizationMiddleware,
+    PathScopedSessionMiddleware,
+    app,
+)
+from template_mcp_server.src.readiness import ReadinessMonitor
+from template_mcp_server.src.storage.memory_storage import InMemoryStorageService
+from template_mcp_server.src.storage.storage_service import StorageService
+
+
+def make_echo_app(received):
+    """Build an ASGI app that records requests and streams back three chunks."""
+
+    async def echo_app(scope, receive, send):
+        message = await receive()
+        received.append(
+            {
+                "path": scope["path"],
+                "headers": dict(scope["headers"]),
+                "session": scope.get("session"),
+                "body": message.get("body", b""),
+            }
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        for chunk in (b"data: 1\n\n", b"data: 2\n\n"):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    return echo_app
+
+
+async def call_asgi(asgi_app, path, method="GET", headers=None, body=b""):
+    """Call an ASGI app directly and return the messages it sent."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers or [],
+        "query_string": b"",
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    return sent
+
+
+@pytest.fixture
+def public_metrics():
+    """Serve /metrics without a bearer token."""
+    with patch.object(api_module.settings, "METRICS_PUBLIC", True):
+        yield
 
 
 class TestAPI:
@@ -58,24 +125,189 @@ class TestAPI:
         # Assert
         assert response.headers["content-type"] == "application/json"
 
-    @patch("template_mcp_server.src.api.settings")
-    def test_health_endpoint_with_different_transport_protocols(self, mock_settings):
+    def test_health_endpoint_with_different_transport_protocols(self):
         """Test health endpoint with different transport protocols."""
         # Arrange
         protocols = ["streamable-http", "sse", "http"]
         client = TestClient(app)
 
-        for protocol in protocols:
-            # Arrange
-            mock_settings.MCP_TRANSPORT_PROTOCOL = protocol
+        try:
+            for protocol in protocols:
+                # Arrange
+                with patch.object(
+                    api_module.settings, "MCP_TRANSPORT_PROTOCOL", protocol
+                ):
+                    api_module.build_prebuilt_responses()
+
+                # Act
+                response = client.get("/health")
+
+                # Assert
+                assert response.status_code == 200
+                data = response.json()
+                assert data["transport_protocol"] == protocol
+        finally:
+            api_module.build_prebuilt_responses()
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/health",
+            "/.well-known/oauth-protected-resource",
+            "/.well-known/oauth-authorization-server",
+        ],
+    )
+    def test_prebuilt_endpoint_conditional_get(self, path):
+        """Test prebuilt endpoints send an ETag and honour If-None-Match."""
+        client = TestClient(app)
+
+        response = client.get(path)
+        etag = response.headers["etag"]
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert "cache-control" in response.headers
+
+        not_modified = client.get(path, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
 
-            # Act
-            response = client.get("/health")
+        stale = client.get(path, headers={"If-None-Match": '"stale", W/"other"'})
+        assert stale.status_code == 200
+        assert stale.json() == response.json()
+
+    def test_discovery_documents_use_host_endpoint(self):
+        """Test discovery documents are rebuilt for the configured host."""
+        client = TestClient(app)
 
-            # Assert
-            assert response.status_code == 200
+        try:
+            with patch.object(
+                api_module.settings, "MCP_HOST_ENDPOINT", "https://mcp.example.com/x"
+            ):
+                api_module.build_prebuilt_responses()
+
+            response = client.get("/.well-known/oauth-authorization-server")
             data = response.json()
-            assert data["transport_protocol"] == protocol
+
+            assert data["issuer"] == "https://mcp.example.com"
+            assert data["token_endpoint"] == "https://mcp.example.com/auth/token"
+            assert response.headers["cache-control"] == (
+                f"public, max-age={api_module.settings.DISCOVERY_CACHE_MAX_AGE_SECONDS}"
+            )
+        finally:
+            api_module.build_prebuilt_responses()
+
+    @pytest.mark.parametrize(
+        "endpoint,expected",
+        [
+            ("https://mcp.example.com:8443/path", "https://mcp.example.com:8443"),
+            ("ftp://mcp.example.com", "http://localhost:8080"),
+            ("not a url", "http://localhost:8080"),
+        ],
+    )
+    def test_get_host(self, endpoint, expected):
+        """Test get_host normalizes MCP_HOST_ENDPOINT or falls back."""
+        with patch.object(api_module.settings, "MCP_HOST_ENDPOINT", endpoint):
+            assert api_module.get_host() == expected
+
+    def test_ready_endpoint_before_startup(self):
+        """Test readiness fails while no monitor is running."""
+        client = TestClient(app)
+
+        with patch.object(api_module, "get_readiness_monitor", return_value=None):
+            response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+
+    @pytest.mark.parametrize("healthy,status_code", [(True, 200), (False, 503)])
+    def test_ready_endpoint_reports_cached_checks(self, healthy, status_code):
+        """Test readiness serves the monitor's cached result without checking."""
+        storage_check = AsyncMock(return_value=healthy)
+        monitor = ReadinessMonitor({"storage": storage_check})
+        asyncio.run(monitor.check())
+        client = TestClient(app)
+
+        with patch.object(api_module, "get_readiness_monitor", return_value=monitor):
+            response = client.get("/ready")
+            client.get("/ready")
+
+        assert response.status_code == status_code
+        assert response.json()["checks"]["storage"]["healthy"] is healthy
+        assert response.headers["cache-control"] == "no-store"
+        storage_check.assert_awaited_once()
+
+    @pytest.mark.usefixtures("public_metrics")
+    def test_metrics_endpoint(self):
+        """Test the metrics endpoint reports token cache counters."""
+        client = TestClient(app)
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        token_cache = response.json()["token_cache"]
+        for key in ["enabled", "size", "hits", "misses", "hit_ratio"]:
+            assert key in token_cache
+
+    @pytest.mark.usefixtures("public_metrics")
+    def test_metrics_endpoint_reports_reaper(self):
+        """Test the metrics endpoint includes the expired-row reaper counters."""
+        reaper = Mock()
+        reaper.metrics.return_value = {"runs": 3, "rows_reaped": {}}
+        client = TestClient(app)
+
+        with patch(
+            "template_mcp_server.src.api.get_expired_row_reaper", return_value=reaper
+        ):
+            response = client.get("/metrics")
+
+        assert response.json()["expired_row_reaper"]["runs"] == 3
+
+    @pytest.mark.usefixtures("public_metrics")
+    def test_metrics_endpoint_reports_client_cache(self):
+        """Test the metrics endpoint includes the OAuth client cache counters."""
+        oauth_service = Mock()
+        oauth_service.storage = Mock(spec=StorageService)
+        oauth_service.storage.client_cache = Mock()
+        oauth_service.storage.client_cache.stats.return_value = {"hits": 7}
+        oauth_service.storage.pool_metrics.return_value = {}
+        client = TestClient(app)
+
+        with patch.object(api_module, "oauth_service_instance", oauth_service):
+            response = client.get("/metrics")
+
+        assert response.json()["client_cache"] == {"hits": 7}
+
+    @pytest.mark.usefixtures("public_metrics")
+    def test_metrics_endpoint_reports_storage_pools(self):
+        """Test the metrics endpoint includes the per-pool storage metrics."""
+        oauth_service = Mock()
+        oauth_service.storage = Mock(spec=StorageService)
+        oauth_service.storage.client_cache = Mock()
+        oauth_service.storage.client_cache.stats.return_value = {}
+        oauth_service.storage.pool_metrics.return_value = {
+            "primary": {"in_use": 2, "idle": 8}
+        }
+        client = TestClient(app)
+
+        with patch.object(api_module, "oauth_service_instance", oauth_service):
+            response = client.get("/metrics")
+
+        assert response.json()["storage_pools"]["primary"]["in_use"] == 2
+
+    @pytest.mark.usefixtures("public_metrics")
+    def test_metrics_endpoint_without_client_cache(self):
+        """Test the in-memory backend reports no client cache."""
+        oauth_service = Mock()
+        oauth_service.storage = InMemoryStorageService()
+        client = TestClient(app)
+
+        with patch.object(api_module, "oauth_service_instance", oauth_service):
+            response = client.get("/metrics")
+
+        assert response.json()["client_cache"] is None
+        assert response.json()["storage_pools"] is None
 
     def test_app_mounts_mcp_app(self):
         """Test that the app mounts the MCP application."""
@@ -164,3 +396,240 @@ class TestAPI:
 
         # All should work without errors
         assert True
+
+
+class TestAuthorizationMiddleware:
+    """Test the ASGI authorization middleware."""
+
+    @pytest.fixture(autouse=True)
+    def enable_auth(self):
+        """Run the middleware with authentication enabled."""
+        with patch.object(api_module.settings, "ENABLE_AUTH", True):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_public_path_skips_auth(self):
+        """Test public paths are served without an Authorization header."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        sent = await call_asgi(middleware, "/health")
+
+        assert sent[0]["status"] == 200
+        assert received[0]["path"] == "/health"
+
+    @pytest.mark.asyncio
+    async def test_metrics_requires_auth_by_default(self):
+        """Test /metrics is protected unless explicitly made public."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        sent = await call_asgi(middleware, "/metrics")
+
+        assert sent[0]["status"] == 401
+        assert received == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("public_metrics")
+    async def test_metrics_public_when_enabled(self):
+        """Test METRICS_PUBLIC serves /metrics without a bearer token."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        sent = await call_asgi(middleware, "/metrics")
+
+        assert sent[0]["status"] == 200
+
+    @pytest.mark.asyncio
+    async def test_missing_header_rejected(self):
+        """Test protected paths require an Authorization header."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        sent = await call_asgi(middleware, "/mcp", method="POST")
+
+        assert sent[0]["status"] == 401
+        assert (b"www-authenticate", b"Bearer") in sent[0]["headers"]
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_rejected(self):
+        """Test requests with a token that fails verification are rejected."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        with patch.object(
+            api_module.OAuth2Handler,
+            "verify_authorization_header",
+            new=AsyncMock(return_value=None),
+        ):
+            sent = await call_asgi(
+                middleware, "/mcp", headers=[(b"authorization", b"Bearer bad")]
+            )
+
+        assert sent[0]["status"] == 401
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_valid_token_streams_response_untouched(self):
+        """Test authorized requests reach the app and stream unchanged."""
+        received = []
+        inner_app = make_echo_app(received)
+        middleware = AuthorizationMiddleware(inner_app)
+        headers = [(b"authorization", b"Bearer good")]
+
+        with patch.object(
+            api_module.OAuth2Handler,
+            "verify_authorization_header",
+            new=AsyncMock(return_value={"active": True}),
+        ) as mock_verify:
+            sent = await call_asgi(
+                middleware, "/mcp", method="POST", headers=headers, body=b"{}"
+            )
+
+        mock_verify.assert_called_once_with("Bearer good")
+        assert sent == await call_asgi(
+            inner_app, "/mcp", method="POST", headers=headers, body=b"{}"
+        )
+        assert [m.get("more_body") for m in sent[1:]] == [True, True, False]
+        assert received[0]["body"] == b"{}"
+
+    @pytest.mark.asyncio
+    async def test_auth_disabled_passes_through(self):
+        """Test every request passes when authentication is disabled."""
+        received = []
+        middleware = AuthorizationMiddleware(make_echo_app(received))
+
+        with patch.object(api_module.settings, "ENABLE_AUTH", False):
+            sent = await call_asgi(middleware, "/mcp")
+
+        assert sent[0]["status"] == 200
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope_passes_through(self):
+        """Test lifespan and other non-HTTP scopes are not inspected."""
+        inner_app = AsyncMock()
+        middleware = AuthorizationMiddleware(inner_app)
+        scope = {"type": "lifespan"}
+
+        await middleware(scope, AsyncMock(), AsyncMock())
+
+        inner_app.assert_called_once()
+
+
+class TestLocalDevelopmentAuthorizationMiddleware:
+    """Test the ASGI local development authorization middleware."""
+
+    @pytest.fixture(autouse=True)
+    def external_browser_auth(self):
+        """Run the middleware with external browser auth enabled."""
+        with (
+            patch.object(api_module.settings, "USE_EXTERNAL_BROWSER_AUTH", True),
+            patch.object(api_module, "_local_development_token", None),
+        ):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_non_tool_call_passes_with_body(self):
+        """Test MCP requests other than tools/call pass with their body intact."""
+        received = []
+        middleware = LocalDevelopmentAuthorizationMiddleware(make_echo_app(received))
+        body = json.dumps({"method": "tools/list"}).encode()
+
+        sent = await call_asgi(middleware, "/mcp", method="POST", body=body)
+
+        assert sent[0]["status"] == 200
+        assert received[0]["body"] == body
+
+    @pytest.mark.asyncio
+    async def test_tool_call_with_stored_token_adds_header(self):
+        """Test tool calls get the stored development token injected."""
+        received = []
+        middleware = LocalDevelopmentAuthorizationMiddleware(make_echo_app(received))
+        body = json.dumps({"method": "tools/call"}).encode()
+
+        with patch.object(api_module, "_local_development_token", "dev_token"):
+            sent = await call_asgi(middleware, "/mcp", method="POST", body=body)
+
+        assert sent[0]["status"] == 200
+        assert received[0]["headers"][b"authorization"] == b"Bearer dev_token"
+        assert received[0]["body"] == body
+
+    @pytest.mark.asyncio
+    async def test_tool_call_without_token_opens_browser(self):
+        """Test tool calls without a token start the browser OAuth flow."""
+        received = []
+        middleware = LocalDevelopmentAuthorizationMiddleware(make_echo_app(received))
+        body = json.dumps({"method": "tools/call"}).encode()
+
+        with (
+            patch.object(
+                api_module.OAuth2Handler,
+                "get_authorization_url",
+                return_value=("http://auth.url", "state"),
+            ),
+            patch("template_mcp_server.src.api.webbrowser.open") as mock_open,
+        ):
+            sent = await call_asgi(middleware, "/mcp", method="POST", body=body)
+
+        mock_open.assert_called_once_with("http://auth.url")
+        assert sent[0]["status"] == 401
+        assert json.loads(sent[1]["body"])["authorization_url"] == "http://auth.url"
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_passes_through(self):
+        """Test bodies that are not JSON objects are forwarded unchanged."""
+        received = []
+        middleware = LocalDevelopmentAuthorizationMiddleware(make_echo_app(received))
+
+        sent = await call_asgi(middleware, "/mcp", method="POST", body=b"[1, 2]")
+
+        assert sent[0]["status"] == 200
+        assert received[0]["body"] == b"[1, 2]"
+
+
+class TestPathScopedSessionMiddleware:
+    """Test session handling is limited to the OAuth routes."""
+
+    def make_middleware(self, received):
+        """Wrap an echo app with session support under /auth."""
+        return PathScopedSessionMiddleware(
+            make_echo_app(received),
+            path_prefixes=("/auth",),
+            secret_key="test-secret",
+            session_cookie="mcp_session",
+        )
+
+    @pytest.mark.asyncio
+    async def test_auth_paths_get_session(self):
+        """Test requests under /auth get a session in scope."""
+        received = []
+        middleware = self.make_middleware(received)
+
+        await call_asgi(middleware, "/auth/authorize")
+
+        assert received[0]["session"] == {}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["/mcp", "/sse", "/health", "/authorize"])
+    async def test_other_paths_skip_session(self, path):
+        """Test MCP transport and other routes carry no session."""
+        received = []
+        middleware = self.make_middleware(received)
+
+        sent = await call_asgi(
+            middleware,
+            path,
+            method="POST",
+            headers=[(b"cookie", b"mcp_session=garbage")],
+        )
+
+        assert received[0]["session"] is None
+        assert all(name != b"set-cookie" for name, _ in sent[0]["headers"])
+
+    def test_app_uses_scoped_session_middleware(self):
+        """Test the application installs the path-scoped session middleware."""
+        middleware_classes = [m.cls for m in app.user_middleware]
+
+        assert PathScopedSessionMiddleware in middleware_classes
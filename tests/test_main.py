@@ -5,8 +5,12 @@ from unittest.mock import Mock, patch
 import pytest
 
 from template_mcp_server.src.main import (
+    APP_IMPORT_STRING,
+    app,
     handle_startup_error,
     main,
+    resolve_event_loop,
+    resolve_http_implementation,
     run,
     validate_config,
 )
@@ -173,6 +177,60 @@ class TestHandleStartupError:
         )
 
 
+class TestRuntimeSelection:
+    """Test event loop and HTTP implementation selection."""
+
+    @pytest.mark.parametrize(
+        "requested,installed,expected",
+        [
+            ("auto", True, "uvloop"),
+            ("auto", False, "asyncio"),
+            ("uvloop", True, "uvloop"),
+            ("asyncio", True, "asyncio"),
+        ],
+    )
+    def test_resolve_event_loop(self, requested, installed, expected):
+        """Test auto detection and explicit event loop choices."""
+        with patch(
+            "template_mcp_server.src.main.importlib.util.find_spec",
+            return_value=Mock() if installed else None,
+        ):
+            assert resolve_event_loop(requested) == expected
+
+    def test_resolve_event_loop_missing_uvloop(self):
+        """Test requesting uvloop without it installed is a config error."""
+        with patch(
+            "template_mcp_server.src.main.importlib.util.find_spec", return_value=None
+        ):
+            with pytest.raises(ValueError, match="uvloop is not installed"):
+                resolve_event_loop("uvloop")
+
+    @pytest.mark.parametrize(
+        "requested,installed,expected",
+        [
+            ("auto", True, "httptools"),
+            ("auto", False, "h11"),
+            ("httptools", True, "httptools"),
+            ("h11", True, "h11"),
+        ],
+    )
+    def test_resolve_http_implementation(self, requested, installed, expected):
+        """Test auto detection and explicit HTTP implementation choices."""
+        with patch(
+            "template_mcp_server.src.main.importlib.util.find_spec",
+            return_value=Mock() if installed else None,
+        ):
+            assert resolve_http_implementation(requested) == expected
+
+    def test_resolve_http_implementation_missing_httptools(self):
+        """Test requesting httptools without it installed is a config error."""
+        with patch(
+            "template_mcp_server.src.main.importlib.util.find_spec", return_value=None
+        ):
+            with pytest.raises(ValueError, match="httptools is not installed"):
+                resolve_http_implementation("httptools")
+
+
 class TestMain:
     """Test the main function."""
 
@@ -188,6 +246,10 @@ class TestMain:
         mock_settings.MCP_TRANSPORT_PROTOCOL = "streamable-http"
         mock_settings.MCP_SSL_KEYFILE = None
         mock_settings.MCP_SSL_CERTFILE = None
+        mock_settings.MCP_WORKERS = 1
+        mock_settings.MCP_GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS = 30
+        mock_settings.MCP_EVENT_LOOP = "asyncio"
+        mock_settings.MCP_HTTP_IMPLEMENTATION = "h11"
 
         with patch("template_mcp_server.src.main.settings", mock_settings):
             # Act
@@ -197,6 +259,37 @@ class TestMain:
             mock_validate.assert_called_once()
             mock_logger.info.assert_called()
             mock_uvicorn.run.assert_called_once()
+            call_args = mock_uvicorn.run.call_args
+            assert call_args[0][0] is app
+            assert "workers" not in call_args[1]
+            assert call_args[1]["loop"] == "asyncio"
+            assert call_args[1]["http"] == "h11"
+            assert call_args[1]["timeout_graceful_shutdown"] == 30
+
+    @patch("template_mcp_server.src.main.validate_config")
+    @patch("template_mcp_server.src.main.logger")
+    @patch("template_mcp_server.src.main.uvicorn")
+    def test_main_with_workers(self, mock_uvicorn, mock_logger, mock_validate):
+        """Test several workers are started from the app import string."""
+        # Arrange
+        mock_settings = Mock()
+        mock_settings.MCP_HOST = "0.0.0.0"
+        mock_settings.MCP_PORT = 4000
+        mock_settings.MCP_TRANSPORT_PROTOCOL = "streamable-http"
+        mock_settings.MCP_SSL_KEYFILE = None
+        mock_settings.MCP_SSL_CERTFILE = None
+        mock_settings.MCP_WORKERS = 4
+        mock_settings.MCP_GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS = 15
+
+        with patch("template_mcp_server.src.main.settings", mock_settings):
+            # Act
+            main()
+
+            # Assert
+            call_args = mock_uvicorn.run.call_args
+            assert call_args[0][0] == APP_IMPORT_STRING
+            assert call_args[1]["workers"] == 4
+            assert call_args[1]["timeout_graceful_shutdown"] == 15
 
     @patch("template_mcp_server.src.main.validate_config")
     @patch("template_mcp_server.src.main.logger")
@@ -210,6 +303,7 @@ class TestMain:
         mock_settings.MCP_TRANSPORT_PROTOCOL = "streamable-http"
         mock_settings.MCP_SSL_KEYFILE = "/path/to/key.pem"
         mock_settings.MCP_SSL_CERTFILE = "/path/to/cert.pem"
+        mock_settings.MCP_WORKERS = 1
 
         with patch("template_mcp_server.src.main.settings", mock_settings):
             # Act
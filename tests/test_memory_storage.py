@@ -0,0 +1,412 @@
+"""Tests for the in-memory storage backend."""
+
+import json
+import time
+
+import pytest
+import pytest_asyncio
+
+from template_mcp_server.src.storage.memory_storage import (
+    InMemoryStorageService,
+    client_fingerprint,
+)
+from template_mcp_server.src.storage.storage_service import token_digest
+
+
+def client_data(client_id="client123", name="Test Client", redirect_uris=None):
+    """Build a client registration."""
+    return {
+        "id": client_id,
+        "secret": "secret123",
+        "name": name,
+        "redirect_uris": redirect_uris or ["http://localhost:8080/callback"],
+        "grant_types": ["authorization_code"],
+        "response_types": ["code"],
+        "scope": "read write",
+    }
+
+
+def code_data(expires_in=600.0):
+    """Build authorization code data for client123."""
+    return {
+        "client_id": "client123",
+        "redirect_uri": "http://localhost:8080/callback",
+        "scope": "read",
+        "code_challenge": "challenge",
+        "code_challenge_method": "S256",
+        "expires_at": time.time() + expires_in,
+        "state": "state123",
+    }
+
+
+@pytest_asyncio.fixture
+async def storage():
+    """Connected in-memory storage with one client registered."""
+    service = InMemoryStorageService()
+    await service.connect()
+    await service.store_client(client_data())
+    yield service
+    await service.disconnect()
+
+
+class TestConnection:
+    """Test connection state and status."""
+
+    @pytest.mark.asyncio
+    async def test_not_connected(self):
+        """Test every operation is refused before connect."""
+        service = InMemoryStorageService()
+
+        assert await service.is_healthy() is False
+        assert await service.store_client(client_data()) is False
+        assert await service.upsert_client(client_data()) is None
+        assert await service.get_client("client123") is None
+        assert await service.store_access_token("token", {}) is False
+
+    @pytest.mark.asyncio
+    async def test_status(self, storage):
+        """Test status reports the backend and row counts."""
+        status = await storage.get_status()
+
+        assert status["type"] == "memory"
+        assert status["healthy"] is True
+        assert status["clients"] == 1
+        assert status["access_tokens"] == 0
+
+
+class TestClients:
+    """Test client registration and lookup."""
+
+    def test_fingerprint_ignores_order_and_duplicates(self):
+        """Test redirect URI order and duplicates do not change the key."""
+        assert client_fingerprint("app", ["b", "a", "a"]) == client_fingerprint(
+            "app", ["a", "b"]
+        )
+        assert client_fingerprint("app", ["a"]) != client_fingerprint("other", ["a"])
+
+    @pytest.mark.asyncio
+    async def test_get_client_returns_copy(self, storage):
+        """Test callers cannot modify the stored client."""
+        client = await storage.get_client("client123")
+        client["redirect_uris"].append("http://evil.example.com")
+
+        stored = await storage.get_client("client123")
+        assert stored["redirect_uris"] == ["http://localhost:8080/callback"]
+        assert stored["secret"] == "secret123"
+        assert isinstance(stored["created_at"], float)
+
+    @pytest.mark.asyncio
+    async def test_store_client_rejects_duplicates(self, storage):
+        """Test duplicate IDs and exact name and URI pairs are rejected."""
+        assert await storage.store_client(client_data()) is False
+        assert await storage.store_client(client_data(client_id="other")) is False
+
+    @pytest.mark.asyncio
+    async def test_upsert_returns_existing_client(self, storage):
+        """Test a registration matching by fingerprint reuses the client."""
+        result = await storage.upsert_client(
+            client_data(
+                client_id="new",
+                redirect_uris=[
+                    "http://localhost:8080/callback",
+                    "http://localhost:8080/callback",
+                ],
+            )
+        )
+
+        assert result["id"] == "client123"
+        assert result["inserted"] is False
+
+    @pytest.mark.asyncio
+    async def test_upsert_inserts_new_client(self, storage):
+        """Test a new name registers a new client."""
+        result = await storage.upsert_client(client_data("new", name="New Client"))
+
+        assert result["id"] == "new"
+        assert result["inserted"] is True
+        assert (await storage.get_client("new"))["name"] == "New Client"
+
+
+class TestAuthorizationCodes:
+    """Test authorization code storage."""
+
+    @pytest.mark.asyncio
+    async def test_store_requires_known_client(self, storage):
+        """Test codes for unknown clients are rejected like the foreign key."""
+        data = code_data()
+        data["client_id"] = "unknown"
+
+        assert await storage.store_authorization_code("code123", data) is False
+
+    @pytest.mark.asyncio
+    async def test_code_lifecycle(self, storage):
+        """Test storing, attaching a token to and consuming a code."""
+        assert await storage.store_authorization_code("code123", code_data()) is True
+        await storage.update_authorization_code_token("code123", {"access": "x"})
+
+        code = await storage.consume_authorization_code("code123")
+
+        assert code["snowflake_token"] == {"access": "x"}
+        assert code["state"] == "state123"
+        assert await storage.consume_authorization_code("code123") is None
+        assert await storage.get_authorization_code("code123") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_code_not_consumed(self, storage):
+        """Test an expired code cannot be redeemed."""
+        await storage.store_authorization_code("code123", code_data(expires_in=-1))
+
+        assert await storage.consume_authorization_code("code123") is None
+
+    @pytest.mark.asyncio
+    async def test_delete_code(self, storage):
+        """Test deleting reports whether the code existed."""
+        await storage.store_authorization_code("code123", code_data())
+
+        assert await storage.delete_authorization_code("code123") is True
+        assert await storage.delete_authorization_code("code123") is False
+
+
+class TestTokens:
+    """Test access and refresh token storage."""
+
+    @pytest.mark.asyncio
+    async def test_access_token_lifecycle(self, storage):
+        """Test storing, reading and deleting an access token."""
+        expires_at = time.time() + 3600
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": expires_at}
+        )
+
+        assert await storage.get_access_token("token123") == {
+            "client_id": "client123",
+            "scope": None,
+            "token_type": "Bearer",
+            "expires_at": expires_at,
+        }
+        assert await storage.delete_access_token("token123") is True
+        assert await storage.get_access_token("token123") is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_token_requires_known_access_token(self, storage):
+        """Test refresh tokens cannot reference missing access tokens."""
+        result = await storage.store_refresh_token(
+            "refresh123",
+            {
+                "client_id": "client123",
+                "access_token": "missing",
+                "expires_at": time.time() + 3600,
+            },
+        )
+
+        assert result is False
+
+    @pytest.mark.asyncio
+    async def test_deleting_access_token_clears_reference(self, storage):
+        """Test deleting an access token nulls it on refresh tokens."""
+        expires_at = time.time() + 3600
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": expires_at}
+        )
+        await storage.store_refresh_token(
+            "refresh123",
+            {
+                "client_id": "client123",
+                "access_token": "token123",
+                "expires_at": expires_at,
+            },
+        )
+        assert (await storage.get_refresh_token("refresh123"))[
+            "access_token"
+        ] == "token123"
+
+        await storage.delete_access_token("token123")
+
+        assert (await storage.get_refresh_token("refresh123"))["access_token"] is None
+
+    @pytest.mark.asyncio
+    async def test_sha256_mode_keys_by_digest(self):
+        """Test sha256 mode never keeps the raw token."""
+        storage = InMemoryStorageService(token_storage_mode="sha256")
+        await storage.connect()
+        await storage.store_client(client_data())
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": time.time() + 60}
+        )
+
+        assert list(storage.tables["access_tokens"]) == [token_digest("token123").hex()]
+        assert await storage.get_access_token("token123") is not None
+
+
+class TestTokenPairs:
+    """Test storing access and refresh tokens together."""
+
+    def pair(self, suffix="", refresh_client="client123"):
+        """Build a token pair for client123."""
+        expires_at = time.time() + 3600
+        return (
+            f"access{suffix}",
+            {"client_id": "client123", "expires_at": expires_at},
+            f"refresh{suffix}",
+            {"client_id": refresh_client, "expires_at": expires_at},
+        )
+
+    @pytest.mark.asyncio
+    async def test_store_token_pair(self, storage):
+        """Test the refresh token references the access token of its pair."""
+        assert await storage.store_token_pair(*self.pair()) is True
+
+        refresh = await storage.get_refresh_token("refresh")
+        assert refresh["access_token"] == "access"
+        assert await storage.get_access_token("access") is not None
+
+    @pytest.mark.asyncio
+    async def test_store_token_pair_all_or_nothing(self, storage):
+        """Test a refresh token that cannot be stored leaves no access token."""
+        result = await storage.store_token_pair(*self.pair(refresh_client="unknown"))
+
+        assert result is False
+        assert await storage.get_access_token("access") is None
+
+    @pytest.mark.asyncio
+    async def test_bulk_store_counts_stored_pairs(self, storage):
+        """Test bulk storage reports how many pairs were stored."""
+        pairs = [self.pair(str(i)) for i in range(3)]
+
+        assert await storage.bulk_store_token_pairs(pairs) == 3
+
+    @pytest.mark.asyncio
+    async def test_bulk_store_all_or_nothing(self, storage):
+        """Test a pair that cannot be stored leaves none of the batch behind."""
+        pairs = [self.pair(str(i)) for i in range(3)] + [self.pair("0")]
+
+        assert await storage.bulk_store_token_pairs(pairs) == 0
+
+        assert storage.tables["access_tokens"] == {}
+        assert storage.tables["refresh_tokens"] == {}
+        assert storage._refresh_tokens_by_access_token == {}
+
+
+class TestExpiry:
+    """Test purging expired codes and tokens."""
+
+    @pytest.mark.asyncio
+    async def test_purge_in_expiry_order(self, storage):
+        """Test only entries past their expiry are purged."""
+        now = time.time()
+        for token, expires_in in [("late", 300), ("early", 10), ("mid", 100)]:
+            await storage.store_access_token(
+                token, {"client_id": "client123", "expires_at": now + expires_in}
+            )
+
+        assert storage._purge_expired(now + 150) == 2
+
+        assert list(storage.tables["access_tokens"]) == ["late"]
+
+    @pytest.mark.asyncio
+    async def test_purge_skips_replaced_entries(self, storage):
+        """Test a heap entry left by a deleted row does not purge its successor."""
+        now = time.time()
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": now + 10}
+        )
+        await storage.delete_access_token("token123")
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": now + 300}
+        )
+
+        assert storage._purge_expired(now + 150) == 0
+        assert await storage.get_access_token("token123") is not None
+
+    @pytest.mark.asyncio
+    async def test_writes_purge_expired_entries(self, storage):
+        """Test storing a token purges entries that already expired."""
+        await storage.store_authorization_code("old", code_data(expires_in=-1))
+
+        await storage.store_authorization_code("new", code_data())
+
+        assert list(storage.tables["authorization_codes"]) == ["new"]
+
+
+class TestSnapshots:
+    """Test saving and restoring state."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip(self, tmp_path):
+        """Test state saved on disconnect is restored on connect."""
+        path = str(tmp_path / "storage.json")
+        storage = InMemoryStorageService(snapshot_path=path)
+        await storage.connect()
+        await storage.store_client(client_data())
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": time.time() + 60}
+        )
+        await storage.store_refresh_token(
+            "refresh123",
+            {
+                "client_id": "client123",
+                "access_token": "token123",
+                "expires_at": time.time() + 60,
+            },
+        )
+        await storage.disconnect()
+
+        restored = InMemoryStorageService(snapshot_path=path)
+        await restored.connect()
+
+        assert (await restored.get_client("client123"))["name"] == "Test Client"
+        assert await restored.get_access_token("token123") is not None
+        # Indexes are rebuilt, so the refresh token reference is still tracked
+        await restored.delete_access_token("token123")
+        assert (await restored.get_refresh_token("refresh123"))["access_token"] is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_readable_by_owner_only(self, tmp_path):
+        """Test the snapshot, holding secrets and tokens, is not world-readable."""
+        path = tmp_path / "storage.json"
+        (tmp_path / "storage.json.tmp").write_text("left by a crash")
+        (tmp_path / "storage.json.tmp").chmod(0o644)
+        storage = InMemoryStorageService(snapshot_path=str(path))
+        await storage.connect()
+
+        await storage.save_snapshot()
+
+        assert path.stat().st_mode & 0o777 == 0o600
+
+    @pytest.mark.asyncio
+    async def test_snapshot_converted_to_sha256(self, tmp_path):
+        """Test a plain snapshot is rekeyed when loaded in sha256 mode."""
+        path = str(tmp_path / "storage.json")
+        storage = InMemoryStorageService(snapshot_path=path)
+        await storage.connect()
+        await storage.store_client(client_data())
+        await storage.store_access_token(
+            "token123", {"client_id": "client123", "expires_at": time.time() + 60}
+        )
+        await storage.disconnect()
+
+        restored = InMemoryStorageService(
+            snapshot_path=path, token_storage_mode="sha256"
+        )
+        await restored.connect()
+
+        assert await restored.get_access_token("token123") is not None
+        assert "token123" not in restored.tables["access_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_hashed_snapshot_rejected_in_plain_mode(self, tmp_path):
+        """Test plain mode refuses a snapshot keyed by digest."""
+        path = tmp_path / "storage.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "version": 1,
+                    "token_storage_mode": "sha256",
+                    "clients": [],
+                    "tables": {},
+                }
+            )
+        )
+
+        with pytest.raises(RuntimeError, match="TOKEN_STORAGE_MODE=sha256"):
+            await InMemoryStorageService(snapshot_path=str(path)).connect()
@@ -0,0 +1,237 @@
+"""Tests for the versioned schema migrations."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import asyncpg
+import pytest
+
+from template_mcp_server.src.storage import migrations
+from template_mcp_server.src.storage.migrations import (
+    MIGRATION_LOCK_KEY,
+    MIGRATIONS,
+    SCHEMA_VERSION,
+    TOKEN_KEY_MIGRATION,
+    get_schema_state,
+    migrate,
+    schema_is_current,
+)
+
+
+class AsyncContextManagerMock:
+    def __init__(self, return_value):
+        self.return_value = return_value
+
+    async def __aenter__(self):
+        return self.return_value
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+def mock_connection(current_version, key_type="character varying"):
+    """Build a connection reporting a schema version and token key type."""
+    conn = AsyncMock()
+    conn.fetchval.side_effect = [current_version, key_type]
+    conn.transaction = Mock(return_value=AsyncContextManagerMock(None))
+    return conn
+
+
+def executed(conn):
+    """Return the SQL of every execute call on a connection."""
+    return [call.args[0] for call in conn.execute.call_args_list]
+
+
+class TestMigrationList:
+    """Test the registered migrations."""
+
+    def test_versions_are_sequential(self):
+        """Test versions start at 1 without gaps or repeats."""
+        assert [m.version for m in MIGRATIONS] == list(range(1, len(MIGRATIONS) + 1))
+        assert SCHEMA_VERSION == MIGRATIONS[-1].version
+
+    def test_fingerprint_function_precedes_column(self):
+        """Test the generated column is added after its function exists."""
+        statements = [sql for m in MIGRATIONS for sql in m.statements]
+        function = next(
+            i
+            for i, sql in enumerate(statements)
+            if "FUNCTION oauth_client_fingerprint" in sql
+        )
+        column = next(
+            i
+            for i, sql in enumerate(statements)
+            if "ADD COLUMN IF NOT EXISTS client_fingerprint" in sql
+        )
+
+        assert function < column
+        assert any("idx_client_fingerprint" in sql for sql in statements)
+
+
+class TestSchemaState:
+    """Test reading the recorded schema state."""
+
+    @pytest.mark.asyncio
+    async def test_state_read_in_one_query(self):
+        """Test version and key type come from a single round trip."""
+        conn = AsyncMock()
+        conn.fetchrow.return_value = {"version": 3, "hashed": True}
+
+        assert await get_schema_state(conn) == (3, True)
+        conn.fetchrow.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unversioned_database(self):
+        """Test a database without the migrations table reports no version."""
+        conn = AsyncMock()
+        conn.fetchrow.side_effect = asyncpg.UndefinedTableError("missing")
+
+        assert await get_schema_state(conn) == (None, False)
+
+    def test_schema_is_current(self):
+        """Test the version and token key type must both match."""
+        assert schema_is_current(SCHEMA_VERSION, False, "plain")
+        assert schema_is_current(SCHEMA_VERSION + 1, True, "sha256")
+        assert not schema_is_current(None, False, "plain")
+        assert not schema_is_current(SCHEMA_VERSION - 1, False, "plain")
+        assert not schema_is_current(SCHEMA_VERSION, False, "sha256")
+
+
+class TestMigrate:
+    """Test applying migrations."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_applies_all(self):
+        """Test every migration runs and is recorded, under the lock."""
+        conn = mock_connection(0)
+
+        applied = await migrate(conn)
+
+        assert applied == [m.version for m in MIGRATIONS]
+        assert conn.execute.call_args_list[0].args == (
+            "SELECT pg_advisory_xact_lock($1)",
+            MIGRATION_LOCK_KEY,
+        )
+        recorded = [
+            call.args[1]
+            for call in conn.execute.call_args_list
+            if call.args[0].startswith("INSERT INTO schema_migrations")
+        ]
+        assert recorded == applied
+
+    @pytest.mark.asyncio
+    async def test_only_pending_migrations_applied(self):
+        """Test migrations already recorded are skipped."""
+        conn = mock_connection(SCHEMA_VERSION - 1)
+
+        applied = await migrate(conn)
+
+        assert applied == [SCHEMA_VERSION]
+        statements = executed(conn)
+        for migration in MIGRATIONS[:-1]:
+            assert migration.statements[0] not in statements
+
+    @pytest.mark.asyncio
+    async def test_current_database_runs_no_migrations(self):
+        """Test a current schema only takes the lock and checks state."""
+        conn = mock_connection(SCHEMA_VERSION)
+
+        assert await migrate(conn) == []
+        assert not any(
+            sql.startswith("INSERT INTO schema_migrations") for sql in executed(conn)
+        )
+
+    @pytest.mark.asyncio
+    async def test_sha256_mode_converts_plain_columns(self):
+        """Test switching to sha256 converts the key columns."""
+        conn = mock_connection(SCHEMA_VERSION)
+
+        await migrate(conn, "sha256")
+
+        assert TOKEN_KEY_MIGRATION in executed(conn)
+
+    @pytest.mark.asyncio
+    async def test_sha256_mode_on_hashed_columns_is_noop(self):
+        """Test already converted columns are left alone."""
+        conn = mock_connection(SCHEMA_VERSION, "bytea")
+
+        await migrate(conn, "sha256")
+
+        assert TOKEN_KEY_MIGRATION not in executed(conn)
+
+    @pytest.mark.asyncio
+    async def test_plain_mode_rejects_hashed_columns(self):
+        """Test plain mode refuses a schema already converted to digests."""
+        conn = mock_connection(SCHEMA_VERSION, "bytea")
+
+        with pytest.raises(RuntimeError, match="TOKEN_STORAGE_MODE=sha256"):
+            await migrate(conn)
+
+
+class TestCommand:
+    """Test the template-mcp-server-migrate command."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "state, status", [((SCHEMA_VERSION, False), 0), ((None, False), 1)]
+    )
+    async def test_check_reports_pending(self, state, status):
+        """Test --check exits 1 only when migrations are pending."""
+        conn = AsyncMock()
+
+        with (
+            patch.object(
+                migrations.asyncpg, "connect", new_callable=AsyncMock
+            ) as mock_connect,
+            patch.object(
+                migrations, "get_schema_state", new_callable=AsyncMock
+            ) as mock_state,
+            patch.object(migrations, "migrate", new_callable=AsyncMock) as mock_migrate,
+        ):
+            mock_connect.return_value = conn
+            mock_state.return_value = state
+
+            assert await migrations.run(check=True) == status
+
+        mock_migrate.assert_not_called()
+        conn.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_run_migrates(self):
+        """Test running without --check applies the migrations."""
+        conn = AsyncMock()
+
+        with (
+            patch.object(
+                migrations.asyncpg, "connect", new_callable=AsyncMock
+            ) as mock_connect,
+            patch.object(
+                migrations, "get_schema_state", new_callable=AsyncMock
+            ) as mock_state,
+            patch.object(migrations, "migrate", new_callable=AsyncMock) as mock_migrate,
+        ):
+            mock_connect.return_value = conn
+            mock_state.return_value = (None, False)
+            mock_migrate.return_value = [1, 2, 3]
+
+            assert await migrations.run() == 0
+
+        mock_migrate.assert_awaited_once_with(
+            conn, migrations.settings.TOKEN_STORAGE_MODE
+        )
+        conn.close.assert_awaited_once()
+
+    def test_main_exits_nonzero_on_failure(self):
+        """Test a failed migration exits with status 1."""
+        with (
+            patch("sys.argv", ["template-mcp-server-migrate"]),
+            patch.object(
+                migrations.asyncpg,
+                "connect",
+                new_callable=AsyncMock,
+                side_effect=OSError("refused"),
+            ),
+        ):
+            with pytest.raises(SystemExit) as exc_info:
+                migrations.main()
+
+        assert exc_info.value.code == 1
@@ -36,8 +36,8 @@ class TestOAuthControllerHandleCallback:
         with patch(
             "template_mcp_server.src.oauth.controller.OAuth2Handler"
         ) as mock_handler:
-            mock_handler.get_access_token_from_authorization_code_flow.return_value = (
-                mock_token
+            mock_handler.get_access_token_from_authorization_code_flow = AsyncMock(
+                return_value=mock_token
             )
 
             # Create mock OAuth service with dependency injection
@@ -47,8 +47,8 @@ class TestOAuthControllerHandleCallback:
             result = await controller.handle_callback(mock_request, oauth_service)
 
             # Verify OAuth2Handler was called correctly
-            mock_handler.get_access_token_from_authorization_code_flow.assert_called_once_with(
-                "auth_code_123", "state_123"
+            mock_handler.get_access_token_from_authorization_code_flow.assert_awaited_once_with(
+                "auth_code_123"
             )
 
             # Verify service was called
@@ -80,9 +80,9 @@ class TestOAuthControllerHandleCallback:
         with patch(
             "template_mcp_server.src.oauth.controller.OAuth2Handler"
         ) as mock_handler:
-            mock_handler.get_access_token_from_authorization_code_flow.return_value = {
-                "access_token": "token"
-            }
+            mock_handler.get_access_token_from_authorization_code_flow = AsyncMock(
+                return_value={"access_token": "token"}
+            )
 
             # Create mock OAuth service
             oauth_service = AsyncMock(spec=OAuthService)
@@ -116,8 +116,8 @@ class TestOAuthControllerHandleCallback:
                 "template_mcp_server.src.oauth.controller.api_module", create=True
             ) as mock_api_module,
         ):
-            mock_handler.get_access_token_from_authorization_code_flow.return_value = (
-                mock_token
+            mock_handler.get_access_token_from_authorization_code_flow = AsyncMock(
+                return_value=mock_token
             )
 
             # Create mock OAuth service
@@ -126,8 +126,8 @@ class TestOAuthControllerHandleCallback:
             result = await controller.handle_callback(mock_request, oauth_service)
 
             # Verify OAuth2Handler was called correctly
-            mock_handler.get_access_token_from_authorization_code_flow.assert_called_once_with(
-                "auth_code_123", "state_123"
+            mock_handler.get_access_token_from_authorization_code_flow.assert_awaited_once_with(
+                "auth_code_123"
             )
 
             # Verify token was stored in local development mode
@@ -244,9 +244,8 @@ class TestOAuthControllerHandleToken:
 
         # Create mock OAuth service
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code = AsyncMock(return_value=code_data)
+        oauth_service.consume_authorization_code = AsyncMock(return_value=code_data)
         oauth_service.validate_client = AsyncMock(return_value={"id": "client123"})
-        oauth_service.mark_code_as_used = AsyncMock()
 
         with patch(
             "template_mcp_server.src.oauth.controller.verify_code_challenge",
@@ -255,11 +254,11 @@ class TestOAuthControllerHandleToken:
             result = await controller.handle_token(mock_request, oauth_service)
 
             # Verify service calls
-            oauth_service.validate_authorization_code.assert_called_once_with("code123")
+            oauth_service.consume_authorization_code.assert_called_once_with("code123")
             oauth_service.validate_client.assert_called_once_with(
                 "client123", "secret123"
             )
-            oauth_service.mark_code_as_used.assert_called_once_with("code123")
+            oauth_service.mark_code_as_used.assert_not_called()
 
             # Verify response
             assert result["access_token"] == "snowflake_access"
@@ -325,7 +324,7 @@ class TestOAuthControllerHandleToken:
         mock_request.body = AsyncMock(return_value=b"")
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code = AsyncMock(return_value=None)
+        oauth_service.consume_authorization_code = AsyncMock(return_value=None)
 
         with pytest.raises(HTTPException) as exc_info:
             await controller.handle_token(mock_request, oauth_service)
@@ -361,7 +360,7 @@ class TestOAuthControllerHandleToken:
         }
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code = AsyncMock(return_value=code_data)
+        oauth_service.consume_authorization_code = AsyncMock(return_value=code_data)
         oauth_service.validate_client = AsyncMock(return_value={"id": "client123"})
 
         with patch(
@@ -645,6 +644,20 @@ class TestParseTokenRequest:
         assert exc_info.value.detail["error"] == "invalid_request"
         assert "Invalid request format" in exc_info.value.detail["error_description"]
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("body", [[], "x"])
+    async def test_parse_request_json_not_object(self, body):
+        """Test a JSON body that is not an object is an invalid request."""
+        mock_request = Mock()
+        mock_request.headers.get.return_value = "application/json"
+        mock_request.json = AsyncMock(return_value=body)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.parse_token_request(mock_request)
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail["error"] == "invalid_request"
+
     @pytest.mark.asyncio
     async def test_parse_request_form_data_error(self):
         """Test parsing request with form data error."""
@@ -702,7 +715,7 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = None
+        oauth_service.consume_authorization_code.return_value = None
 
         with pytest.raises(HTTPException) as exc_info:
             await controller.handle_authorization_code_grant(
@@ -715,9 +728,7 @@ class TestAuthorizationCodeGrantEdgeCases:
             "Invalid or expired authorization code"
             in exc_info.value.detail["error_description"]
         )
-        oauth_service.validate_authorization_code.assert_called_once_with(
-            "invalid_code"
-        )
+        oauth_service.consume_authorization_code.assert_called_once_with("invalid_code")
 
     @patch("template_mcp_server.src.oauth.controller.settings")
     @pytest.mark.asyncio
@@ -739,7 +750,7 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = {
+        oauth_service.consume_authorization_code.return_value = {
             "client_id": "test_client",
             "redirect_uri": "http://localhost:3000/callback",
             "code_challenge": "test_challenge",
@@ -775,7 +786,7 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = {
+        oauth_service.consume_authorization_code.return_value = {
             "client_id": "test_client",
             "redirect_uri": "http://localhost:3000/callback",
             "code_challenge": "test_challenge",
@@ -812,7 +823,7 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = {
+        oauth_service.consume_authorization_code.return_value = {
             "client_id": "test_client",
             "redirect_uri": "http://localhost:3000/callback",
             "code_challenge": "test_challenge",
@@ -852,7 +863,7 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = {
+        oauth_service.consume_authorization_code.return_value = {
             "client_id": "test_client",
             "redirect_uri": "http://localhost:3000/callback",
             "code_challenge": "test_challenge",
@@ -863,7 +874,6 @@ class TestAuthorizationCodeGrantEdgeCases:
             },
         }
         oauth_service.validate_client.return_value = {"id": "test_client"}
-        oauth_service.mark_code_as_used = AsyncMock()
 
         with patch(
             "template_mcp_server.src.oauth.controller.verify_code_challenge"
@@ -880,7 +890,7 @@ class TestAuthorizationCodeGrantEdgeCases:
             assert result["expires_in"] == 3600
             assert result["scope"] == "read write"
 
-            oauth_service.mark_code_as_used.assert_called_once_with("valid_code")
+            oauth_service.mark_code_as_used.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_successful_grant_without_snowflake_tokens(self):
@@ -899,14 +909,13 @@ class TestAuthorizationCodeGrantEdgeCases:
         )
 
         oauth_service = AsyncMock(spec=OAuthService)
-        oauth_service.validate_authorization_code.return_value = {
+        oauth_service.consume_authorization_code.return_value = {
             "client_id": "test_client",
             "redirect_uri": "http://localhost:3000/callback",
             "code_challenge": "test_challenge",
             "scope": "read",
         }
         oauth_service.validate_client.return_value = {"id": "test_client"}
-        oauth_service.mark_code_as_used = AsyncMock()
 
         with patch(
             "template_mcp_server.src.oauth.controller.verify_code_challenge"
@@ -923,7 +932,7 @@ class TestAuthorizationCodeGrantEdgeCases:
             assert result["scope"] == "read"
             assert "refresh_token" not in result
 
-            oauth_service.mark_code_as_used.assert_called_once_with("valid_code")
+            oauth_service.mark_code_as_used.assert_not_called()
 
 
 class TestRefreshTokenGrantEdgeCases:
@@ -1016,11 +1025,13 @@ class TestRefreshTokenGrantEdgeCases:
         with patch(
             "template_mcp_server.src.oauth.controller.OAuth2Handler"
         ) as mock_handler:
-            mock_handler.get_access_token_from_refresh_token.return_value = {
-                "access_token": "new_snowflake_access_token",
-                "refresh_token": "new_snowflake_refresh_token",
-                "expires_in": 7200,
-            }
+            mock_handler.get_access_token_from_refresh_token = AsyncMock(
+                return_value={
+                    "access_token": "new_snowflake_access_token",
+                    "refresh_token": "new_snowflake_refresh_token",
+                    "expires_in": 7200,
+                }
+            )
 
             result = await controller.handle_refresh_token_grant_pydantic(
                 token_request, oauth_service
@@ -1032,7 +1043,7 @@ class TestRefreshTokenGrantEdgeCases:
             assert result["expires_in"] == 7200
             assert result["scope"] == "read write"
 
-            mock_handler.get_access_token_from_refresh_token.assert_called_once_with(
+            mock_handler.get_access_token_from_refresh_token.assert_awaited_once_with(
                 "snowflake_refresh_token"
             )
 
@@ -1059,8 +1070,8 @@ class TestRefreshTokenGrantEdgeCases:
         with patch(
             "template_mcp_server.src.oauth.controller.OAuth2Handler"
         ) as mock_handler:
-            mock_handler.get_access_token_from_refresh_token.side_effect = Exception(
-                "Snowflake error"
+            mock_handler.get_access_token_from_refresh_token = AsyncMock(
+                side_effect=Exception("Snowflake error")
             )
 
             result = await controller.handle_refresh_token_grant_pydantic(
@@ -1,9 +1,26 @@
+import asyncio
 import time
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
+import pytest
 
-from template_mcp_server.src.oauth.handler import SCOPE, OAuth2Handler
+from template_mcp_server.src.oauth import handler as handler_module
+from template_mcp_server.src.oauth.handler import (
+    SCOPE,
+    OAuth2Handler,
+    TokenExchangeError,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Start every test with empty token verification caches."""
+    handler_module._token_cache.clear()
+    handler_module._negative_token_cache.clear()
+    yield
+    handler_module._token_cache.clear()
+    handler_module._negative_token_cache.clear()
 
 
 class TestOAuth2Handler:
@@ -63,59 +80,9 @@ class TestOAuth2Handler:
         assert state == "state123"
 
     @patch("template_mcp_server.src.oauth.handler.settings")
-    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.create_oauth_session")
-    def test_get_access_token_from_authorization_code_flow(
-        self, mock_create_session, mock_settings
-    ):
-        """Test getting access token from authorization code flow."""
-        mock_settings.SSO_CLIENT_SECRET = "test_secret"
-
-        mock_session = Mock()
-        mock_token = {"access_token": "token123", "token_type": "Bearer"}
-        mock_session.fetch_token.return_value = mock_token
-        mock_create_session.return_value = mock_session
-
-        result = OAuth2Handler.get_access_token_from_authorization_code_flow(
-            "code123", "state123"
-        )
-
-        mock_create_session.assert_called_once_with(state="state123")
-        mock_session.fetch_token.assert_called_once_with(
-            mock_settings.SSO_TOKEN_URL,
-            code="code123",
-            client_secret="test_secret",
-            include_client_id=True,
-        )
-        assert result == mock_token
-
-    @patch("template_mcp_server.src.oauth.handler.settings")
-    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.create_oauth_session")
-    def test_get_access_token_from_refresh_token(
-        self, mock_create_session, mock_settings
-    ):
-        """Test getting access token from refresh token."""
-        mock_settings.SSO_CLIENT_ID = "client123"
-        mock_settings.SSO_CLIENT_SECRET = "secret123"
-
-        mock_session = Mock()
-        mock_token = {"access_token": "new_token123", "token_type": "Bearer"}
-        mock_session.refresh_token.return_value = mock_token
-        mock_create_session.return_value = mock_session
-
-        result = OAuth2Handler.get_access_token_from_refresh_token("refresh123")
-
-        mock_create_session.assert_called_once_with()
-        mock_session.refresh_token.assert_called_once_with(
-            mock_settings.SSO_TOKEN_URL,
-            refresh_token="refresh123",
-            client_id="client123",
-            client_secret="secret123",
-        )
-        assert result == mock_token
-
-    @patch("template_mcp_server.src.oauth.handler.settings")
-    @patch("template_mcp_server.src.oauth.handler.httpx.post")
-    def test_introspect_token_success(self, mock_post, mock_settings):
+    @patch("template_mcp_server.src.oauth.handler.get_http_client")
+    @pytest.mark.asyncio
+    async def test_introspect_token_success(self, mock_get_client, mock_settings):
         """Test successful token introspection."""
         mock_settings.SSO_CLIENT_ID = "client123"
         mock_settings.SSO_CLIENT_SECRET = "secret123"
@@ -123,11 +90,13 @@ class TestOAuth2Handler:
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = {"active": True, "sub": "user123"}
-        mock_post.return_value = mock_response
+        mock_client = Mock()
+        mock_client.post = AsyncMock(return_value=mock_response)
+        mock_get_client.return_value = mock_client
 
-        result = OAuth2Handler.introspect_token("token123")
+        result = await OAuth2Handler.introspect_token("token123")
 
-        mock_post.assert_called_once_with(
+        mock_client.post.assert_called_once_with(
             mock_settings.SSO_INTROSPECTION_URL,
             data={
                 "token": "token123",
@@ -135,40 +104,48 @@ class TestOAuth2Handler:
                 "client_secret": "secret123",
             },
             headers={"Content-Type": "application/x-www-form-urlencoded"},
-            timeout=10.0,
         )
         assert result == {"active": True, "sub": "user123"}
 
     @patch("template_mcp_server.src.oauth.handler.settings")
-    @patch("template_mcp_server.src.oauth.handler.httpx.post")
-    def test_introspect_token_http_error(self, mock_post, mock_settings):
+    @patch("template_mcp_server.src.oauth.handler.get_http_client")
+    @pytest.mark.asyncio
+    async def test_introspect_token_http_error(self, mock_get_client, mock_settings):
         """Test token introspection with HTTP error."""
         mock_settings.SSO_CLIENT_ID = "client123"
         mock_settings.SSO_CLIENT_SECRET = "secret123"
 
-        mock_post.side_effect = httpx.HTTPError("Connection failed")
+        mock_client = Mock()
+        mock_client.post = AsyncMock(side_effect=httpx.HTTPError("Connection failed"))
+        mock_get_client.return_value = mock_client
 
-        result = OAuth2Handler.introspect_token("token123")
+        result = await OAuth2Handler.introspect_token("token123")
 
         assert result["active"] is False
         assert "Introspection failed" in result["error"]
 
     @patch("template_mcp_server.src.oauth.handler.settings")
-    @patch("template_mcp_server.src.oauth.handler.httpx.post")
-    def test_introspect_token_unexpected_error(self, mock_post, mock_settings):
+    @patch("template_mcp_server.src.oauth.handler.get_http_client")
+    @pytest.mark.asyncio
+    async def test_introspect_token_unexpected_error(
+        self, mock_get_client, mock_settings
+    ):
         """Test token introspection with unexpected error."""
         mock_settings.SSO_CLIENT_ID = "client123"
         mock_settings.SSO_CLIENT_SECRET = "secret123"
 
-        mock_post.side_effect = Exception("Unexpected error")
+        mock_client = Mock()
+        mock_client.post = AsyncMock(side_effect=Exception("Unexpected error"))
+        mock_get_client.return_value = mock_client
 
-        result = OAuth2Handler.introspect_token("token123")
+        result = await OAuth2Handler.introspect_token("token123")
 
         assert result["active"] is False
         assert "Unexpected error" in result["error"]
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
-    def test_verify_access_token_active(self, mock_introspect):
+    @pytest.mark.asyncio
+    async def test_verify_access_token_active(self, mock_introspect):
         """Test verifying an active access token."""
         mock_introspect.return_value = {
             "active": True,
@@ -177,24 +154,26 @@ class TestOAuth2Handler:
             "sub": "user123",
         }
 
-        result = OAuth2Handler.verify_access_token("token123")
+        result = await OAuth2Handler.verify_access_token("token123")
 
         mock_introspect.assert_called_once_with("token123")
         assert result["active"] is True
         assert result["sub"] == "user123"
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
-    def test_verify_access_token_inactive(self, mock_introspect):
+    @pytest.mark.asyncio
+    async def test_verify_access_token_inactive(self, mock_introspect):
         """Test verifying an inactive token."""
         mock_introspect.return_value = {"active": False}
 
-        result = OAuth2Handler.verify_access_token("token123")
+        result = await OAuth2Handler.verify_access_token("token123")
 
         mock_introspect.assert_called_once_with("token123")
         assert result is None
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
-    def test_verify_access_token_expired(self, mock_introspect):
+    @pytest.mark.asyncio
+    async def test_verify_access_token_expired(self, mock_introspect):
         """Test verifying an expired token."""
         mock_introspect.return_value = {
             "active": True,
@@ -202,12 +181,13 @@ class TestOAuth2Handler:
             "token_type": "Bearer",
         }
 
-        result = OAuth2Handler.verify_access_token("token123")
+        result = await OAuth2Handler.verify_access_token("token123")
 
         assert result is None
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
-    def test_verify_access_token_invalid_type(self, mock_introspect):
+    @pytest.mark.asyncio
+    async def test_verify_access_token_invalid_type(self, mock_introspect):
         """Test verifying token with invalid type."""
         mock_introspect.return_value = {
             "active": True,
@@ -215,12 +195,13 @@ class TestOAuth2Handler:
             "token_type": "refresh_token",
         }
 
-        result = OAuth2Handler.verify_access_token("token123")
+        result = await OAuth2Handler.verify_access_token("token123")
 
         assert result is None
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
-    def test_verify_access_token_no_expiry(self, mock_introspect):
+    @pytest.mark.asyncio
+    async def test_verify_access_token_no_expiry(self, mock_introspect):
         """Test verifying token without expiry."""
         mock_introspect.return_value = {
             "active": True,
@@ -228,33 +209,35 @@ class TestOAuth2Handler:
             "sub": "user123",
         }
 
-        result = OAuth2Handler.verify_access_token("token123")
+        result = await OAuth2Handler.verify_access_token("token123")
 
         assert result["active"] is True
         assert result["sub"] == "user123"
 
     @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.verify_access_token")
-    def test_verify_authorization_header_valid(self, mock_verify):
+    @pytest.mark.asyncio
+    async def test_verify_authorization_header_valid(self, mock_verify):
         """Test verifying valid authorization header."""
         mock_verify.return_value = {"active": True, "sub": "user123"}
 
-        result = OAuth2Handler.verify_authorization_header("Bearer token123")
+        result = await OAuth2Handler.verify_authorization_header("Bearer token123")
 
         mock_verify.assert_called_once_with("token123")
         assert result["active"] is True
 
-    def test_verify_authorization_header_invalid_format(self):
+    @pytest.mark.asyncio
+    async def test_verify_authorization_header_invalid_format(self):
         """Test verifying invalid authorization header format."""
         # Test missing header
-        result = OAuth2Handler.verify_authorization_header("")
+        result = await OAuth2Handler.verify_authorization_header("")
         assert result is None
 
         # Test None header
-        result = OAuth2Handler.verify_authorization_header(None)
+        result = await OAuth2Handler.verify_authorization_header(None)
         assert result is None
 
         # Test wrong format
-        result = OAuth2Handler.verify_authorization_header("Basic token123")
+        result = await OAuth2Handler.verify_authorization_header("Basic token123")
         assert result is None
 
     def test_scope_constant(self):
@@ -263,15 +246,311 @@ class TestOAuth2Handler:
         assert SCOPE == expected_scope
 
 
+class TestOAuth2HandlerTokenCache:
+    """Test caching of verified tokens."""
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_active_token_is_cached(self, mock_introspect):
+        """Test repeated verification of an active token introspects once."""
+        mock_introspect.return_value = {
+            "active": True,
+            "exp": time.time() + 3600,
+            "token_type": "Bearer",
+        }
+
+        first = await OAuth2Handler.verify_access_token("token123")
+        second = await OAuth2Handler.verify_access_token("token123")
+
+        assert first == second
+        mock_introspect.assert_called_once_with("token123")
+        stats = handler_module.get_token_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_inactive_token_is_negatively_cached(self, mock_introspect):
+        """Test an inactive token is rejected without introspecting again."""
+        mock_introspect.return_value = {"active": False}
+
+        assert await OAuth2Handler.verify_access_token("token123") is None
+        assert await OAuth2Handler.verify_access_token("token123") is None
+
+        mock_introspect.assert_called_once_with("token123")
+        stats = handler_module.get_token_cache_stats()
+        assert stats["size"] == 0
+        assert stats["negative"]["size"] == 1
+        assert stats["negative"]["hits"] == 1
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_expired_token_is_negatively_cached(self, mock_introspect):
+        """Test an expired token is rejected without introspecting again."""
+        mock_introspect.return_value = {
+            "active": True,
+            "exp": time.time() - 10,
+            "token_type": "Bearer",
+        }
+
+        await OAuth2Handler.verify_access_token("token123")
+        await OAuth2Handler.verify_access_token("token123")
+
+        mock_introspect.assert_called_once()
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_introspection_error_is_not_negatively_cached(self, mock_introspect):
+        """Test transient introspection failures are retried."""
+        mock_introspect.return_value = {
+            "active": False,
+            "error": "Introspection failed: timeout",
+        }
+
+        await OAuth2Handler.verify_access_token("token123")
+        await OAuth2Handler.verify_access_token("token123")
+
+        assert mock_introspect.call_count == 2
+        assert handler_module.get_token_cache_stats()["negative"]["size"] == 0
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_concurrent_verifications_share_one_introspection(
+        self, mock_introspect
+    ):
+        """Test parallel verifications of a new token introspect only once."""
+        release = asyncio.Event()
+
+        async def slow_introspect(token):
+            await release.wait()
+            return {"active": True, "token_type": "Bearer", "sub": "user123"}
+
+        mock_introspect.side_effect = slow_introspect
+
+        tasks = [
+            asyncio.create_task(OAuth2Handler.verify_access_token("token123"))
+            for _ in range(50)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        mock_introspect.assert_called_once_with("token123")
+        assert all(result["sub"] == "user123" for result in results)
+        assert handler_module.get_token_cache_stats()["verifications"]["shared"] >= 49
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_token_digest(self, mock_introspect):
+        """Test the raw token is never used as the cache key."""
+        mock_introspect.return_value = {"active": True, "token_type": "Bearer"}
+
+        await OAuth2Handler.verify_access_token("token123")
+
+        keys = list(handler_module._token_cache._entries)
+        assert keys == [handler_module.hash_token("token123")]
+        assert len(keys[0]) == 32
+
+    @patch("template_mcp_server.src.oauth.handler.settings")
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self, mock_introspect, mock_settings):
+        """Test every verification introspects when caching is disabled."""
+        mock_settings.TOKEN_CACHE_ENABLED = False
+        mock_introspect.return_value = {"active": True, "token_type": "Bearer"}
+
+        await OAuth2Handler.verify_access_token("token123")
+        await OAuth2Handler.verify_access_token("token123")
+
+        assert mock_introspect.call_count == 2
+
+
+class TestOAuth2HandlerTokenExchange:
+    """Test token exchanges against a stub SSO token endpoint."""
+
+    @pytest.fixture
+    def token_endpoint(self):
+        """Serve a stub token endpoint and record the grants it receives."""
+        grants = []
+        responses = []
+
+        def handle(request):
+            grants.append(dict(httpx.QueryParams(request.content.decode())))
+            return responses.pop(0)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        with (
+            patch.object(handler_module, "get_http_client", return_value=client),
+            patch.object(
+                handler_module.settings,
+                "SSO_TOKEN_URL",
+                "https://sso.example.com/token",
+            ),
+        ):
+            yield grants, responses
+
+    @pytest.mark.asyncio
+    async def test_authorization_code_exchange(self, token_endpoint):
+        """Test the code is exchanged with client credentials in the form."""
+        grants, responses = token_endpoint
+        responses.append(
+            httpx.Response(
+                200,
+                json={
+                    "access_token": "token123",
+                    "refresh_token": "refresh123",
+                    "expires_in": 300,
+                },
+            )
+        )
+
+        token = await OAuth2Handler.get_access_token_from_authorization_code_flow(
+            "code123"
+        )
+
+        assert token["access_token"] == "token123"
+        assert token["expires_at"] == pytest.approx(time.time() + 300, abs=5)
+        assert grants[0]["grant_type"] == "authorization_code"
+        assert grants[0]["code"] == "code123"
+        assert grants[0]["redirect_uri"] == handler_module.settings.SSO_CALLBACK_URL
+        assert grants[0]["client_id"] == handler_module.settings.SSO_CLIENT_ID
+        assert "state" not in grants[0]
+
+    @pytest.mark.asyncio
+    async def test_refresh_token_exchange(self, token_endpoint):
+        """Test a refresh token is exchanged for a new access token."""
+        grants, responses = token_endpoint
+        responses.append(
+            httpx.Response(
+                200, json={"access_token": "new_token123", "token_type": "Bearer"}
+            )
+        )
+
+        token = await OAuth2Handler.get_access_token_from_refresh_token("refresh123")
+
+        assert token == {"access_token": "new_token123", "token_type": "Bearer"}
+        assert grants[0]["grant_type"] == "refresh_token"
+        assert grants[0]["refresh_token"] == "refresh123"
+        assert grants[0]["scope"] == " ".join(SCOPE)
+
+    @pytest.mark.asyncio
+    async def test_rejected_grant_raises(self, token_endpoint):
+        """Test an OAuth error response raises TokenExchangeError."""
+        _, responses = token_endpoint
+        responses.append(
+            httpx.Response(
+                400,
+                json={"error": "invalid_grant", "error_description": "Code expired"},
+            )
+        )
+
+        with pytest.raises(TokenExchangeError, match="invalid_grant Code expired"):
+            await OAuth2Handler.get_access_token_from_authorization_code_flow("code")
+
+    @pytest.mark.asyncio
+    async def test_non_json_response_raises(self, token_endpoint):
+        """Test an error page from the SSO raises TokenExchangeError."""
+        _, responses = token_endpoint
+        responses.append(httpx.Response(502, text="Bad Gateway"))
+
+        with pytest.raises(TokenExchangeError, match="HTTP 502"):
+            await OAuth2Handler.get_access_token_from_refresh_token("refresh123")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("body", [[], "access_token"])
+    async def test_non_object_response_raises(self, token_endpoint, body):
+        """Test a JSON response that is not an object raises TokenExchangeError."""
+        _, responses = token_endpoint
+        responses.append(httpx.Response(200, json=body))
+
+        with pytest.raises(TokenExchangeError, match="HTTP 200"):
+            await OAuth2Handler.get_access_token_from_refresh_token("refresh123")
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises(self):
+        """Test a token endpoint timeout raises TokenExchangeError."""
+        mock_client = AsyncMock()
+        mock_client.post.side_effect = httpx.ReadTimeout("timed out")
+
+        with patch.object(handler_module, "get_http_client", return_value=mock_client):
+            with pytest.raises(TokenExchangeError, match="Token request failed"):
+                await OAuth2Handler.get_access_token_from_refresh_token("refresh123")
+
+        timeout = mock_client.post.call_args.kwargs["timeout"]
+        assert timeout == handler_module.settings.SSO_TOKEN_TIMEOUT_SECONDS
+
+
+class TestOAuth2HandlerHTTPClient:
+    """Test the shared SSO HTTP client lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_until_closed(self):
+        """Test the pooled client is created once and recreated after cleanup."""
+        await handler_module.cleanup_http_client()
+
+        client = await handler_module.initialize_http_client()
+        assert handler_module.get_http_client() is client
+        assert not client.is_closed
+
+        await handler_module.cleanup_http_client()
+        assert client.is_closed
+        assert handler_module._http_client is None
+
+    @patch("template_mcp_server.src.oauth.handler.settings")
+    def test_create_http_client_uses_pool_settings(self, mock_settings):
+        """Test the client is configured from the SSO HTTP settings."""
+        mock_settings.SSO_HTTP2_ENABLED = False
+        mock_settings.SSO_HTTP_TIMEOUT = 2.5
+        mock_settings.SSO_HTTP_MAX_CONNECTIONS = 7
+        mock_settings.SSO_HTTP_MAX_KEEPALIVE_CONNECTIONS = 3
+        mock_settings.SSO_HTTP_KEEPALIVE_EXPIRY = 12.0
+
+        with patch(
+            "template_mcp_server.src.oauth.handler.httpx.AsyncClient"
+        ) as mock_client_cls:
+            handler_module.create_http_client()
+
+        kwargs = mock_client_cls.call_args.kwargs
+        assert kwargs["http2"] is False
+        assert kwargs["timeout"] == 2.5
+        assert kwargs["limits"] == httpx.Limits(
+            max_connections=7, max_keepalive_connections=3, keepalive_expiry=12.0
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "status_code,expected", [(200, True), (405, True), (503, False)]
+    )
+    async def test_check_sso_reachable(self, status_code, expected):
+        """Test any non-5xx response from the SSO counts as reachable."""
+        mock_client = AsyncMock()
+        mock_client.get.return_value = httpx.Response(status_code)
+
+        with patch.object(handler_module, "get_http_client", return_value=mock_client):
+            assert await handler_module.check_sso_reachable() is expected
+
+        mock_client.get.assert_awaited_once()
+        assert mock_client.get.call_args.args[0] == (
+            handler_module.settings.SSO_INTROSPECTION_URL
+        )
+
+    @pytest.mark.asyncio
+    async def test_check_sso_unreachable(self):
+        """Test connection errors make the SSO unreachable."""
+        mock_client = AsyncMock()
+        mock_client.get.side_effect = httpx.ConnectError("refused")
+
+        with patch.object(handler_module, "get_http_client", return_value=mock_client):
+            assert await handler_module.check_sso_reachable() is False
+
+
 class TestOAuth2HandlerIntegration:
     """Integration tests for OAuth2Handler."""
 
     @patch("template_mcp_server.src.oauth.handler.settings")
     @patch("template_mcp_server.src.oauth.handler.OAuth2Session")
-    @patch("template_mcp_server.src.oauth.handler.httpx.post")
-    def test_full_oauth_flow_simulation(
-        self, mock_post, mock_oauth_session, mock_settings
-    ):
+    @pytest.mark.asyncio
+    async def test_full_oauth_flow_simulation(self, mock_oauth_session, mock_settings):
         """Test a full OAuth flow simulation."""
         # Setup
         mock_settings.SSO_CLIENT_ID = "client123"
@@ -281,10 +560,6 @@ class TestOAuth2HandlerIntegration:
         # Mock OAuth session
         mock_session = Mock()
         mock_session.authorization_url.return_value = ("http://auth.url", "state123")
-        mock_session.fetch_token.return_value = {
-            "access_token": "token123",
-            "refresh_token": "refresh123",
-        }
         mock_oauth_session.return_value = mock_session
 
         # Mock introspection
@@ -295,19 +570,31 @@ class TestOAuth2HandlerIntegration:
             "exp": time.time() + 3600,
             "token_type": "Bearer",
         }
-        mock_post.return_value = mock_response
+        mock_client = Mock()
+        mock_client.post = AsyncMock(
+            side_effect=[
+                httpx.Response(
+                    200, json={"access_token": "token123", "refresh_token": "r123"}
+                ),
+                mock_response,
+            ]
+        )
 
         # Test authorization URL generation
         auth_url, state = OAuth2Handler.get_authorization_url()
         assert auth_url == "http://auth.url"
         assert state == "state123"
 
-        # Test token exchange
-        token = OAuth2Handler.get_access_token_from_authorization_code_flow(
-            "code123", state
-        )
-        assert token["access_token"] == "token123"
+        with patch(
+            "template_mcp_server.src.oauth.handler.get_http_client",
+            return_value=mock_client,
+        ):
+            # Test token exchange
+            token = await OAuth2Handler.get_access_token_from_authorization_code_flow(
+                "code123"
+            )
+            assert token["access_token"] == "token123"
 
-        # Test token verification
-        verification = OAuth2Handler.verify_access_token("token123")
+            # Test token verification
+            verification = await OAuth2Handler.verify_access_token("token123")
         assert verification["active"] is True
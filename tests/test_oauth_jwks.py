@@ -0,0 +1,292 @@
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from template_mcp_server.src.oauth import handler as handler_module
+from template_mcp_server.src.oauth.handler import OAuth2Handler
+from template_mcp_server.src.oauth.jwks import (
+    JWKSVerifier,
+    LocalVerificationUnavailable,
+)
+
+ISSUER = "https://sso.example.com/realms/test"
+AUDIENCE = "template-mcp-server"
+
+
+def generate_key(kid):
+    """Generate an RSA key pair and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+def make_token(private_key, kid, **claims):
+    """Sign a JWT access token with the given key."""
+    now = int(time.time())
+    payload = {
+        "iss": ISSUER,
+        "aud": AUDIENCE,
+        "sub": "user123",
+        "typ": "Bearer",
+        "iat": now,
+        "exp": now + 300,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def key_pair():
+    """Provide a signing key and its JWK."""
+    return generate_key("key-1")
+
+
+@pytest.fixture
+def jwks_file(tmp_path, key_pair):
+    """Write a stub JWKS file containing the public key."""
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [key_pair[1]]}))
+    return path
+
+
+@pytest.fixture
+def jwks_requests():
+    """Record requests made to the stub JWKS endpoint."""
+    return []
+
+
+@pytest.fixture
+def verifier(jwks_file, jwks_requests):
+    """Provide a verifier whose JWKS endpoint serves the stub file."""
+
+    def serve_jwks(request):
+        jwks_requests.append(request)
+        return httpx.Response(200, content=jwks_file.read_bytes())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(serve_jwks))
+    return JWKSVerifier(
+        jwks_url="https://sso.example.com/jwks",
+        http_client_factory=lambda: client,
+        algorithms=["RS256"],
+        issuer=ISSUER,
+        audience=AUDIENCE,
+        min_refresh_interval=0,
+    )
+
+
+class TestJWKSVerifier:
+    """Test local JWT verification."""
+
+    @pytest.mark.asyncio
+    async def test_valid_token(self, verifier, key_pair):
+        """Test a correctly signed token is accepted with its claims."""
+        await verifier.refresh()
+        token = make_token(key_pair[0], "key-1")
+
+        result = await verifier.verify(token)
+
+        assert result["active"] is True
+        assert result["sub"] == "user123"
+        assert result["iss"] == ISSUER
+
+    @pytest.mark.asyncio
+    async def test_keys_fetched_on_first_use(self, verifier, key_pair, jwks_requests):
+        """Test an empty key set is loaded when the first token arrives."""
+        token = make_token(key_pair[0], "key-1")
+
+        assert await verifier.verify(token) is not None
+        assert await verifier.verify(token) is not None
+
+        assert len(jwks_requests) == 1
+        assert verifier.key_ids == ["key-1"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            {"exp": int(time.time()) - 60},
+            {"nbf": int(time.time()) + 600},
+            {"aud": "another-service"},
+            {"iss": "https://evil.example.com"},
+            {"typ": "Refresh"},
+        ],
+    )
+    async def test_invalid_claims_rejected(self, verifier, key_pair, claims):
+        """Test expired, not-yet-valid and foreign tokens are rejected."""
+        await verifier.refresh()
+        token = make_token(key_pair[0], "key-1", **claims)
+
+        assert await verifier.verify(token) is None
+
+    @pytest.mark.asyncio
+    async def test_bad_signature_rejected(self, verifier):
+        """Test a token signed by an unknown key claiming a known kid fails."""
+        await verifier.refresh()
+        other_key, _ = generate_key("key-1")
+        token = make_token(other_key, "key-1")
+
+        assert await verifier.verify(token) is None
+
+    @pytest.mark.asyncio
+    async def test_disallowed_algorithm_rejected(self, verifier):
+        """Test tokens using an algorithm outside the allow list fail."""
+        await verifier.refresh()
+        token = jwt.encode(
+            {"sub": "user123", "exp": int(time.time()) + 300},
+            "secret",
+            algorithm="HS256",
+            headers={"kid": "key-1"},
+        )
+
+        assert await verifier.verify(token) is None
+
+    @pytest.mark.asyncio
+    async def test_algorithm_not_matching_key_rejected(self, verifier):
+        """Test an allowed algorithm from another key family is rejected."""
+        verifier.algorithms = ["RS256", "ES256"]
+        await verifier.refresh()
+        token = jwt.encode(
+            {"sub": "user123", "exp": int(time.time()) + 300},
+            ec.generate_private_key(ec.SECP256R1()),
+            algorithm="ES256",
+            headers={"kid": "key-1"},
+        )
+
+        assert await verifier.verify(token) is None
+
+    @pytest.mark.asyncio
+    async def test_key_algorithm_outside_allow_list_rejected(self, verifier, key_pair):
+        """Test a key for an algorithm not in the allow list is not used."""
+        verifier.algorithms = ["ES256"]
+        await verifier.refresh()
+        token = make_token(key_pair[0], "key-1")
+
+        assert await verifier.verify(token) is None
+
+    @pytest.mark.asyncio
+    async def test_key_rotation_by_kid(self, verifier, jwks_file, key_pair):
+        """Test a token signed with a newly published key triggers a refetch."""
+        await verifier.refresh()
+        new_private, new_jwk = generate_key("key-2")
+        jwks_file.write_text(json.dumps({"keys": [key_pair[1], new_jwk]}))
+
+        result = await verifier.verify(make_token(new_private, "key-2"))
+
+        assert result["active"] is True
+        assert sorted(verifier.key_ids) == ["key-1", "key-2"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refetch_is_rate_limited(
+        self, verifier, key_pair, jwks_requests
+    ):
+        """Test unknown key IDs do not refetch more than once per interval."""
+        verifier.min_refresh_interval = 3600
+        await verifier.refresh()
+        token = make_token(key_pair[0], "missing-key")
+
+        for _ in range(3):
+            with pytest.raises(LocalVerificationUnavailable):
+                await verifier.verify(token)
+
+        assert len(jwks_requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_opaque_token_needs_introspection(self, verifier):
+        """Test non-JWT tokens are handed back for introspection."""
+        with pytest.raises(LocalVerificationUnavailable):
+            await verifier.verify("opaque-token")
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_keeps_previous_keys(self, key_pair):
+        """Test a failed refresh leaves the loaded keys in place."""
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        verifier = JWKSVerifier(
+            jwks_url="https://sso.example.com/jwks",
+            http_client_factory=lambda: client,
+            algorithms=["RS256"],
+        )
+        verifier.load_jwks({"keys": [key_pair[1]]})
+
+        assert await verifier.refresh() is False
+        assert verifier.key_ids == ["key-1"]
+
+    def test_load_jwks_without_signing_keys(self):
+        """Test a JWKS without usable signing keys is refused."""
+        verifier = JWKSVerifier(
+            jwks_url="https://sso.example.com/jwks",
+            http_client_factory=httpx.AsyncClient,
+            algorithms=["RS256"],
+        )
+
+        with pytest.raises(ValueError):
+            verifier.load_jwks({"keys": [{"kid": "enc", "use": "enc", "kty": "RSA"}]})
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop_background_refresh(self, verifier, jwks_requests):
+        """Test start loads the keys and stop cancels the refresh task."""
+        await verifier.start()
+        assert verifier.key_ids == ["key-1"]
+        assert verifier._refresh_task is not None
+
+        await verifier.stop()
+        assert verifier._refresh_task is None
+        assert len(jwks_requests) == 1
+
+
+class TestHandlerJWKSMode:
+    """Test OAuth2Handler with local JWT verification enabled."""
+
+    @pytest.fixture(autouse=True)
+    def jwks_mode(self, verifier):
+        """Enable jwks mode with the stub verifier and clean caches."""
+        handler_module._token_cache.clear()
+        handler_module._negative_token_cache.clear()
+        with (
+            patch.object(handler_module.settings, "TOKEN_VERIFICATION_MODE", "jwks"),
+            patch.object(handler_module, "_jwks_verifier", verifier),
+        ):
+            yield
+        handler_module._token_cache.clear()
+        handler_module._negative_token_cache.clear()
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_jwt_verified_without_introspection(self, mock_introspect, key_pair):
+        """Test a valid JWT is accepted without calling the SSO."""
+        token = make_token(key_pair[0], "key-1")
+
+        result = await OAuth2Handler.verify_access_token(token)
+
+        assert result["sub"] == "user123"
+        mock_introspect.assert_not_called()
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_invalid_jwt_rejected_without_introspection(
+        self, mock_introspect, key_pair
+    ):
+        """Test an expired JWT is rejected locally and negatively cached."""
+        token = make_token(key_pair[0], "key-1", exp=int(time.time()) - 60)
+
+        assert await OAuth2Handler.verify_access_token(token) is None
+        mock_introspect.assert_not_called()
+        assert handler_module.get_token_cache_stats()["negative"]["size"] == 1
+
+    @patch("template_mcp_server.src.oauth.handler.OAuth2Handler.introspect_token")
+    @pytest.mark.asyncio
+    async def test_opaque_token_falls_back_to_introspection(self, mock_introspect):
+        """Test tokens that are not JWTs are introspected remotely."""
+        mock_introspect.return_value = {"active": True, "token_type": "Bearer"}
+
+        result = await OAuth2Handler.verify_access_token("opaque-token")
+
+        assert result["active"] is True
+        mock_introspect.assert_called_once_with("opaque-token")
@@ -8,10 +8,12 @@ from template_mcp_server.src.oauth.service import (
     add_token_to_code,
     base64url_encode,
     cleanup_storage,
+    consume_authorization_code,
     create_authorization_code,
     generate_random_string,
     get_storage_service,
     get_storage_status,
+    get_worker_pool_limits,
     initialize_storage,
     mark_code_as_used,
     register_client,
@@ -21,11 +23,13 @@ from template_mcp_server.src.oauth.service import (
     revoke_refresh_token,
     store_access_token,
     store_refresh_token,
+    store_token_pair,
     validate_authorization_code,
     validate_client,
     validate_refresh_token,
     verify_code_challenge,
 )
+from template_mcp_server.src.storage.memory_storage import InMemoryStorageService
 
 
 class TestUtilityFunctions:
@@ -139,6 +143,19 @@ class TestStorageService:
                 mock_settings.POSTGRES_PASSWORD = "testpass"
                 mock_settings.POSTGRES_POOL_SIZE = 10
                 mock_settings.POSTGRES_MAX_CONNECTIONS = 20
+                mock_settings.CLIENT_CACHE_TTL_SECONDS = 60.0
+                mock_settings.CLIENT_CACHE_MAX_ENTRIES = 1000
+                mock_settings.TOKEN_STORAGE_MODE = "plain"
+                mock_settings.STORAGE_BACKEND = "postgresql"
+                mock_settings.POSTGRES_READ_REPLICA_DSNS = []
+                mock_settings.POSTGRES_REPLICA_MAX_LAG_SECONDS = 5.0
+                mock_settings.POSTGRES_REPLICA_LAG_CHECK_INTERVAL_SECONDS = 5.0
+                mock_settings.POSTGRES_AUTO_MIGRATE = False
+                mock_settings.POSTGRES_POOL_ADAPTIVE = True
+                mock_settings.POSTGRES_POOL_ADAPTIVE_WAIT_THRESHOLD_MS = 20.0
+                mock_settings.POSTGRES_POOL_ADAPTIVE_INTERVAL_SECONDS = 10.0
+                mock_settings.POSTGRES_POOL_ACQUIRE_TIMEOUT_SECONDS = 5.0
+                mock_settings.MCP_WORKERS = 1
 
                 result = await initialize_storage()
 
@@ -150,10 +167,41 @@ class TestStorageService:
                     password="testpass",
                     pool_size=10,
                     max_connections=20,
+                    client_cache_ttl=60.0,
+                    client_cache_max_entries=1000,
+                    token_storage_mode="plain",
+                    read_replica_dsns=[],
+                    replica_max_lag=5.0,
+                    replica_lag_check_interval=5.0,
+                    auto_migrate=False,
+                    adaptive_pool=True,
+                    adaptive_pool_wait_threshold=0.02,
+                    adaptive_pool_interval=10.0,
+                    pool_acquire_timeout=5.0,
                 )
                 mock_storage.connect.assert_called_once()
                 assert result == mock_storage
 
+    @pytest.mark.parametrize(
+        "workers,pool_size,max_connections,expected",
+        [
+            (1, 10, 20, (10, 20)),
+            (4, 10, 20, (2, 5)),
+            (3, 2, 20, (1, 6)),
+            (8, 10, 8, (1, 1)),
+        ],
+    )
+    def test_get_worker_pool_limits(
+        self, workers, pool_size, max_connections, expected
+    ):
+        """Test each worker gets an equal share of the connection budget."""
+        with patch("template_mcp_server.src.oauth.service.settings") as mock_settings:
+            mock_settings.MCP_WORKERS = workers
+            mock_settings.POSTGRES_POOL_SIZE = pool_size
+            mock_settings.POSTGRES_MAX_CONNECTIONS = max_connections
+
+            assert get_worker_pool_limits() == expected
+
     @pytest.mark.asyncio
     async def test_initialize_storage_missing_config(self):
         """Test storage initialization with missing configuration."""
@@ -171,6 +219,24 @@ class TestStorageService:
                 ):
                     await initialize_storage()
 
+    @pytest.mark.asyncio
+    async def test_initialize_storage_memory_backend(self):
+        """Test the memory backend starts without PostgreSQL configuration."""
+        with patch("template_mcp_server.src.oauth.service._storage_service", None):
+            with patch(
+                "template_mcp_server.src.oauth.service.settings"
+            ) as mock_settings:
+                mock_settings.STORAGE_BACKEND = "memory"
+                mock_settings.POSTGRES_HOST = None
+                mock_settings.MEMORY_STORAGE_SNAPSHOT_PATH = None
+                mock_settings.MEMORY_STORAGE_SNAPSHOT_INTERVAL_SECONDS = 0.0
+                mock_settings.TOKEN_STORAGE_MODE = "plain"
+
+                result = await initialize_storage()
+
+                assert isinstance(result, InMemoryStorageService)
+                assert await result.is_healthy() is True
+
     @pytest.mark.asyncio
     async def test_initialize_storage_already_initialized(self):
         """Test storage initialization when already initialized."""
@@ -274,8 +340,11 @@ class TestClientManagement:
     async def test_register_client_new(self):
         """Test registering a new client."""
         mock_storage = AsyncMock()
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = None
-        mock_storage.store_client.return_value = True
+        mock_storage.upsert_client.side_effect = lambda client_data: {
+            **client_data,
+            "created_at": time.time(),
+            "inserted": True,
+        }
 
         with patch(
             "template_mcp_server.src.oauth.service.get_storage_service",
@@ -293,7 +362,8 @@ class TestClientManagement:
                 assert result["client_id"] == "client123"
                 assert result["client_secret"] == "secret123"
                 assert result["client_name"] == "Test Client"
-                mock_storage.store_client.assert_called_once()
+                mock_storage.upsert_client.assert_called_once()
+                mock_storage.get_client_by_name_and_redirect_uris.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_register_client_existing(self):
@@ -307,10 +377,11 @@ class TestClientManagement:
             "response_types": ["code"],
             "scope": "read write",
             "created_at": 1234567890,
+            "inserted": False,
         }
 
         mock_storage = AsyncMock()
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = existing_client
+        mock_storage.upsert_client.return_value = existing_client
 
         with patch(
             "template_mcp_server.src.oauth.service.get_storage_service",
@@ -322,15 +393,14 @@ class TestClientManagement:
 
             assert result["client_id"] == "existing123"
             assert result["client_secret"] == "existing_secret"
-            # Should not call store_client for existing client
-            mock_storage.store_client.assert_not_called()
+            assert result["client_id_issued_at"] == 1234567890
+            mock_storage.upsert_client.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_register_client_storage_failure(self):
         """Test client registration when storage fails."""
         mock_storage = AsyncMock()
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = None
-        mock_storage.store_client.return_value = False
+        mock_storage.upsert_client.return_value = None
 
         with patch(
             "template_mcp_server.src.oauth.service.get_storage_service",
@@ -433,6 +503,37 @@ class TestAuthorizationCodeFlow:
             result = await validate_authorization_code("code123")
             assert result is None
 
+    @pytest.mark.asyncio
+    async def test_consume_authorization_code_valid(self):
+        """Test redeeming a valid authorization code."""
+        mock_storage = AsyncMock()
+        mock_storage.consume_authorization_code.return_value = {
+            "client_id": "client123",
+            "expires_at": time.time() + 600,
+        }
+
+        with patch(
+            "template_mcp_server.src.oauth.service.get_storage_service",
+            return_value=mock_storage,
+        ):
+            result = await consume_authorization_code("code123")
+            assert result["client_id"] == "client123"
+            mock_storage.consume_authorization_code.assert_called_once_with("code123")
+            mock_storage.delete_authorization_code.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_consume_authorization_code_invalid(self):
+        """Test redeeming an unknown, expired or already used code."""
+        mock_storage = AsyncMock()
+        mock_storage.consume_authorization_code.return_value = None
+
+        with patch(
+            "template_mcp_server.src.oauth.service.get_storage_service",
+            return_value=mock_storage,
+        ):
+            result = await consume_authorization_code("code123")
+            assert result is None
+
     @pytest.mark.asyncio
     async def test_mark_code_as_used_success(self):
         """Test marking authorization code as used successfully."""
@@ -520,6 +621,27 @@ class TestTokenManagement:
                 "refresh123", token_data
             )
 
+    @pytest.mark.asyncio
+    async def test_store_token_pair(self):
+        """Test storing an access token together with its refresh token."""
+        mock_storage = AsyncMock()
+        mock_storage.store_token_pair.return_value = True
+
+        access_data = {"client_id": "client123", "expires_at": time.time() + 3600}
+        refresh_data = {"client_id": "client123", "expires_at": time.time() + 86400}
+
+        with patch(
+            "template_mcp_server.src.oauth.service.get_storage_service",
+            return_value=mock_storage,
+        ):
+            result = await store_token_pair(
+                "access123", access_data, "refresh123", refresh_data
+            )
+            assert result is True
+            mock_storage.store_token_pair.assert_called_once_with(
+                "access123", access_data, "refresh123", refresh_data
+            )
+
     @pytest.mark.asyncio
     async def test_retrieve_refresh_token(self):
         """Test retrieving refresh token."""
@@ -631,8 +753,11 @@ class TestOAuthServiceIntegration:
         mock_storage = AsyncMock()
 
         # Setup storage responses
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = None
-        mock_storage.store_client.return_value = True
+        mock_storage.upsert_client.side_effect = lambda client_data: {
+            **client_data,
+            "created_at": time.time(),
+            "inserted": True,
+        }
         mock_storage.get_client.return_value = {
             "id": "client123",
             "secret": "secret123",
@@ -857,8 +982,7 @@ class TestOAuthServiceEdgeCases:
         from template_mcp_server.src.storage.storage_service import StorageService
 
         mock_storage = AsyncMock(spec=StorageService)
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = None
-        mock_storage.store_client.return_value = False  # Storage failure
+        mock_storage.upsert_client.return_value = None  # Storage failure
 
         oauth_service = OAuthService(mock_storage)
 
@@ -883,10 +1007,11 @@ class TestOAuthServiceEdgeCases:
             "response_types": ["code"],
             "scope": "read write",
             "created_at": time.time() - 86400,  # Created yesterday
+            "inserted": False,
         }
 
         mock_storage = AsyncMock(spec=StorageService)
-        mock_storage.get_client_by_name_and_redirect_uris.return_value = existing_client
+        mock_storage.upsert_client.return_value = existing_client
 
         oauth_service = OAuthService(mock_storage)
 
@@ -896,7 +1021,7 @@ class TestOAuthServiceEdgeCases:
 
         assert result["client_id"] == "existing_client_id"
         assert result["client_secret"] == "existing_secret"
-        # Should not call store_client since existing client was found
+        # The upsert returns the existing row; nothing is stored separately
         mock_storage.store_client.assert_not_called()
 
     @pytest.mark.asyncio
@@ -986,35 +1111,18 @@ class TestOAuthServiceConcurrency:
         from template_mcp_server.src.oauth.service import OAuthService
         from template_mcp_server.src.storage.storage_service import StorageService
 
-        # First call returns None (no existing client), subsequent calls return existing client
-        existing_client = {
-            "id": "first_client_id",
-            "secret": "first_secret",
-            "name": "Test Client",
-            "redirect_uris": ["http://localhost:3000/callback"],
-            "grant_types": ["authorization_code"],
-            "response_types": ["code"],
-            "scope": "read write",
-            "created_at": time.time(),
-        }
-
+        # The first upsert inserts; the others conflict and get the same row
         mock_storage = AsyncMock(spec=StorageService)
+        first_client = None
 
-        # Simulate race condition: first call finds no existing client, others find existing
-        call_count = 0
+        async def mock_upsert(client_data):
+            nonlocal first_client
+            if first_client is None:
+                first_client = {**client_data, "created_at": time.time()}
+                return {**first_client, "inserted": True}
+            return {**first_client, "inserted": False}
 
-        async def mock_get_existing(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return None  # First call: no existing client
-            else:
-                return existing_client  # Subsequent calls: existing client found
-
-        mock_storage.get_client_by_name_and_redirect_uris.side_effect = (
-            mock_get_existing
-        )
-        mock_storage.store_client.return_value = True
+        mock_storage.upsert_client.side_effect = mock_upsert
 
         oauth_service = OAuthService(mock_storage)
 
@@ -1027,16 +1135,13 @@ class TestOAuthServiceConcurrency:
             for _ in range(3)
         ]
 
-        with patch(
-            "template_mcp_server.src.oauth.service.generate_random_string"
-        ) as mock_gen:
-            mock_gen.side_effect = ["new_client_id", "new_secret"]
-
-            results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*tasks)
 
-        # At least one should create a new client, others should return existing
+        # Every caller gets the credentials of the single stored client
         assert len(results) == 3
-        assert all("client_id" in result for result in results)
+        assert len({result["client_id"] for result in results}) == 1
+        assert len({result["client_secret"] for result in results}) == 1
+        mock_storage.store_client.assert_not_called()
 
 
 class TestUtilityFunctionsEdgeCases:
@@ -0,0 +1,258 @@
+"""Tests for connection pool instrumentation and adaptive sizing."""
+
+import asyncio
+from unittest.mock import Mock
+
+import asyncpg
+import pytest
+
+from template_mcp_server.src.storage.pool_metrics import AdaptiveLimiter, PoolMonitor
+
+
+class AsyncContextManagerMock:
+    def __init__(self, return_value, enter_error=None):
+        self.return_value = return_value
+        self.enter_error = enter_error
+
+    async def __aenter__(self):
+        if self.enter_error is not None:
+            raise self.enter_error
+        return self.return_value
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+def mock_pool(conn=None, enter_error=None):
+    """Build a pool handing out conn, or failing to."""
+    pool = Mock()
+    pool.acquire = lambda **kwargs: AsyncContextManagerMock(conn, enter_error)
+    pool.get_size.return_value = 10
+    pool.get_idle_size.return_value = 7
+    pool.get_min_size.return_value = 10
+    pool.get_max_size.return_value = 20
+    return pool
+
+
+class TestAdaptiveLimiter:
+    """Test the resizable semaphore."""
+
+    @pytest.mark.asyncio
+    async def test_waits_at_limit(self):
+        """Test an acquire beyond the limit waits for a release."""
+        limiter = AdaptiveLimiter(1, 1, 4)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert limiter.waiting == 1
+
+        limiter.release()
+        await waiter
+        assert limiter.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_growing_admits_waiters(self):
+        """Test raising the limit wakes waiting tasks."""
+        limiter = AdaptiveLimiter(1, 1, 4)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        limiter.resize(2)
+        await waiter
+
+        assert limiter.in_use == 2
+        assert limiter.peak_in_use == 2
+
+    @pytest.mark.asyncio
+    async def test_resize_within_bounds(self):
+        """Test the limit stays between its minimum and maximum."""
+        limiter = AdaptiveLimiter(2, 2, 4)
+
+        limiter.resize(10)
+        assert limiter.limit == 4
+        limiter.resize(0)
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test a cancelled wait neither takes nor leaks a slot."""
+        limiter = AdaptiveLimiter(1, 1, 4)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+        assert limiter.in_use == 0
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_acquire_times_out(self):
+        """Test a wait past its timeout fails without taking a slot."""
+        limiter = AdaptiveLimiter(1, 1, 4)
+        await limiter.acquire()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await limiter.acquire(timeout=0.01)
+
+        assert limiter.in_use == 1
+        assert limiter.waiting == 0
+        limiter.release()
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+
+class TestPoolMonitor:
+    """Test acquire and query metrics."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_records_wait(self):
+        """Test every acquire is timed and the limiter slot returned."""
+        monitor = PoolMonitor(AdaptiveLimiter(2, 2, 4))
+        conn = Mock()
+
+        async with monitor.acquire(mock_pool(conn)) as acquired:
+            assert acquired is conn
+            assert monitor.limiter.in_use == 1
+
+        assert monitor.acquire_wait.count == 1
+        assert monitor.limiter.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout_counted(self):
+        """Test a timed out acquire is counted and frees its slot."""
+        monitor = PoolMonitor(AdaptiveLimiter(2, 2, 4))
+        pool = mock_pool(enter_error=asyncio.TimeoutError())
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with monitor.acquire(pool):
+                pass
+
+        assert monitor.acquire_timeouts == 1
+        assert monitor.acquire_wait.count == 0
+        assert monitor.limiter.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout_passed_to_pool(self):
+        """Test the pool acquire is bounded by the configured timeout."""
+        monitor = PoolMonitor(acquire_timeout=2.0)
+        pool = mock_pool(Mock())
+        pool.acquire = Mock(return_value=AsyncContextManagerMock(Mock()))
+
+        async with monitor.acquire(pool):
+            pass
+
+        pool.acquire.assert_called_once_with(timeout=2.0)
+
+    @pytest.mark.asyncio
+    async def test_limiter_wait_counts_toward_timeout(self):
+        """Test a full limiter times out the acquire and counts it."""
+        monitor = PoolMonitor(AdaptiveLimiter(1, 1, 4), acquire_timeout=0.01)
+        await monitor.limiter.acquire()
+        pool = mock_pool(Mock())
+        pool.acquire = Mock()
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with monitor.acquire(pool):
+                pass
+
+        assert monitor.acquire_timeouts == 1
+        assert monitor.limiter.in_use == 1
+        pool.acquire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_query_timeout_not_counted_as_acquire_timeout(self):
+        """Test a query timing out inside an acquire counts as a query timeout."""
+        monitor = PoolMonitor()
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with monitor.acquire(mock_pool(Mock())):
+                with monitor.query("get_client"):
+                    raise asyncio.TimeoutError()
+
+        assert monitor.acquire_timeouts == 0
+        assert monitor.query_timeouts == 1
+        assert monitor.queries["get_client"].count == 1
+
+    @pytest.mark.asyncio
+    async def test_statement_timeout_counted(self):
+        """Test a query cancelled by statement_timeout counts as a timeout."""
+        monitor = PoolMonitor()
+
+        with pytest.raises(asyncpg.QueryCanceledError):
+            with monitor.query("get_client"):
+                raise asyncpg.QueryCanceledError("canceling statement")
+
+        assert monitor.query_timeouts == 1
+
+    def test_metrics(self):
+        """Test pool counts are reported alongside the timings."""
+        monitor = PoolMonitor()
+        monitor.acquire_wait.observe(0.002)
+
+        metrics = monitor.metrics(mock_pool())
+
+        assert metrics["size"] == 10
+        assert metrics["idle"] == 7
+        assert metrics["in_use"] == 3
+        assert metrics["max_size"] == 20
+        assert metrics["limit"] is None
+        assert metrics["acquire_wait"]["count"] == 1
+
+    def test_metrics_before_connect(self):
+        """Test a pool not opened yet reports empty counts."""
+        metrics = PoolMonitor().metrics(None)
+
+        assert metrics["size"] == 0
+        assert metrics["in_use"] == 0
+
+
+class TestAdapt:
+    """Test adaptive limit changes."""
+
+    def test_grows_on_sustained_waits(self):
+        """Test the limit grows when acquires waited past the threshold."""
+        monitor = PoolMonitor(AdaptiveLimiter(2, 2, 10))
+        monitor.limiter.peak_in_use = 2
+        for _ in range(5):
+            monitor.acquire_wait.observe(0.05)
+
+        monitor.adapt(wait_threshold=0.01)
+
+        assert monitor.limiter.limit == 3
+
+    def test_ignores_waits_already_seen(self):
+        """Test only acquires since the last adjustment are considered."""
+        monitor = PoolMonitor(AdaptiveLimiter(2, 2, 10))
+        monitor.limiter.peak_in_use = 2
+        monitor.acquire_wait.observe(0.05)
+        monitor.adapt(wait_threshold=0.01)
+
+        monitor.limiter.peak_in_use = 3
+        monitor.acquire_wait.observe(0.0001)
+        monitor.adapt(wait_threshold=0.01)
+
+        assert monitor.limiter.limit == 3
+
+    def test_shrinks_when_mostly_idle(self):
+        """Test the limit shrinks when at most half of it was used."""
+        monitor = PoolMonitor(AdaptiveLimiter(6, 2, 10))
+        monitor.limiter.peak_in_use = 3
+
+        monitor.adapt(wait_threshold=0.01)
+
+        assert monitor.limiter.limit == 5
+
+    def test_without_limiter_is_noop(self):
+        """Test monitors without a limiter are not resized."""
+        monitor = PoolMonitor()
+        monitor.acquire_wait.observe(1.0)
+
+        monitor.adapt(wait_threshold=0.01)
+
+        assert monitor.limiter is None
@@ -0,0 +1,124 @@
+"""Tests for the readiness monitor."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from template_mcp_server.src import readiness as readiness_module
+from template_mcp_server.src.readiness import (
+    ReadinessMonitor,
+    cleanup_readiness_monitor,
+    get_readiness_monitor,
+    initialize_readiness_monitor,
+)
+
+
+class TestReadinessMonitor:
+    """Test the background dependency checks."""
+
+    def test_not_ready_before_first_check(self):
+        """Test the monitor reports not ready until checks have run."""
+        monitor = ReadinessMonitor({"storage": AsyncMock(return_value=True)})
+
+        assert monitor.is_ready is False
+        assert monitor.status()["status"] == "not_ready"
+
+    @pytest.mark.asyncio
+    async def test_all_checks_healthy(self):
+        """Test the monitor is ready when every check passes."""
+        storage = AsyncMock(return_value=True)
+        sso = AsyncMock(return_value=True)
+        monitor = ReadinessMonitor({"storage": storage, "sso": sso})
+
+        assert await monitor.check() is True
+
+        status = monitor.status()
+        assert status["status"] == "ready"
+        assert status["checks"]["storage"]["healthy"] is True
+        assert status["checks"]["sso"]["healthy"] is True
+        assert status["checked_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_no_checks_is_ready(self):
+        """Test a server without dependencies is ready after the first round."""
+        monitor = ReadinessMonitor({})
+
+        assert await monitor.check() is True
+
+    @pytest.mark.asyncio
+    async def test_failing_check(self):
+        """Test one unhealthy dependency makes the server not ready."""
+        monitor = ReadinessMonitor(
+            {
+                "storage": AsyncMock(return_value=False),
+                "sso": AsyncMock(return_value=True),
+            }
+        )
+
+        assert await monitor.check() is False
+        assert monitor.status()["checks"]["storage"]["healthy"] is False
+
+    @pytest.mark.asyncio
+    async def test_check_exception_recorded(self):
+        """Test a check that raises counts as failed and records the error."""
+        monitor = ReadinessMonitor(
+            {"storage": AsyncMock(side_effect=ConnectionError("refused"))}
+        )
+
+        assert await monitor.check() is False
+        assert monitor.results["storage"]["error"] == "refused"
+
+    @pytest.mark.asyncio
+    async def test_check_timeout(self):
+        """Test a hanging check fails after the timeout."""
+
+        async def hang():
+            await asyncio.sleep(10)
+            return True
+
+        monitor = ReadinessMonitor({"storage": hang}, timeout=0.01)
+
+        assert await monitor.check() is False
+        assert "timed out" in monitor.results["storage"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_background_checks_follow_dependency(self):
+        """Test the background loop picks up a dependency recovering."""
+        storage = AsyncMock(side_effect=[False, True, True, True])
+        monitor = ReadinessMonitor({"storage": storage}, interval=0.01)
+
+        await monitor.start()
+        assert monitor.is_ready is False
+
+        for _ in range(100):
+            if monitor.is_ready:
+                break
+            await asyncio.sleep(0.01)
+        await monitor.stop()
+
+        assert monitor.is_ready is True
+        assert monitor._task is None
+
+
+class TestReadinessLifecycle:
+    """Test the module-level readiness monitor lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_initialize_and_cleanup(self):
+        """Test initialization runs the first round and cleanup removes it."""
+        storage = AsyncMock(return_value=True)
+
+        with patch.object(
+            readiness_module.settings, "READINESS_CHECK_INTERVAL_SECONDS", 60
+        ):
+            monitor = await initialize_readiness_monitor({"storage": storage})
+
+        try:
+            assert get_readiness_monitor() is monitor
+            assert monitor.is_ready is True
+            storage.assert_awaited_once()
+        finally:
+            await cleanup_readiness_monitor()
+
+        assert get_readiness_monitor() is None
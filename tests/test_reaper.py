@@ -0,0 +1,186 @@
+"""Tests for the expired-row reaper."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from template_mcp_server.src.storage import reaper as reaper_module
+from template_mcp_server.src.storage.reaper import (
+    REAPED_TABLES,
+    REAPER_LOCK_KEY,
+    ExpiredRowReaper,
+    cleanup_expired_row_reaper,
+    get_expired_row_reaper,
+    initialize_expired_row_reaper,
+    reap_query,
+)
+
+
+class AsyncContextManagerMock:
+    """Stand-in for ``pool.acquire()`` yielding a fixed connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+def make_storage(conn):
+    """Build a storage service stand-in whose pool yields ``conn``."""
+    storage = Mock()
+    storage.pool.acquire.return_value = AsyncContextManagerMock(conn)
+    return storage
+
+
+def make_connection(locked=True, deleted=None):
+    """Build a connection mock reporting ``deleted`` rows per batch in turn."""
+    conn = AsyncMock()
+    conn.fetchval.return_value = locked
+    statuses = iter(deleted or [])
+
+    async def execute(query, *args):
+        if "pg_advisory_unlock" in query:
+            return "SELECT 1"
+        return f"DELETE {next(statuses, 0)}"
+
+    conn.execute.side_effect = execute
+    return conn
+
+
+class TestReapQuery:
+    """Test the batch delete statement."""
+
+    def test_query_is_bounded_and_skips_locked_rows(self):
+        """Test each batch deletes at most $1 expired rows, skipping locked ones."""
+        query = reap_query("oauth_access_tokens", "token")
+
+        assert "DELETE FROM oauth_access_tokens" in query
+        assert "expires_at < NOW()" in query
+        assert "LIMIT $1" in query
+        assert "FOR UPDATE SKIP LOCKED" in query
+
+
+class TestExpiredRowReaper:
+    """Test reaper runs."""
+
+    @pytest.mark.asyncio
+    async def test_run_reaps_every_table_in_batches(self):
+        """Test full batches are followed by another batch until one comes up short."""
+        # Codes: two full batches then a partial one; other tables empty
+        conn = make_connection(deleted=[2, 2, 1, 0, 0])
+        reaper = ExpiredRowReaper(make_storage(conn), batch_size=2)
+
+        reaped = await reaper.run_once()
+
+        assert reaped == {
+            "oauth_authorization_codes": 5,
+            "oauth_refresh_tokens": 0,
+            "oauth_access_tokens": 0,
+        }
+        assert reaper.batches == 5
+        assert reaper.runs == 1
+        assert reaper.rows_reaped["oauth_authorization_codes"] == 5
+        conn.fetchval.assert_awaited_once_with(
+            "SELECT pg_try_advisory_lock($1)", REAPER_LOCK_KEY
+        )
+        conn.execute.assert_any_await("SELECT pg_advisory_unlock($1)", REAPER_LOCK_KEY)
+
+    @pytest.mark.asyncio
+    async def test_run_stops_at_max_batches(self):
+        """Test a run bounds the work done on each table."""
+        conn = make_connection(deleted=[1] * 100)
+        reaper = ExpiredRowReaper(make_storage(conn), batch_size=1, max_batches=3)
+
+        reaped = await reaper.run_once()
+
+        assert all(count == 3 for count in reaped.values())
+        assert reaper.batches == 3 * len(REAPED_TABLES)
+
+    @pytest.mark.asyncio
+    async def test_run_skipped_when_lock_held(self):
+        """Test another replica holding the lock makes the run a no-op."""
+        conn = make_connection(locked=False)
+        reaper = ExpiredRowReaper(make_storage(conn))
+
+        assert await reaper.run_once() is None
+        assert reaper.skipped_runs == 1
+        assert reaper.runs == 0
+        conn.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lock_released_when_batch_fails(self):
+        """Test the advisory lock is released even if a delete fails."""
+        conn = make_connection()
+        conn.execute.side_effect = [Exception("deadlock"), "SELECT 1"]
+        reaper = ExpiredRowReaper(make_storage(conn))
+
+        with pytest.raises(Exception, match="deadlock"):
+            await reaper.run_once()
+
+        conn.execute.assert_awaited_with(
+            "SELECT pg_advisory_unlock($1)", REAPER_LOCK_KEY
+        )
+
+    @pytest.mark.asyncio
+    async def test_run_without_pool(self):
+        """Test the reaper does nothing before storage is connected."""
+        storage = Mock()
+        storage.pool = None
+
+        assert await ExpiredRowReaper(storage).run_once() is None
+
+    def test_metrics(self):
+        """Test metrics report batch latency once batches have run."""
+        reaper = ExpiredRowReaper(Mock())
+        assert reaper.metrics()["batch_latency_ms"]["mean"] is None
+
+        reaper._record_batch(0.002)
+        reaper._record_batch(0.004)
+
+        latency = reaper.metrics()["batch_latency_ms"]
+        assert latency == {"last": 4.0, "mean": 3.0, "max": 4.0}
+
+    @pytest.mark.asyncio
+    async def test_background_loop_survives_failures(self):
+        """Test a failed run is counted and the loop keeps going."""
+        reaper = ExpiredRowReaper(Mock(), interval=0.01)
+        reaper.run_once = AsyncMock(side_effect=[Exception("down"), {}, {}, {}])
+
+        reaper.start()
+        for _ in range(100):
+            if reaper.run_once.await_count >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await reaper.stop()
+
+        assert reaper.failed_runs == 1
+        assert reaper.run_once.await_count >= 2
+        assert reaper._task is None
+
+
+class TestExpiredRowReaperLifecycle:
+    """Test the module-level reaper lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_initialize_and_cleanup(self):
+        """Test initialization starts the reaper and cleanup removes it."""
+        conn = make_connection()
+
+        with patch.object(
+            reaper_module.settings, "EXPIRED_ROW_REAPER_INTERVAL_SECONDS", 60
+        ):
+            reaper = await initialize_expired_row_reaper(make_storage(conn))
+
+        try:
+            assert get_expired_row_reaper() is reaper
+            assert reaper.interval == 60
+            assert reaper._task is not None
+        finally:
+            await cleanup_expired_row_reaper()
+
+        assert get_expired_row_reaper() is None
@@ -161,3 +161,85 @@ class TestValidateConfig:
             settings = Settings()
             settings.MCP_TRANSPORT_PROTOCOL = protocol
             validate_config(settings)  # Should not raise
+
+    @pytest.mark.parametrize(
+        "name,value",
+        [("MCP_EVENT_LOOP", "trio"), ("MCP_HTTP_IMPLEMENTATION", "hyper")],
+    )
+    def test_invalid_runtime_selection(self, name, value):
+        """Test validation of the event loop and HTTP implementation settings."""
+        # Arrange
+        settings = Settings()
+        setattr(settings, name, value)
+
+        # Act & Assert
+        with pytest.raises(ValueError, match=f"{name} must be one of"):
+            validate_config(settings)
+
+    def test_invalid_token_verification_mode(self):
+        """Test validation with an unknown token verification mode."""
+        # Arrange
+        settings = Settings()
+        settings.TOKEN_VERIFICATION_MODE = "invalid"
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="TOKEN_VERIFICATION_MODE must be one of"):
+            validate_config(settings)
+
+    def test_invalid_token_storage_mode(self):
+        """Test validation with an unknown token storage mode."""
+        # Arrange
+        settings = Settings()
+        settings.TOKEN_STORAGE_MODE = "md5"
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="TOKEN_STORAGE_MODE must be one of"):
+            validate_config(settings)
+
+    def test_invalid_storage_backend(self):
+        """Test validation with an unknown storage backend."""
+        # Arrange
+        settings = Settings()
+        settings.STORAGE_BACKEND = "redis"
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="STORAGE_BACKEND must be one of"):
+            validate_config(settings)
+
+    def test_jwks_mode_requires_jwks_url(self):
+        """Test jwks verification mode needs a JWKS URL."""
+        # Arrange
+        settings = Settings()
+        settings.TOKEN_VERIFICATION_MODE = "jwks"
+        settings.SSO_JWKS_URL = ""
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="SSO_JWKS_URL is required"):
+            validate_config(settings)
+
+        settings.SSO_JWKS_URL = "https://sso.example.com/jwks"
+        validate_config(settings)  # Should not raise
+
+    @pytest.mark.parametrize(
+        "overrides,message",
+        [
+            ({"USE_EXTERNAL_BROWSER_AUTH": True}, "USE_EXTERNAL_BROWSER_AUTH requires"),
+            ({"MCP_TRANSPORT_PROTOCOL": "sse"}, "sse transport requires"),
+            ({"POSTGRES_MAX_CONNECTIONS": 2}, "must be at least MCP_WORKERS"),
+            ({"STORAGE_BACKEND": "memory"}, "STORAGE_BACKEND=memory requires"),
+            ({"SESSION_SECRET": None}, "SESSION_SECRET is required"),
+        ],
+    )
+    def test_multiple_workers_constraints(self, overrides, message):
+        """Test settings that cannot be shared across worker processes."""
+        # Arrange
+        settings = Settings()
+        settings.MCP_WORKERS = 4
+        settings.SESSION_SECRET = "shared-session-secret"
+        validate_config(settings)  # Should not raise
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+
+        # Act & Assert
+        with pytest.raises(ValueError, match=message):
+            validate_config(settings)
@@ -0,0 +1,67 @@
+"""Tests for the JSONB codecs of the storage service."""
+
+from unittest.mock import AsyncMock, call, patch
+
+import pytest
+
+from template_mcp_server.src.storage import storage_service
+from template_mcp_server.src.storage.codecs import (
+    JSONB_FORMAT_VERSION,
+    decode_jsonb,
+    encode_jsonb,
+    register_json_codecs,
+)
+
+
+class TestJSONBCodec:
+    """Test encoding and decoding binary JSONB values."""
+
+    def test_encode_prefixes_format_version(self):
+        """Test encoded values carry the binary JSONB version byte."""
+        encoded = encode_jsonb(["http://localhost:3000"])
+
+        assert encoded.startswith(JSONB_FORMAT_VERSION)
+        assert encoded[1:] == b'["http://localhost:3000"]'
+
+    def test_round_trip(self):
+        """Test nested values survive encoding and decoding."""
+        value = {"access_token": "token123", "scopes": ["read", "write"], "n": 1}
+
+        assert decode_jsonb(encode_jsonb(value)) == value
+
+    def test_decode_null(self):
+        """Test a JSON null decodes to None."""
+        assert decode_jsonb(JSONB_FORMAT_VERSION + b"null") is None
+
+    @pytest.mark.asyncio
+    async def test_register_json_codecs(self):
+        """Test the codec is registered for jsonb in binary format."""
+        conn = AsyncMock()
+
+        await register_json_codecs(conn)
+
+        conn.set_type_codec.assert_awaited_once_with(
+            "jsonb",
+            schema="pg_catalog",
+            encoder=encode_jsonb,
+            decoder=decode_jsonb,
+            format="binary",
+        )
+
+
+class TestInitConnection:
+    """Test the pool's connection init hook."""
+
+    @pytest.mark.asyncio
+    async def test_codecs_registered_before_statements_prepared(self):
+        """Test prepared statements are created after the codec exists."""
+        manager = AsyncMock()
+        conn = AsyncMock()
+
+        with (
+            patch.object(storage_service, "register_json_codecs", manager.register),
+            patch.object(storage_service, "prepare_statements", manager.prepare),
+        ):
+            await storage_service.init_connection(conn)
+
+        assert manager.mock_calls == [call.register(conn), call.prepare(conn)]
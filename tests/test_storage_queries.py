@@ -0,0 +1,169 @@
+"""Tests for the prepared-statement registry of the storage service."""
+
+from unittest.mock import AsyncMock, Mock
+
+import asyncpg
+import pytest
+
+from template_mcp_server.src.storage.queries import (
+    QUERIES,
+    prepare_statement,
+    prepare_statements,
+)
+from template_mcp_server.src.storage.storage_service import StorageService
+
+
+def make_prepared_connection(prepare: AsyncMock) -> Mock:
+    """Build a PreparedConnection stand-in without opening a connection."""
+    conn = Mock()
+    conn.prepared = {}
+    conn.prepare = prepare
+    return conn
+
+
+class AsyncContextManagerMock:
+    """Stand-in for ``pool.acquire()`` yielding a fixed connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+class TestClientFingerprintQueries:
+    """Test client deduplication goes through the fingerprint column."""
+
+    def test_lookup_probes_fingerprint(self):
+        """Test the name and redirect URI lookup is an index probe on the fingerprint."""
+        query = QUERIES["get_client_by_name_and_redirect_uris"]
+
+        assert "client_fingerprint = oauth_client_fingerprint($1, $2)" in query
+        assert "redirect_uris = $2" not in query
+
+    def test_upsert_reuses_fingerprint_match(self):
+        """Test registration returns a client matching in any URI order."""
+        query = QUERIES["upsert_client"]
+
+        assert "oauth_client_fingerprint($3::varchar, $4::jsonb)" in query
+        assert "WHERE NOT EXISTS (SELECT 1 FROM existing)" in query
+        assert "ON CONFLICT (client_name, redirect_uris)" in query
+
+
+class TestTokenPairQuery:
+    """Test the token pair statement."""
+
+    def test_refresh_row_references_inserted_access_row(self):
+        """Test the refresh token takes its access token from the same statement."""
+        query = QUERIES["store_token_pair"]
+
+        assert "RETURNING token" in query
+        assert "access.token" in query
+        assert "FROM access" in query
+
+
+class TestPrepareStatements:
+    """Test preparing the registered queries on a connection."""
+
+    @pytest.mark.asyncio
+    async def test_init_hook_prepares_every_query(self):
+        """Test the pool init hook prepares each registered query once."""
+        prepare = AsyncMock(side_effect=lambda query, name: Mock(name=name))
+        conn = make_prepared_connection(prepare)
+
+        await prepare_statements(conn)
+
+        assert set(conn.prepared) == set(QUERIES)
+        assert prepare.await_count == len(QUERIES)
+        prepare.assert_any_await(QUERIES["get_client"], name="mcp_get_client")
+
+    @pytest.mark.asyncio
+    async def test_missing_tables_deferred_to_first_use(self):
+        """Test statements for tables not created yet are prepared later."""
+        prepare = AsyncMock(side_effect=asyncpg.UndefinedTableError("missing"))
+        conn = make_prepared_connection(prepare)
+
+        await prepare_statements(conn)
+        assert conn.prepared == {}
+
+        statement = Mock()
+        prepare.side_effect = None
+        prepare.return_value = statement
+        assert await prepare_statement(conn, "get_access_token") is statement
+        assert conn.prepared["get_access_token"] is statement
+
+    @pytest.mark.asyncio
+    async def test_missing_fingerprint_function_deferred(self):
+        """Test a schema not yet upgraded does not fail connection setup."""
+        prepare = AsyncMock(side_effect=asyncpg.UndefinedFunctionError("missing"))
+        conn = make_prepared_connection(prepare)
+
+        await prepare_statements(conn)
+
+        assert conn.prepared == {}
+
+    @pytest.mark.asyncio
+    async def test_prepared_statement_reused(self):
+        """Test a statement is prepared once per connection."""
+        prepare = AsyncMock(return_value=Mock())
+        conn = make_prepared_connection(prepare)
+
+        first = await prepare_statement(conn, "get_client")
+        second = await prepare_statement(conn, "get_client")
+
+        assert first is second
+        prepare.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_plain_connection_not_prepared(self):
+        """Test connections from other pools fall back to inline SQL."""
+        conn = AsyncMock()
+
+        assert await prepare_statement(conn, "get_client") is None
+        conn.prepare.assert_not_called()
+
+
+class TestStorageServicePreparedPath:
+    """Test StorageService runs queries through prepared statements."""
+
+    @pytest.mark.asyncio
+    async def test_get_access_token_uses_prepared_statement(self):
+        """Test reads go through the connection's prepared statement."""
+        statement = Mock()
+        statement.fetchrow = AsyncMock(
+            return_value={
+                "client_id": "client",
+                "scope": "read",
+                "token_type": "Bearer",
+                "expires_at": 1893456000.0,
+            }
+        )
+        conn = make_prepared_connection(AsyncMock(return_value=statement))
+        service = StorageService()
+        service.pool = Mock()
+        service.pool.acquire.return_value = AsyncContextManagerMock(conn)
+
+        result = await service.get_access_token("token")
+
+        assert result["client_id"] == "client"
+        statement.fetchrow.assert_awaited_once_with("token")
+
+    @pytest.mark.asyncio
+    async def test_delete_reports_prepared_status(self):
+        """Test deletes still report whether a row was removed."""
+        statement = Mock()
+        statement.fetch = AsyncMock(return_value=[])
+        statement.get_statusmsg.return_value = "DELETE 0"
+        conn = make_prepared_connection(AsyncMock(return_value=statement))
+        service = StorageService()
+        service.pool = Mock()
+        service.pool.acquire.return_value = AsyncContextManagerMock(conn)
+
+        assert await service.delete_access_token("missing") is False
+
+        statement.get_statusmsg.return_value = "DELETE 1"
+        assert await service.delete_access_token("token") is True
+        statement.fetch.assert_awaited_with("token")
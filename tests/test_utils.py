@@ -1,9 +1,12 @@
 """Tests for the utils module."""
 
+import asyncio
 from unittest.mock import Mock, patch
 
 import pytest
 
+from template_mcp_server.utils.cache import SingleFlight, TTLCache
+from template_mcp_server.utils.metrics import LatencyHistogram
 from template_mcp_server.utils.pylogger import (
     AWS_LOGGERS,
     ERROR_ONLY_LOGGERS,
@@ -578,3 +581,191 @@ class TestPylogger:
 
         # Assert - the flag should be True after force_reconfigure (since it calls get_python_logger)
         assert pylogger_module._LOGGING_CONFIGURED is True
+
+
+class TestTTLCache:
+    """Test the TTLCache utility."""
+
+    def test_get_and_set(self):
+        """Test storing and retrieving a value counts hits and misses."""
+        cache = TTLCache(max_entries=10, max_ttl=60)
+
+        assert cache.get("key") is None
+        cache.set("key", {"active": True})
+
+        assert cache.get("key") == {"active": True}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entry_expires_at_earlier_deadline(self):
+        """Test an explicit expiry earlier than max_ttl is honoured."""
+        cache = TTLCache(max_entries=10, max_ttl=60)
+
+        with patch("template_mcp_server.utils.cache.time.time", return_value=1000.0):
+            cache.set("key", "value", expires_at=1010.0)
+
+        with patch("template_mcp_server.utils.cache.time.time", return_value=1009.0):
+            assert cache.get("key") == "value"
+        with patch("template_mcp_server.utils.cache.time.time", return_value=1010.0):
+            assert cache.get("key") is None
+
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_entry_capped_by_max_ttl(self):
+        """Test max_ttl caps entries whose own expiry is far away."""
+        cache = TTLCache(max_entries=10, max_ttl=5)
+
+        with patch("template_mcp_server.utils.cache.time.time", return_value=1000.0):
+            cache.set("key", "value", expires_at=5000.0)
+        with patch("template_mcp_server.utils.cache.time.time", return_value=1006.0):
+            assert cache.get("key") is None
+
+    def test_already_expired_value_not_stored(self):
+        """Test values that are already expired are not cached."""
+        cache = TTLCache(max_entries=10, max_ttl=60)
+
+        cache.set("key", "value", expires_at=1.0)
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = TTLCache(max_entries=2, max_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_capacity_disables_cache(self):
+        """Test a cache with no capacity never stores anything."""
+        cache = TTLCache(max_entries=0, max_ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") is None
+
+    def test_delete_and_clear(self):
+        """Test deleting a key and clearing the cache."""
+        cache = TTLCache(max_entries=10, max_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.delete("a") is True
+        assert cache.delete("a") is False
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+    def test_invalidate_all_keeps_counters(self):
+        """Test dropping every entry leaves the hit and miss counters intact."""
+        cache = TTLCache(max_entries=10, max_ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+
+        cache.invalidate_all()
+
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
+
+
+class TestSingleFlight:
+    """Test the SingleFlight utility."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self):
+        """Test concurrent callers for one key share a single call."""
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        tasks = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+        release.set()
+
+        assert await asyncio.gather(*tasks) == ["result"] * 5
+        assert calls == 1
+        assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_run_again(self):
+        """Test a key is forgotten once its call completes."""
+        flight = SingleFlight()
+        work = Mock(side_effect=[asyncio.sleep(0, "a"), asyncio.sleep(0, "b")])
+
+        assert await flight.do("key", work) == "a"
+        assert await flight.do("key", work) == "b"
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared_and_forgotten(self):
+        """Test all waiters see the failure and the key is released."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        """Test cancelling one caller leaves the call running for others."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+
+
+class TestLatencyHistogram:
+    """Test the LatencyHistogram utility."""
+
+    def test_empty(self):
+        """Test an empty histogram reports no mean."""
+        stats = LatencyHistogram().stats()
+
+        assert stats["count"] == 0
+        assert stats["mean_ms"] is None
+        assert stats["buckets_ms"]["+Inf"] == 0
+
+    def test_buckets_are_cumulative(self):
+        """Test each bucket counts the observations at or below its bound."""
+        histogram = LatencyHistogram(buckets_ms=(1, 10, 100))
+        for seconds in (0.0005, 0.001, 0.005, 0.05, 2.0):
+            histogram.observe(seconds)
+
+        stats = histogram.stats()
+
+        assert stats["buckets_ms"] == {"1": 2, "10": 3, "100": 4, "+Inf": 5}
+        assert stats["count"] == 5
+        assert stats["max_ms"] == 2000.0
+        assert stats["mean_ms"] == pytest.approx(411.3)
@@ -0,0 +1,93 @@
+"""Tests for the startup warm-up."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from template_mcp_server.src import warmup as warmup_module
+from template_mcp_server.src.storage.memory_storage import InMemoryStorageService
+from template_mcp_server.src.storage.storage_service import StorageService
+from template_mcp_server.src.warmup import warm_up
+
+
+def postgres_storage(result=None, error=None):
+    """Build a PostgreSQL storage mock whose warm-up returns or raises."""
+    storage = Mock(spec=StorageService)
+    storage.warm_up = AsyncMock(return_value=result, side_effect=error)
+    return storage
+
+
+class TestWarmUp:
+    """Test the warm-up steps run before the server accepts traffic."""
+
+    @pytest.mark.asyncio
+    async def test_warms_storage_and_sso_connection(self):
+        """Test PostgreSQL and the introspection connection are warmed."""
+        storage = postgres_storage({"connections": 10, "clients_cached": 3})
+
+        with (
+            patch.object(warmup_module, "settings") as mock_settings,
+            patch.object(
+                warmup_module, "check_sso_reachable", new_callable=AsyncMock
+            ) as mock_sso,
+        ):
+            mock_settings.TOKEN_VERIFICATION_MODE = "introspection"
+            mock_settings.SSO_INTROSPECTION_URL = "https://sso.example.com/introspect"
+            mock_settings.WARM_UP_TIMEOUT_SECONDS = 5.0
+            mock_sso.return_value = True
+
+            results = await warm_up(storage)
+
+        assert results == {
+            "storage": {"connections": 10, "clients_cached": 3},
+            "sso": True,
+        }
+
+    @pytest.mark.asyncio
+    async def test_jwks_mode_skips_sso(self):
+        """Test jwks mode relies on the key fetch to open the SSO connection."""
+        with (
+            patch.object(warmup_module, "settings") as mock_settings,
+            patch.object(
+                warmup_module, "check_sso_reachable", new_callable=AsyncMock
+            ) as mock_sso,
+        ):
+            mock_settings.TOKEN_VERIFICATION_MODE = "jwks"
+            mock_settings.WARM_UP_TIMEOUT_SECONDS = 5.0
+
+            results = await warm_up(InMemoryStorageService())
+
+        mock_sso.assert_not_called()
+        assert results == {}
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_raise(self):
+        """Test a failed step is reported without stopping startup."""
+        storage = postgres_storage(error=ConnectionError("refused"))
+
+        with patch.object(warmup_module, "settings") as mock_settings:
+            mock_settings.TOKEN_VERIFICATION_MODE = "jwks"
+            mock_settings.WARM_UP_TIMEOUT_SECONDS = 5.0
+
+            results = await warm_up(storage)
+
+        assert results == {"storage": {"error": "refused"}}
+
+    @pytest.mark.asyncio
+    async def test_timeout_does_not_raise(self):
+        """Test a warm-up running out of time lets the server start."""
+        storage = Mock(spec=StorageService)
+
+        async def slow_warm_up():
+            await asyncio.sleep(10)
+
+        storage.warm_up = slow_warm_up
+
+        with patch.object(warmup_module, "settings") as mock_settings:
+            mock_settings.TOKEN_VERIFICATION_MODE = "jwks"
+            mock_settings.WARM_UP_TIMEOUT_SECONDS = 0.01
+
+            results = await warm_up(storage)
+
+        assert results == {"error": "timed out"}